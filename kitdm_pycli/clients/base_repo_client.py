@@ -3,6 +3,10 @@ import argparse
 import sys
 from kitdm_pycli.helpers.url_utils import get_query_param_entry
 from kitdm_pycli.helpers.command_line_utils import add_global_arguments
+from kitdm_pycli.helpers.command_line_utils import run_cli
+from kitdm_pycli.helpers.command_line_utils import add_cache_stats_operation
+from kitdm_pycli.helpers.command_line_utils import add_shell_operation, run_shell
+from kitdm_pycli.helpers.command_line_utils import add_batch_operation, run_batch
 from kitdm_pycli.helpers.command_line_utils import add_single_identifier_argument
 from kitdm_pycli.helpers.command_line_utils import add_range_filter_arguments
 from kitdm_pycli.helpers.command_line_utils import add_payload_argument
@@ -11,10 +15,19 @@ from kitdm_pycli.helpers.command_line_utils import add_multiple_identifier_argum
 from kitdm_pycli.helpers.command_line_utils import add_version_argument
 from kitdm_pycli.helpers.command_line_utils import add_pagination_arguments
 from kitdm_pycli.helpers.command_line_utils import add_metadata_argument
-from kitdm_pycli.helpers.render_utils import render_to_file
+from kitdm_pycli.helpers.command_line_utils import add_parallel_argument
+from kitdm_pycli.helpers.command_line_utils import add_all_pages_argument
+from kitdm_pycli.helpers.command_line_utils import add_file_filter_arguments
+from kitdm_pycli.helpers.command_line_utils import add_echo_arguments
+from kitdm_pycli.helpers.command_line_utils import add_bulk_selection_arguments
+from kitdm_pycli.helpers.render_utils import render_to_file, write_all_pages
+from kitdm_pycli.helpers.render_utils import render_statistics
+from kitdm_pycli.helpers.batch_utils import fetch_all, report_failures
+from kitdm_pycli.helpers.batch_utils import read_identifiers, run_bulk_operation
+from kitdm_pycli.helpers.batch_utils import run_bulk_delete
 
 
-def parse_arguments(args):
+def create_parser():
     parser = argparse.ArgumentParser(
         description="Command line client interface for the base-repo service."
     )
@@ -47,6 +60,71 @@ def parse_arguments(args):
         "the file is uploaded to the root of the resource and will keep its "
         "name.",
     )
+    create_content_parser.add_argument(
+        "--progress",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Print the upload progress and throughput to stderr. Disabled by default.",
+    )
+    add_echo_arguments(create_content_parser)
+
+    # uploadDirectory -id 123 -src folder [-rp folder/] [-i '*.tif'] [-e '*.tmp'] [-P 4]
+    upload_directory_parser = operation_subparser.add_parser(
+        "uploadDirectory",
+        help="Upload all files of a local folder as content of a resource.",
+    )
+    add_single_identifier_argument(upload_directory_parser)
+    upload_directory_parser.add_argument(
+        "-src",
+        "--source",
+        type=str,
+        required=True,
+        help="The local folder whose files are uploaded recursively. The path of each file "
+        "relative to this folder is used as relative path of the content.",
+    )
+    upload_directory_parser.add_argument(
+        "-rp",
+        "--relativePath",
+        type=str,
+        default="/",
+        help="The relative path below which all files are stored. If omitted, "
+        "the files are uploaded to the root of the resource.",
+    )
+    add_file_filter_arguments(upload_directory_parser)
+    add_parallel_argument(
+        upload_directory_parser,
+        4,
+        "The number of files uploaded concurrently, 4 by default.",
+    )
+
+    # syncContent -id 123 -src folder [-rp folder/] [-i '*.tif'] [-e '*.tmp'] [-P 4]
+    sync_content_parser = operation_subparser.add_parser(
+        "syncContent",
+        help="Upload only new or changed files of a local folder as content of a resource.",
+    )
+    add_single_identifier_argument(sync_content_parser)
+    sync_content_parser.add_argument(
+        "-src",
+        "--source",
+        type=str,
+        required=True,
+        help="The local folder to synchronize recursively. The path of each file "
+        "relative to this folder is used as relative path of the content.",
+    )
+    sync_content_parser.add_argument(
+        "-rp",
+        "--relativePath",
+        type=str,
+        default="/",
+        help="The relative path of the content folder corresponding to the source "
+        "folder. If omitted, the root of the resource is used.",
+    )
+    add_file_filter_arguments(sync_content_parser)
+    add_parallel_argument(
+        sync_content_parser,
+        4,
+        "The number of concurrent checksum computations and uploads, 4 by default.",
+    )
 
     # getResource -id 123 ... [-v 2]
     get_resource_parser = operation_subparser.add_parser(
@@ -54,6 +132,7 @@ def parse_arguments(args):
     )
     add_multiple_identifier_argument(get_resource_parser)
     add_version_argument(get_resource_parser)
+    add_parallel_argument(get_resource_parser)
 
     # getResources [-f 'yesterday'] [-u 'now'] [-p 1] [-s 30]
     get_resources_parser = operation_subparser.add_parser(
@@ -62,6 +141,7 @@ def parse_arguments(args):
     )
     add_range_filter_arguments(get_resources_parser)
     add_pagination_arguments(get_resources_parser)
+    add_all_pages_argument(get_resources_parser)
 
     # getContent -id 123 [-rp folder/] [-v 2] [-t thumb]
     get_content_parser = operation_subparser.add_parser(
@@ -81,6 +161,7 @@ def parse_arguments(args):
     # get_content_parser.add_argument('-t', '--tag', type=int,
     #                                help='The tag of contents to obtain metadata for.')
     add_pagination_arguments(get_content_parser)
+    add_parallel_argument(get_content_parser)
 
     # downloadContent -id 123 [-rp /] [-v 1]
     download_content_parser = operation_subparser.add_parser(
@@ -98,6 +179,35 @@ def parse_arguments(args):
     )
     add_version_argument(download_content_parser)
 
+    # mirrorContent -id 123 -dst folder [-rp folder/] [-P 4]
+    mirror_content_parser = operation_subparser.add_parser(
+        "mirrorContent",
+        help="Download all files of a resource into a local folder, "
+        "skipping files which are already up to date.",
+    )
+    add_single_identifier_argument(mirror_content_parser)
+    mirror_content_parser.add_argument(
+        "-dst",
+        "--destination",
+        type=str,
+        required=True,
+        help="The local folder receiving the content. The relative path of each "
+        "file is kept below this folder.",
+    )
+    mirror_content_parser.add_argument(
+        "-rp",
+        "--relativePath",
+        type=str,
+        default="/",
+        help="The relative path of a content folder. If omitted, "
+        "the root of the resource is used and all contents are mirrored.",
+    )
+    add_parallel_argument(
+        mirror_content_parser,
+        4,
+        "The number of files downloaded concurrently, 4 by default.",
+    )
+
     # updateResource -id 123 -m data_resource.json
     update_resource_parser = operation_subparser.add_parser(
         "updateResource",
@@ -118,8 +228,23 @@ def parse_arguments(args):
         "RFC 6902 JSON Patch document "
         "instead of all resource metadata.",
     )
-    add_multiple_identifier_argument(patch_resource_parser)
+    patch_selection_group = add_bulk_selection_arguments(patch_resource_parser)
+    patch_selection_group.add_argument(
+        "--fromQuery",
+        action="store_true",
+        help="Patch all resources returned by getResources for the provided date range "
+        "and pages. If --pageSize is used, it refers to the page size used for querying.",
+    )
+    add_range_filter_arguments(patch_resource_parser)
+    add_pagination_arguments(patch_resource_parser)
+    add_all_pages_argument(patch_resource_parser)
     add_payload_argument(patch_resource_parser, required=True)
+    add_echo_arguments(patch_resource_parser, local_echo=True)
+    add_parallel_argument(
+        patch_resource_parser,
+        help_text="The max. number of resources patched concurrently. By default, "
+        "resources are patched one after another.",
+    )
 
     # patchContent -id 123 -rp /folder/file.txt -m patch.json
     patch_content_parser = operation_subparser.add_parser(
@@ -135,12 +260,13 @@ def parse_arguments(args):
         "content element. Patching content folders is not supported.",
     )
     add_payload_argument(patch_content_parser, required=True)
+    add_echo_arguments(patch_content_parser, local_echo=True)
     # deleteResource -id 123 [-soft]
     delete_resource_parser = operation_subparser.add_parser(
         "deleteResource",
         help="Delete one or more single resource(s) and " " all its contents.",
     )
-    add_multiple_identifier_argument(delete_resource_parser)
+    add_bulk_selection_arguments(delete_resource_parser)
     delete_resource_parser.add_argument(
         "-s",
         "--soft",
@@ -153,6 +279,11 @@ def parse_arguments(args):
         "value from REVOKED to VOLATILE is sufficient. To turn off soft-delete, "
         "the option --no-soft must be appended.",
     )
+    add_parallel_argument(
+        delete_resource_parser,
+        help_text="The max. number of concurrent delete requests if multiple resources "
+        "are deleted. By default, resources are deleted one after another.",
+    )
 
     # deleteContent -id 123 -rp /folder/
     delete_content_parser = operation_subparser.add_parser(
@@ -168,19 +299,31 @@ def parse_arguments(args):
         "the root of the resource is used.",
     )
 
+    add_cache_stats_operation(operation_subparser)
+    add_shell_operation(operation_subparser)
+    add_batch_operation(operation_subparser)
+
     add_global_arguments(parser)
 
-    return parser.parse_args(args)
+    return parser
 
 
-def main():
-    args = parse_arguments(sys.argv[1:])
+def parse_arguments(args):
+    return create_parser().parse_args(args)
+
 
-    # Determine client to use
-    service_client = BaseRepoClient(args.debug)
+def run_operation(args, service_client):
+    """
+    Perform the operation selected via command line with the provided client.
 
+    :param args: The parsed command line arguments.
+    :param service_client: The client used to perform the operation.
+    :return: A tuple of the rendered response and a list of failures, or None if the operation has already
+    written its output, e.g., into an output file.
+    """
     # Determine and call operation to apply
     response = None
+    failures = []
 
     if args.operation == "createResource":
         # createResource [-m data_resource.json]
@@ -189,25 +332,65 @@ def main():
     elif args.operation == "createContent":
         # createContent -id 123 [-m content_information.json] [-pl file.txt] [-rp folder/file.txt]
         response = service_client.create(
-            args.identifier, args.metadata, args.payload, args.relativePath, args.auth
+            args.identifier,
+            args.metadata,
+            args.payload,
+            args.relativePath,
+            args.auth,
+            args.progress,
+            echo=args.echo,
+        )
+        response = service_client.render_response(response, args.render_as)
+    elif args.operation == "uploadDirectory":
+        # uploadDirectory -id 123 -src folder [-rp folder/] [-i '*.tif'] [-e '*.tmp'] [-P 4]
+        response, failures = service_client.upload_directory(
+            args.identifier,
+            args.source,
+            args.relativePath,
+            args.include,
+            args.exclude,
+            args.parallel,
+            args.auth,
+        )
+        response = service_client.render_response(response, args.render_as)
+    elif args.operation == "syncContent":
+        # syncContent -id 123 -src folder [-rp folder/] [-i '*.tif'] [-e '*.tmp'] [-P 4]
+        response, failures = service_client.sync_content(
+            args.identifier,
+            args.source,
+            args.relativePath,
+            args.include,
+            args.exclude,
+            args.parallel,
+            args.auth,
         )
         response = service_client.render_response(response, args.render_as)
     elif args.operation == "getResources":
         # getResources [-f 'yesterday'] [-u 'now'] [-p 1] [-s 30]
         query_params = parse_query_params(args)
+        if args.all:
+            # write all pages one after another
+            pages = service_client.iterate_pages(
+                None, None, query_params, args.auth, args.prefetch
+            )
+            write_all_pages(service_client, pages, args)
+            service_client.report_request_count(args.operation)
+            return None
         response = service_client.get(None, None, query_params, args.auth)
         response = service_client.render_response(response, args.render_as)
     elif args.operation == "getResource":
         # getResource -id 123 [-v 2]
         if len(args.identifier) > 1:
             # multiple ids provided
-            all_results = []
-            for identifier in args.identifier:
-                # Get single resource omitting the version argument to avoid errors if a resource does not have
-                # a particular version
-                response = service_client.get(identifier, None, None, args.auth)
-                all_results += response
-            response = all_results
+            # Get single resources omitting the version argument to avoid errors if a resource does not have
+            # a particular version
+            response, failures = fetch_all(
+                args.identifier,
+                lambda identifier: service_client.get(
+                    identifier, None, None, args.auth
+                ),
+                args.parallel,
+            )
         else:
             # single id provided, also include version attribute
             query_params = [get_query_param_entry("version", str(args.version))]
@@ -218,17 +401,17 @@ def main():
     elif args.operation == "getContent":
         # getContent -id 123 [-rp folder/] [-v 2] [-t thumb] [-p 1] [-s 30]
         if len(args.identifier) > 1:
-            all_results = []
-            for identifier in args.identifier:
-                query_params = [
-                    get_query_param_entry("page", str(args.page)),
-                    get_query_param_entry("size", str(args.pageSize)),
-                ]
-                response = service_client.get(
+            query_params = [
+                get_query_param_entry("page", str(args.page)),
+                get_query_param_entry("size", str(args.pageSize)),
+            ]
+            response, failures = fetch_all(
+                args.identifier,
+                lambda identifier: service_client.get(
                     identifier, args.relativePath, query_params, args.auth
-                )
-                all_results += response
-            response = all_results
+                ),
+                args.parallel,
+            )
         else:
             query_params = None
             if args.relativePath and not args.relativePath.endswith("/"):
@@ -242,8 +425,24 @@ def main():
     elif args.operation == "downloadContent":
         # downloadContent -id 123 [-rp /] [-v 1]
         response = service_client.download(
-            args.identifier, args.relativePath, args.version, args.auth
+            args.identifier, args.relativePath, args.version, args.auth, args.output
         )
+        if args.output:
+            # content was streamed directly into the output file
+            if response:
+                print("Output written to " + args.output)
+            service_client.report_request_count(args.operation)
+            return None
+    elif args.operation == "mirrorContent":
+        # mirrorContent -id 123 -dst folder [-rp folder/] [-P 4]
+        response, failures = service_client.mirror_content(
+            args.identifier,
+            args.relativePath,
+            args.destination,
+            args.parallel,
+            args.auth,
+        )
+        response = service_client.render_response(response, args.render_as)
     elif args.operation == "updateResource":
         # updateResource -id 123 -m data_resource.json
         response = service_client.update(args.identifier, args.metadata, args.auth)
@@ -251,37 +450,55 @@ def main():
     elif args.operation == "patchContent":
         # patchContent -id 123 -rp /folder/file.txt -m patch.json
         response = service_client.patch(
-            args.identifier, args.payload, args.relativePath, args.auth
+            args.identifier,
+            args.payload,
+            args.relativePath,
+            args.auth,
+            args.echo,
+            args.localEcho,
         )
         response = service_client.render_response(response, args.render_as)
     elif args.operation == "patchResource":
-        # patchResource -id 123 -pl patch.json
-        if len(args.identifier) > 1:
-            # multiple ids provided
-            all_results = []
-            for identifier in args.identifier:
-                response = service_client.patch(
-                    identifier, args.payload, None, args.auth
-                )
-                all_results += response
-            response = all_results
-        else:
-            response = service_client.patch(
-                args.identifier[0], args.payload, None, args.auth
+        # patchResource -id 123 ... | --idsFile ids.txt | --fromQuery [-f 'yesterday'] [-A] -pl patch.json
+        def patch_resource(identifier):
+            return service_client.patch(
+                identifier, args.payload, None, args.auth, args.echo, args.localEcho
             )
 
-        response = service_client.render_response(response, args.render_as)
-    elif args.operation == "deleteResource":
-        # deleteResource -id 123 [-soft]
-        if len(args.identifier) > 1:
-            # multiple ids provided
-            for identifier in args.identifier:
-                response = service_client.delete(identifier, None, args.soft, args.auth)
-                if not response:
-                    service_client.print_error(
-                        "Resource " + identifier + " could not be deleted."
-                    )
+        if args.identifier and not args.checkpoint:
+            if len(args.identifier) > 1:
+                # multiple ids provided
+                response, failures = fetch_all(
+                    args.identifier, patch_resource, args.parallel
+                )
+            else:
+                response = patch_resource(args.identifier[0])
+            response = service_client.render_response(response, args.render_as)
         else:
+            if args.identifier:
+                # checkpoint provided, outcomes are written as JSON Lines as for --idsFile
+                identifiers = args.identifier
+            elif args.idsFile:
+                identifiers = read_identifiers(args.idsFile)
+            else:
+                query_params = parse_query_params(args)
+                if args.all:
+                    pages = service_client.iterate_pages(
+                        None, None, query_params, args.auth, args.prefetch
+                    )
+                else:
+                    pages = [service_client.get(None, None, query_params, args.auth)]
+                # all ids are obtained before patching, as patched resources may move between pages of the query
+                identifiers = [resource["id"] for page in pages for resource in page]
+            # outcomes are written as JSON Lines while patching
+            failed = run_bulk_operation(identifiers, patch_resource, args, "Patched")
+            service_client.report_request_count(args.operation)
+            if failed:
+                exit(2)
+            return None
+    elif args.operation == "deleteResource":
+        # deleteResource -id 123 ... | --idsFile ids.txt [-soft] [-P 4]
+        if args.identifier and len(args.identifier) == 1 and not args.checkpoint:
             response = service_client.delete(
                 args.identifier[0], None, args.soft, args.auth
             )
@@ -289,11 +506,55 @@ def main():
                 service_client.print_error(
                     "Resource " + args.identifier[0] + " could not be deleted."
                 )
+        else:
+            # multiple ids or a checkpoint provided, outcomes are written as JSON Lines while deleting
+            failed = run_bulk_delete(
+                args.identifier or read_identifiers(args.idsFile),
+                lambda identifier: service_client.delete(
+                    identifier, None, True, args.auth
+                )
+                or None,
+                args,
+            )
+            service_client.report_request_count(args.operation)
+            if failed:
+                exit(2)
+            return None
     elif args.operation == "deleteContent":
         # deleteContent -id 123 -rp /folder/
         response = service_client.delete(
             args.identifier, args.relativePath, None, args.auth
         )
+    elif args.operation == "cacheStats":
+        # cacheStats
+        response = render_statistics(
+            service_client.get_response_cache_statistics(), args.render_as
+        )
+
+    return response, failures
+
+
+def process(args, service_client=None):
+    # Determine client to use, in shell mode the client of the shell is reused
+    if not service_client:
+        service_client = BaseRepoClient(args.debug)
+    service_client.apply_options(args.debug, args.cache)
+
+    if args.operation == "shell":
+        # shell, operations are read from stdin and performed with this client
+        run_shell(process, parse_arguments, service_client, args, "base-repo> ")
+        return
+
+    if args.operation == "batch":
+        # batch -f operations.jsonl, operations are performed concurrently with this client
+        run_batch(run_operation, create_parser(), service_client, args)
+        service_client.report_request_count(args.operation)
+        return
+
+    result = run_operation(args, service_client)
+    if result is None:
+        return
+    response, failures = result
 
     if args.output:
         render_to_file(response, args)
@@ -301,6 +562,16 @@ def main():
         # print response to stdout
         print(response)
 
+    service_client.report_request_count(args.operation)
+
+    if failures:
+        report_failures(failures)
+        exit(2)
+
+
+def main():
+    run_cli(process, parse_arguments(sys.argv[1:]), "base_repo")
+
 
 if __name__ == "__main__":
     main()
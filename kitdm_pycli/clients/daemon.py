@@ -0,0 +1,181 @@
+import argparse
+import io
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+from kitdm_pycli.clients import base_repo_client
+from kitdm_pycli.clients import metastore_client
+from kitdm_pycli.clients import typed_pid_maker_client
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from kitdm_pycli.helpers.metastore_helper import MetaStoreClient
+from kitdm_pycli.helpers.typed_pid_maker_helper import TypedPidMakerClient
+from kitdm_pycli.helpers.daemon_utils import get_daemon_socket
+from kitdm_pycli.helpers.daemon_utils import receive_message, send_message
+from kitdm_pycli.helpers.exceptions import PyCliError
+
+# process function and service client class by client name
+CLIENTS = {
+    "base_repo": (base_repo_client.process, BaseRepoClient),
+    "metastore": (metastore_client.process, MetaStoreClient),
+    "typed_pid_maker": (typed_pid_maker_client.process, TypedPidMakerClient),
+}
+
+
+def parse_arguments(args):
+    parser = argparse.ArgumentParser(
+        description="Background daemon performing operations forwarded by the command line clients with warm "
+        "service clients, i.e., keeping pooled connections, tokens and caches between invocations."
+    )
+    parser.add_argument(
+        "-s",
+        "--socket",
+        type=str,
+        default=None,
+        help="The path of the Unix domain socket to listen on. By default, PYCLI_DAEMON_SOCKET or "
+        "daemon.sock in the cache folder is used, which is also where the clients look for the daemon.",
+    )
+    return parser.parse_args(args)
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = receive_message(self.rfile)
+        if request is None:
+            return
+        if not self.server.perform_lock.acquire(blocking=False):
+            # the client performs the operation itself instead of waiting
+            send_message(self.wfile, {"busy": True})
+            return
+        try:
+            send_message(self.wfile, self.server.perform(request))
+        finally:
+            self.server.perform_lock.release()
+
+
+class PyCliDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix domain socket server performing forwarded operations. One service client is kept per client name and
+    properties file and reused by all operations, such that properties are only read once and connections, tokens
+    and caches are shared between invocations. As operations are performed in the folder of the calling client with
+    redirected output, only one operation is performed at a time. Invocations arriving meanwhile, e.g., of parallel
+    scripts, are answered as busy and performed by the calling client instead of waiting.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        if os.path.exists(socket_path):
+            # left over by a daemon which was not shut down properly
+            os.remove(socket_path)
+        # other users must not connect before the permissions are set
+        previous_umask = os.umask(0o177)
+        try:
+            socketserver.UnixStreamServer.__init__(
+                self, socket_path, DaemonRequestHandler
+            )
+        finally:
+            os.umask(previous_umask)
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+        self.service_clients = {}
+        self.perform_lock = threading.Lock()
+
+    def get_service_client(self, client_name: str, properties_file: str):
+        """
+        Obtain the warm service client for the provided properties file. If the file was modified, a new client is
+        created and the client for the previous version is closed.
+        """
+        modified = None
+        if os.path.exists(properties_file):
+            modified = os.path.getmtime(properties_file)
+        key = (client_name, properties_file, modified)
+        if key not in self.service_clients:
+            for outdated in [
+                other for other in self.service_clients if other[:2] == key[:2]
+            ]:
+                self.service_clients.pop(outdated).close()
+            previous_properties = os.environ.get("PYCLI_PROPERTIES")
+            os.environ["PYCLI_PROPERTIES"] = properties_file
+            try:
+                service_client = CLIENTS[client_name][1](False)
+            finally:
+                if previous_properties is None:
+                    del os.environ["PYCLI_PROPERTIES"]
+                else:
+                    os.environ["PYCLI_PROPERTIES"] = previous_properties
+            # the daemon has no terminal to ask for credentials
+            service_client.interactive = False
+            self.service_clients[key] = service_client
+        return self.service_clients[key]
+
+    def perform(self, request: dict) -> dict:
+        """
+        Perform a forwarded operation in the folder of the calling client.
+
+        :param request: The request containing client name, parsed arguments, current folder and properties file.
+        :return: A dictionary containing the output written to stdout and stderr and the exit code.
+        """
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        exit_code = 0
+        previous_dir = os.getcwd()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                os.chdir(request["cwd"])
+                process = CLIENTS[request["client"]][0]
+                service_client = self.get_service_client(
+                    request["client"], request["properties"]
+                )
+                service_client.reset_request_count()
+                process(argparse.Namespace(**request["args"]), service_client)
+            except PyCliError as e:
+                print(str(e), file=sys.stderr)
+                exit_code = e.exit_code
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else int(bool(e.code))
+            except OSError as e:
+                print(str(e), file=sys.stderr)
+                exit_code = 2
+            except Exception as e:
+                # unexpected errors must not stop the daemon or lose the output of the operation
+                print("Operation failed: " + repr(e), file=sys.stderr)
+                exit_code = 2
+            finally:
+                os.chdir(previous_dir)
+        return {
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+            "exit_code": exit_code,
+        }
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        for service_client in self.service_clients.values():
+            service_client.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def main():
+    args = parse_arguments(sys.argv[1:])
+    if not hasattr(socket, "AF_UNIX"):
+        print("The daemon requires Unix domain sockets.", file=sys.stderr)
+        exit(2)
+    socket_path = args.socket or get_daemon_socket()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    daemon = PyCliDaemon(socket_path)
+    print("Listening on " + socket_path)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,10 @@ import sys
 from kitdm_pycli.helpers.metastore_helper import MetaStoreClient
 from kitdm_pycli.helpers.url_utils import get_query_param_entry
 from kitdm_pycli.helpers.command_line_utils import add_global_arguments
+from kitdm_pycli.helpers.command_line_utils import run_cli
+from kitdm_pycli.helpers.command_line_utils import add_cache_stats_operation
+from kitdm_pycli.helpers.command_line_utils import add_shell_operation, run_shell
+from kitdm_pycli.helpers.command_line_utils import add_batch_operation, run_batch
 from kitdm_pycli.helpers.command_line_utils import add_single_identifier_argument
 from kitdm_pycli.helpers.command_line_utils import add_range_filter_arguments
 from kitdm_pycli.helpers.command_line_utils import add_payload_argument
@@ -11,10 +15,16 @@ from kitdm_pycli.helpers.command_line_utils import add_multiple_identifier_argum
 from kitdm_pycli.helpers.command_line_utils import add_version_argument
 from kitdm_pycli.helpers.command_line_utils import add_pagination_arguments
 from kitdm_pycli.helpers.command_line_utils import add_metadata_argument
-from kitdm_pycli.helpers.render_utils import render_to_file
+from kitdm_pycli.helpers.command_line_utils import add_parallel_argument
+from kitdm_pycli.helpers.command_line_utils import add_all_pages_argument
+from kitdm_pycli.helpers.command_line_utils import add_bulk_selection_arguments
+from kitdm_pycli.helpers.render_utils import render_to_file, write_all_pages
+from kitdm_pycli.helpers.render_utils import render_statistics
+from kitdm_pycli.helpers.batch_utils import fetch_all, report_failures
+from kitdm_pycli.helpers.batch_utils import read_identifiers, run_bulk_delete
 
 
-def parse_arguments(args):
+def create_parser():
     parser = argparse.ArgumentParser(
         description="Command line client interface for the MetaStore service."
     )
@@ -43,6 +53,7 @@ def parse_arguments(args):
     )
     add_multiple_identifier_argument(get_schema_parser)
     add_version_argument(get_schema_parser)
+    add_parallel_argument(get_schema_parser)
 
     # getSchemas [-f 'two days ago'] [-u Now] [-p 1] [-s 20]
     get_schemas_parser = operation_subparser.add_parser(
@@ -50,6 +61,7 @@ def parse_arguments(args):
     )
     add_range_filter_arguments(get_schemas_parser)
     add_pagination_arguments(get_schemas_parser)
+    add_all_pages_argument(get_schemas_parser)
 
     # getDocument [-id 123] [-v 2]
     get_document_parser = operation_subparser.add_parser(
@@ -58,6 +70,7 @@ def parse_arguments(args):
     )
     add_multiple_identifier_argument(get_document_parser)
     add_version_argument(get_document_parser)
+    add_parallel_argument(get_document_parser)
 
     # getDocuments [-f 'two days ago'] [-u Now] [-p 1] [-s 20]
     get_documents_parser = operation_subparser.add_parser(
@@ -82,6 +95,7 @@ def parse_arguments(args):
 
     add_range_filter_arguments(get_documents_parser)
     add_pagination_arguments(get_documents_parser)
+    add_all_pages_argument(get_documents_parser)
 
     # downloadSchema -id 123 [-v 2]
     download_schema_parser = operation_subparser.add_parser(
@@ -117,7 +131,7 @@ def parse_arguments(args):
     delete_schema_parser = operation_subparser.add_parser(
         "deleteSchema", help="Delete one or more schemas."
     )
-    add_multiple_identifier_argument(delete_schema_parser)
+    add_bulk_selection_arguments(delete_schema_parser)
     delete_schema_parser.add_argument(
         "-s",
         "--soft",
@@ -127,12 +141,17 @@ def parse_arguments(args):
         "always enabled by default. This means, that a schema is only revoked "
         "and will be permanently removed if deleting it a second time.",
     )
+    add_parallel_argument(
+        delete_schema_parser,
+        help_text="The max. number of concurrent delete requests if multiple schemas "
+        "are deleted. By default, schemas are deleted one after another.",
+    )
 
     # deleteDocument -id 123 [-soft]
     delete_document_parser = operation_subparser.add_parser(
         "deleteDocument", help="Delete one or more documents."
     )
-    add_multiple_identifier_argument(delete_document_parser)
+    add_bulk_selection_arguments(delete_document_parser)
     delete_document_parser.add_argument(
         "-s",
         "--soft",
@@ -142,20 +161,37 @@ def parse_arguments(args):
         "always enabled by default. This means, that a document is only revoked "
         "and will be permanently removed if deleting it a second time.",
     )
+    add_parallel_argument(
+        delete_document_parser,
+        help_text="The max. number of concurrent delete requests if multiple documents "
+        "are deleted. By default, documents are deleted one after another.",
+    )
+
+    add_cache_stats_operation(operation_subparser)
+    add_shell_operation(operation_subparser)
+    add_batch_operation(operation_subparser)
 
     add_global_arguments(parser)
 
-    return parser.parse_args(args)
+    return parser
 
 
-def main():
-    args = parse_arguments(sys.argv[1:])
+def parse_arguments(args):
+    return create_parser().parse_args(args)
+
 
-    # Determine client to use
-    service_client = MetaStoreClient(args.debug)
+def run_operation(args, service_client):
+    """
+    Perform the operation selected via command line with the provided client.
 
+    :param args: The parsed command line arguments.
+    :param service_client: The client used to perform the operation.
+    :return: A tuple of the rendered response and a list of failures, or None if the operation has already
+    written its output, e.g., into an output file.
+    """
     # Determine and call operation to apply
     response = None
+    failures = []
 
     if args.operation == "createSchema":
         # createSchema -m schema_record.json -pl schema.json
@@ -172,11 +208,13 @@ def main():
     elif args.operation == "getSchema":
         if len(args.identifier) > 1:
             # multiple ids provided
-            all_results = []
-            for identifier in args.identifier:
-                response = service_client.get(identifier, "schema", None, args.auth)
-                all_results += response
-            response = all_results
+            response, failures = fetch_all(
+                args.identifier,
+                lambda identifier: service_client.get(
+                    identifier, "schema", None, args.auth
+                ),
+                args.parallel,
+            )
         else:
             query_params = [get_query_param_entry("version", str(args.version))]
             response = service_client.get(
@@ -187,18 +225,27 @@ def main():
     elif args.operation == "getSchemas":
         # getSchemas [-f 'yesterday'] [-u 'now'] [-p 1] [-s 30]
         query_params = parse_query_params(args)
+        if args.all:
+            # write all pages one after another
+            pages = service_client.iterate_pages(
+                None, "schema", query_params, args.auth, args.prefetch
+            )
+            write_all_pages(service_client, pages, args)
+            service_client.report_request_count(args.operation)
+            return None
         response = service_client.get(None, "schema", query_params, args.auth)
         response = service_client.render_response(response, args.render_as)
     elif args.operation == "getDocument":
         # getDocument -i 123 [-v 1]
         if len(args.identifier) > 1:
             # multiple ids provided
-            all_results = []
-
-            for identifier in args.identifier:
-                response = service_client.get(identifier, "document", None, args.auth)
-                all_results += response
-            response = all_results
+            response, failures = fetch_all(
+                args.identifier,
+                lambda identifier: service_client.get(
+                    identifier, "document", None, args.auth
+                ),
+                args.parallel,
+            )
         else:
             query_params = [get_query_param_entry("version", str(args.version))]
             response = service_client.get(
@@ -220,18 +267,38 @@ def main():
                 get_query_param_entry("schemaId", ",".join(args.schemaIds))
             )
 
+        if args.all:
+            # write all pages one after another
+            pages = service_client.iterate_pages(
+                None, "document", query_params, args.auth, args.prefetch
+            )
+            write_all_pages(service_client, pages, args)
+            service_client.report_request_count(args.operation)
+            return None
         response = service_client.get(None, "document", query_params, args.auth)
         response = service_client.render_response(response, args.render_as)
     elif args.operation == "downloadSchema":
         # downloadSchema -id 123 [-v 1]
         response = service_client.download(
-            args.identifier, "schema", args.version, args.auth
+            args.identifier, "schema", args.version, args.auth, args.output
         )
+        if args.output:
+            # content was streamed directly into the output file
+            if response:
+                print("Output written to " + args.output)
+            service_client.report_request_count(args.operation)
+            return None
     elif args.operation == "downloadDocument":
         # downloadDocument -id 123 [-v 1]
         response = service_client.download(
-            args.identifier, "document", args.version, args.auth
+            args.identifier, "document", args.version, args.auth, args.output
         )
+        if args.output:
+            # content was streamed directly into the output file
+            if response:
+                print("Output written to " + args.output)
+            service_client.report_request_count(args.operation)
+            return None
     elif args.operation == "updateSchema":
         # updateSchema -id 123 -m schema_record.json -pl schema.json
         response = service_client.update(
@@ -245,19 +312,8 @@ def main():
         )
         response = service_client.render_response(response, args.render_as)
     elif args.operation == "deleteSchema":
-        # deleteSchema -id 123 [-soft]
-        if len(args.identifier) > 1:
-            # multiple ids provided
-            all_results = []
-            for identifier in args.identifier:
-                response = service_client.delete(
-                    identifier, "schema", args.soft, args.auth
-                )
-                if not response:
-                    service_client.print_error(
-                        "Schema " + identifier + " could not be deleted."
-                    )
-        else:
+        # deleteSchema -id 123 ... | --idsFile ids.txt [-soft] [-P 4]
+        if args.identifier and len(args.identifier) == 1 and not args.checkpoint:
             response = service_client.delete(
                 args.identifier[0], "schema", args.soft, args.auth
             )
@@ -265,20 +321,23 @@ def main():
                 service_client.print_error(
                     "Schema " + args.identifier[0] + " could not be deleted."
                 )
-    elif args.operation == "deleteDocument":
-        # deleteDocument -id 123 [-soft]
-        if len(args.identifier) > 1:
-            # multiple ids provided
-            all_results = []
-            for identifier in args.identifier:
-                response = service_client.delete(
-                    identifier, "document", args.soft, args.auth
-                )
-                if not response:
-                    service_client.print_error(
-                        "Document " + identifier + " could not be deleted."
-                    )
         else:
+            # multiple ids or a checkpoint provided, outcomes are written as JSON Lines while deleting
+            failed = run_bulk_delete(
+                args.identifier or read_identifiers(args.idsFile),
+                lambda identifier: service_client.delete(
+                    identifier, "schema", True, args.auth
+                )
+                or None,
+                args,
+            )
+            service_client.report_request_count(args.operation)
+            if failed:
+                exit(2)
+            return None
+    elif args.operation == "deleteDocument":
+        # deleteDocument -id 123 ... | --idsFile ids.txt [-soft] [-P 4]
+        if args.identifier and len(args.identifier) == 1 and not args.checkpoint:
             response = service_client.delete(
                 args.identifier[0], "document", args.soft, args.auth
             )
@@ -286,6 +345,50 @@ def main():
                 service_client.print_error(
                     "Document " + args.identifier[0] + " could not be deleted."
                 )
+        else:
+            # multiple ids or a checkpoint provided, outcomes are written as JSON Lines while deleting
+            failed = run_bulk_delete(
+                args.identifier or read_identifiers(args.idsFile),
+                lambda identifier: service_client.delete(
+                    identifier, "document", True, args.auth
+                )
+                or None,
+                args,
+            )
+            service_client.report_request_count(args.operation)
+            if failed:
+                exit(2)
+            return None
+    elif args.operation == "cacheStats":
+        # cacheStats
+        response = render_statistics(
+            service_client.get_response_cache_statistics(), args.render_as
+        )
+
+    return response, failures
+
+
+def process(args, service_client=None):
+    # Determine client to use, in shell mode the client of the shell is reused
+    if not service_client:
+        service_client = MetaStoreClient(args.debug)
+    service_client.apply_options(args.debug, args.cache)
+
+    if args.operation == "shell":
+        # shell, operations are read from stdin and performed with this client
+        run_shell(process, parse_arguments, service_client, args, "metastore> ")
+        return
+
+    if args.operation == "batch":
+        # batch -f operations.jsonl, operations are performed concurrently with this client
+        run_batch(run_operation, create_parser(), service_client, args)
+        service_client.report_request_count(args.operation)
+        return
+
+    result = run_operation(args, service_client)
+    if result is None:
+        return
+    response, failures = result
 
     if args.output:
         # write to file
@@ -294,6 +397,16 @@ def main():
         # print response to stdout
         print(response)
 
+    service_client.report_request_count(args.operation)
+
+    if failures:
+        report_failures(failures)
+        exit(2)
+
+
+def main():
+    run_cli(process, parse_arguments(sys.argv[1:]), "metastore")
+
 
 if __name__ == "__main__":
     main()
@@ -1,18 +1,26 @@
 import argparse
-import dateparser
 import sys
 from kitdm_pycli.helpers.typed_pid_maker_helper import TypedPidMakerClient
 from kitdm_pycli.helpers.url_utils import get_query_param_entry
+from kitdm_pycli.helpers.date_utils import format_query_date
 from kitdm_pycli.helpers.command_line_utils import add_global_arguments
+from kitdm_pycli.helpers.command_line_utils import run_cli
+from kitdm_pycli.helpers.command_line_utils import add_cache_stats_operation
+from kitdm_pycli.helpers.command_line_utils import add_shell_operation, run_shell
+from kitdm_pycli.helpers.command_line_utils import add_batch_operation, run_batch
 from kitdm_pycli.helpers.command_line_utils import add_single_identifier_argument
 from kitdm_pycli.helpers.command_line_utils import add_range_filter_arguments
 from kitdm_pycli.helpers.command_line_utils import add_multiple_identifier_argument
 from kitdm_pycli.helpers.command_line_utils import add_pagination_arguments
 from kitdm_pycli.helpers.command_line_utils import add_metadata_argument
-from kitdm_pycli.helpers.render_utils import render_to_file
+from kitdm_pycli.helpers.command_line_utils import add_parallel_argument
+from kitdm_pycli.helpers.command_line_utils import add_all_pages_argument
+from kitdm_pycli.helpers.render_utils import render_to_file, write_all_pages
+from kitdm_pycli.helpers.render_utils import render_statistics
+from kitdm_pycli.helpers.batch_utils import fetch_all, report_failures
 
 
-def parse_arguments(args):
+def create_parser():
     parser = argparse.ArgumentParser(
         description="Command line client interface for the Typed PID Maker service."
     )
@@ -43,6 +51,7 @@ def parse_arguments(args):
         help="List PIDs and their create/modification " "details for one or more PIDs.",
     )
     add_multiple_identifier_argument(get_pid_parser)
+    add_parallel_argument(get_pid_parser)
     get_pid_parser.add_argument(
         "-v",
         "--validate",
@@ -60,6 +69,7 @@ def parse_arguments(args):
         help="Get one or more known PIDs and their " "create/modification details.",
     )
     add_multiple_identifier_argument(get_known_pid_parser)
+    add_parallel_argument(get_known_pid_parser)
 
     # getKnownPids [-f 'yesterday'] [-u 'now'] [-mf 'last year] [-mu yesterday] [-p 1] [-s 30]
     get_known_pids_parser = operation_subparser.add_parser(
@@ -92,6 +102,7 @@ def parse_arguments(args):
         "form like 'two days ago'.",
     )
     add_pagination_arguments(get_known_pids_parser)
+    add_all_pages_argument(get_known_pids_parser)
 
     # updateRecord -id 123 -m pid-record.json
     update_record_parser = operation_subparser.add_parser(
@@ -104,19 +115,31 @@ def parse_arguments(args):
     add_single_identifier_argument(update_record_parser)
     add_metadata_argument(update_record_parser, required=True)
 
+    add_cache_stats_operation(operation_subparser)
+    add_shell_operation(operation_subparser)
+    add_batch_operation(operation_subparser)
+
     add_global_arguments(parser)
 
-    return parser.parse_args(args)
+    return parser
 
 
-def main():
-    args = parse_arguments(sys.argv[1:])
+def parse_arguments(args):
+    return create_parser().parse_args(args)
+
 
-    # Determine client to use
-    serviceClient = TypedPidMakerClient(args.debug)
+def run_operation(args, serviceClient):
+    """
+    Perform the operation selected via command line with the provided client.
 
+    :param args: The parsed command line arguments.
+    :param serviceClient: The client used to perform the operation.
+    :return: A tuple of the rendered response and a list of failures, or None if the operation has already
+    written its output, e.g., into an output file.
+    """
     # Determine and call operation to apply
     response = None
+    failures = []
 
     if args.operation == "createRecord":
         # createRecord [-m pid-record.json] [-dry]
@@ -132,11 +155,13 @@ def main():
             query_params.append(get_query_param_entry("validation", "true"))
 
         if len(args.identifier) > 1:
-            allResults = []
-            for identifier in args.identifier:
-                response = serviceClient.get(identifier, "pid", query_params, args.auth)
-                allResults += response
-            response = allResults
+            response, failures = fetch_all(
+                args.identifier,
+                lambda identifier: serviceClient.get(
+                    identifier, "pid", query_params, args.auth
+                ),
+                args.parallel,
+            )
         else:
             response = serviceClient.get(
                 args.identifier[0], "pid", query_params, args.auth
@@ -147,11 +172,13 @@ def main():
     elif args.operation == "getKnownPid":
         # getKnownPid -id 123
         if len(args.identifier) > 1:
-            allResults = []
-            for identifier in args.identifier:
-                response = serviceClient.get(identifier, "known", None, args.auth)
-                allResults += response
-            response = allResults
+            response, failures = fetch_all(
+                args.identifier,
+                lambda identifier: serviceClient.get(
+                    identifier, "known", None, args.auth
+                ),
+                args.parallel,
+            )
         else:
             response = serviceClient.get(args.identifier[0], "known", None, args.auth)
 
@@ -161,22 +188,18 @@ def main():
         query_params = []
 
         if args.fromDate:
-            from_date = dateparser.parse(args.fromDate)
-            from_date = from_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            from_date = format_query_date(args.fromDate)
             query_params.append(get_query_param_entry("created_after", from_date))
         if args.untilDate:
-            until_date = dateparser.parse(args.untilDate)
-            until_date = until_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            until_date = format_query_date(args.untilDate)
             query_params.append(get_query_param_entry("created_before", until_date))
         if args.modifiedFromDate:
-            modified_from_date = dateparser.parse(args.modifiedFromDate)
-            modified_from_date = modified_from_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            modified_from_date = format_query_date(args.modifiedFromDate)
             query_params.append(
                 get_query_param_entry("modified_after", modified_from_date)
             )
         if args.modifiedUntilDate:
-            modified_until_date = dateparser.parse(args.modifiedUntilDate)
-            modified_until_date = modified_until_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            modified_until_date = format_query_date(args.modifiedUntilDate)
             query_params.append(
                 get_query_param_entry("modified_until", modified_until_date)
             )
@@ -184,12 +207,50 @@ def main():
         query_params.append(get_query_param_entry("page", str(args.page)))
         query_params.append(get_query_param_entry("size", str(args.pageSize)))
 
+        if args.all:
+            # write all pages one after another
+            pages = serviceClient.iterate_pages(
+                None, "known", query_params, args.auth, args.prefetch
+            )
+            write_all_pages(serviceClient, pages, args)
+            serviceClient.report_request_count(args.operation)
+            return None
         response = serviceClient.get(None, "known", query_params, args.auth)
         response = serviceClient.render_response(response, args.render_as)
     elif args.operation == "updateRecord":
         # updateRecord -id 123 -m pid-record.json
         response = serviceClient.update(args.identifier, args.metadata, args.auth)
         response = serviceClient.render_response(response, args.render_as)
+    elif args.operation == "cacheStats":
+        # cacheStats
+        response = render_statistics(
+            serviceClient.get_response_cache_statistics(), args.render_as
+        )
+
+    return response, failures
+
+
+def process(args, serviceClient=None):
+    # Determine client to use, in shell mode the client of the shell is reused
+    if not serviceClient:
+        serviceClient = TypedPidMakerClient(args.debug)
+    serviceClient.apply_options(args.debug, args.cache)
+
+    if args.operation == "shell":
+        # shell, operations are read from stdin and performed with this client
+        run_shell(process, parse_arguments, serviceClient, args, "typed-pid-maker> ")
+        return
+
+    if args.operation == "batch":
+        # batch -f operations.jsonl, operations are performed concurrently with this client
+        run_batch(run_operation, create_parser(), serviceClient, args)
+        serviceClient.report_request_count(args.operation)
+        return
+
+    result = run_operation(args, serviceClient)
+    if result is None:
+        return
+    response, failures = result
 
     if args.output:
         render_to_file(response, args)
@@ -197,6 +258,16 @@ def main():
         # print response to stdout
         print(response)
 
+    serviceClient.report_request_count(args.operation)
+
+    if failures:
+        report_failures(failures)
+        exit(2)
+
+
+def main():
+    run_cli(process, parse_arguments(sys.argv[1:]), "typed_pid_maker")
+
 
 if __name__ == "__main__":
     main()
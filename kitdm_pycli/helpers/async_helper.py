@@ -0,0 +1,99 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from kitdm_pycli.helpers.service_helper import ServiceClient
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from kitdm_pycli.helpers.metastore_helper import MetaStoreClient
+from kitdm_pycli.helpers.typed_pid_maker_helper import TypedPidMakerClient
+from kitdm_pycli.helpers.exceptions import PyCliError
+
+
+class AsyncServiceClient:
+    """
+    Asynchronous variant of a service client for the use in asyncio applications. All operations of the wrapped
+    synchronous client are executed in a thread pool, such that request building, authentication, connection pooling
+    and caches are shared with the synchronous client. Any number of operations can be awaited concurrently on one
+    event loop, whereas at most 'max_concurrency' of them are sent at the same time. Failures are raised as
+    PyCliError.
+    """
+
+    def __init__(self, client: ServiceClient, max_concurrency: Optional[int] = None):
+        """
+        :param client: The synchronous client, e.g., a BaseRepoClient.
+        :param max_concurrency: The max. number of concurrent requests, by default the connection pool size
+        configured in the 'http' section of the properties.
+        """
+        self.client = client
+        self.max_concurrency = max_concurrency or int(
+            client.http_properties["pool_maxsize"]
+        )
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        # created at first use, as it must belong to the running event loop
+        self.semaphore = None
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Execute a function of the synchronous client in the thread pool.
+
+        :param function: The function to call, e.g., self.client.get.
+        :return: The result of the function.
+        :raises PyCliError: If the operation failed.
+        """
+        if not self.semaphore:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self.executor, functools.partial(function, *args, **kwargs)
+            )
+        if result is None:
+            raise PyCliError("Operation failed, no result received.")
+        return result
+
+    async def create(self, *args, **kwargs):
+        return await self.run(self.client.create, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self.run(self.client.get, *args, **kwargs)
+
+    async def update(self, *args, **kwargs):
+        return await self.run(self.client.update, *args, **kwargs)
+
+    async def patch(self, *args, **kwargs):
+        return await self.run(self.client.patch, *args, **kwargs)
+
+    async def delete(self, *args, **kwargs):
+        return await self.run(self.client.delete, *args, **kwargs)
+
+    async def download(self, *args, **kwargs):
+        return await self.run(self.client.download, *args, **kwargs)
+
+    async def close(self):
+        """
+        Wait for all running operations and close the pooled connections.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.executor.shutdown)
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+class AsyncBaseRepoClient(AsyncServiceClient):
+    def __init__(self, debug=False, max_concurrency: Optional[int] = None):
+        AsyncServiceClient.__init__(self, BaseRepoClient(debug), max_concurrency)
+
+
+class AsyncMetaStoreClient(AsyncServiceClient):
+    def __init__(self, debug=False, max_concurrency: Optional[int] = None):
+        AsyncServiceClient.__init__(self, MetaStoreClient(debug), max_concurrency)
+
+
+class AsyncTypedPidMakerClient(AsyncServiceClient):
+    def __init__(self, debug=False, max_concurrency: Optional[int] = None):
+        AsyncServiceClient.__init__(self, TypedPidMakerClient(debug), max_concurrency)
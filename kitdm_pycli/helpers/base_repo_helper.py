@@ -1,10 +1,19 @@
 import json
 import ntpath
+import os
+import time
 from kitdm_pycli.helpers.service_helper import ServiceClient
 from typing import Optional
 from kitdm_pycli.helpers.render_utils import render_as_table, render_as_list
 from kitdm_pycli.helpers.file_utils import check_json_file, check_file_exists
-from kitdm_pycli.helpers.url_utils import add_query_parameters
+from kitdm_pycli.helpers.file_utils import list_local_files
+from kitdm_pycli.helpers.batch_utils import fetch_all, print_transfer_summary
+from concurrent.futures import ThreadPoolExecutor
+from kitdm_pycli.helpers.url_utils import add_query_parameters, get_query_param_entry
+from kitdm_pycli.helpers.hash_utils import matches_hash, split_hash, HashCache
+from kitdm_pycli.helpers.cache_utils import get_cache_dir
+from kitdm_pycli.helpers.json_patch_utils import apply_patch, JsonPatchError
+from kitdm_pycli.helpers.multipart_utils import MultipartStream, ProgressReporter
 
 
 def id_for_element(elem):
@@ -19,11 +28,14 @@ class BaseRepoClient(ServiceClient):
     Client implementation for accessing a base-repo service instance.
     """
 
+    properties_section = "base_repo"
+
     def __init__(self, debug=False):
         ServiceClient.__init__(self, debug)
-        self.server_url = self.properties["base_repo"]["server_url"]
-        self.tableItemsResource = self.properties["base_repo"]["tableItemsResource"]
-        self.tableItemsContent = self.properties["base_repo"]["tableItemsContent"]
+        service_properties = self.properties[self.properties_section]
+        self.server_url = service_properties["server_url"]
+        self.tableItemsResource = service_properties["tableItemsResource"]
+        self.tableItemsContent = service_properties["tableItemsContent"]
 
     def create(
         self,
@@ -32,6 +44,9 @@ class BaseRepoClient(ServiceClient):
         payload: Optional[str],
         path: Optional[str],
         auth: bool = False,
+        progress: bool = False,
+        force: bool = False,
+        echo: bool = True,
     ):
         """
         Create operation for base-repo resources and content information. Depending on the arguments, either a
@@ -46,6 +61,10 @@ class BaseRepoClient(ServiceClient):
         :param payload: The payload, i.e., a local file path, which will be uploaded during content creation.
         :param path: The relative path where the file will be remotely accessible, e.g., file.txt or folder/file.txt.
         :param auth: True|False Either perform or skip authorization.
+        :param progress: True|False Either print the upload progress to stderr or not.
+        :param force: True|False Either overwrite existing content at the same relative path or not.
+        :param echo: True|False Either return the created content information or an empty list, which saves one
+        request.
         :return: A single data resource or content information metadata element in a list.
         """
         metadata_content = None
@@ -96,19 +115,30 @@ class BaseRepoClient(ServiceClient):
                     )
                     return None
 
-            files = None
-            if metadata and payload:
-                # content information and file provided
-                files = {"metadata": open(metadata, "rb"), "file": open(payload, "rb")}
-            elif not metadata and payload:
-                # only file provided
-                files = {"file": open(payload, "rb")}
-            elif metadata and not payload:
-                # only content information provided (file references inside)
-                files = {"metadata": open(metadata, "rb")}
+            # the multipart body is streamed from disk while uploading
+            fields = []
+            if metadata:
+                # content information provided (file references inside if no payload is provided)
+                fields.append(("metadata", ntpath.basename(metadata), metadata, None))
+            if payload:
+                # file provided
+                fields.append(("file", ntpath.basename(payload), payload, None))
+            body = MultipartStream(fields)
+            if progress:
+                body.progress = ProgressReporter(len(body))
+            headers["Content-Type"] = body.content_type
 
             # do create new content
-            self.do_post(self.server_url, content_path, headers, files)
+            try:
+                post_path = content_path
+                if force:
+                    post_path += "?force=true"
+                self.do_post(self.server_url, post_path, headers, body)
+            finally:
+                body.close()
+            del headers["Content-Type"]
+            if not echo:
+                return []
             # as post does not return the result, we do an additional GET now to obtain the content information
             headers["Accept"] = "application/vnd.datamanager.content-information+json"
             resource_response = self.do_get(self.server_url, content_path, headers)
@@ -120,6 +150,169 @@ class BaseRepoClient(ServiceClient):
 
         return resource_response_json
 
+    def upload_directory(
+        self,
+        identifier: str,
+        source: str,
+        path: Optional[str],
+        include: Optional[list] = None,
+        exclude: Optional[list] = None,
+        parallel: int = 4,
+        auth: bool = False,
+    ):
+        """
+        Upload all files below a local folder to an existing data resource. The folder structure is kept, i.e., the
+        path of each file relative to the source folder is used as relative path on the server, optionally below the
+        provided path. Files are uploaded by a pool of workers sharing the pooled session of this client. A summary
+        of the transfer is printed to stderr.
+
+        :param identifier: The identifier of an existing resource.
+        :param source: The local folder to upload.
+        :param path: An optional relative path on the server, e.g., folder/, below which all files are stored.
+        :param include: An optional list of glob patterns. If provided, only matching files are uploaded.
+        :param exclude: An optional list of glob patterns. Matching files are not uploaded.
+        :param parallel: The max. number of concurrent uploads.
+        :param auth: True|False Either perform or skip authorization.
+        :return: A tuple of all created content information elements in a list and a list of (path, message) tuples
+        for failed uploads.
+        """
+        if not os.path.isdir(source):
+            self.print_error("Source folder " + source + " not found.")
+            return None, []
+
+        target_path = ""
+        if path and path.strip("/"):
+            target_path = path.strip("/") + "/"
+
+        relative_paths = list_local_files(source, include, exclude)
+        self.print_debug(
+            "Uploading " + str(len(relative_paths)) + " file(s) from " + source + "."
+        )
+
+        start = time.monotonic()
+        results, failures = fetch_all(
+            relative_paths,
+            lambda relative_path: self.create(
+                identifier,
+                None,
+                os.path.join(source, relative_path),
+                target_path + relative_path,
+                auth,
+            ),
+            parallel,
+        )
+        elapsed = time.monotonic() - start
+
+        failed = set(relative_path for relative_path, _ in failures)
+        uploaded = [p for p in relative_paths if p not in failed]
+        size = sum(os.path.getsize(os.path.join(source, p)) for p in uploaded)
+        print_transfer_summary("Uploaded", len(uploaded), size, elapsed)
+
+        return results, failures
+
+    def sync_content(
+        self,
+        identifier: str,
+        source: str,
+        path: Optional[str],
+        include: Optional[list] = None,
+        exclude: Optional[list] = None,
+        parallel: int = 4,
+        auth: bool = False,
+    ):
+        """
+        Synchronize a local folder with the content of a data resource by only uploading new or changed files. Local
+        files are compared to the content listing of the resource by size and, if the size is equal, by checksum.
+        Checksums of local files are computed concurrently and cached in the local cache folder, such that files
+        whose modification time and size did not change are not hashed again. Changed files are overwritten on the
+        server. A summary of the transfer is printed to stderr.
+
+        :param identifier: The identifier of an existing resource.
+        :param source: The local folder to synchronize.
+        :param path: An optional relative path on the server, e.g., folder/, corresponding to the source folder.
+        :param include: An optional list of glob patterns. If provided, only matching files are synchronized.
+        :param exclude: An optional list of glob patterns. Matching files are not synchronized.
+        :param parallel: The max. number of concurrent checksum computations and uploads.
+        :param auth: True|False Either perform or skip authorization.
+        :return: A tuple of all created content information elements in a list and a list of (path, message) tuples
+        for failed uploads.
+        """
+        if not os.path.isdir(source):
+            self.print_error("Source folder " + source + " not found.")
+            return None, []
+
+        start = time.monotonic()
+        target_path = ""
+        if path and path.strip("/"):
+            target_path = path.strip("/") + "/"
+
+        remote = {}
+        for element in self.list_content(identifier, target_path, auth):
+            remote[element["relativePath"].lstrip("/")] = element
+
+        # files which are new or differ in size need no checksum comparison
+        uploads = {}
+        candidates = []
+        for relative_path in list_local_files(source, include, exclude):
+            element = remote.get(target_path + relative_path)
+            if not element:
+                uploads[relative_path] = False
+            elif element.get("size") != os.path.getsize(
+                os.path.join(source, relative_path)
+            ):
+                uploads[relative_path] = True
+            else:
+                candidates.append(relative_path)
+
+        hash_cache = HashCache(
+            os.path.join(get_cache_dir(self.properties), "hashes.json")
+        )
+
+        def is_unchanged(relative_path):
+            value = remote[target_path + relative_path].get("hash")
+            if not value:
+                return False
+            algorithm, digest = split_hash(value)
+            local_path = os.path.join(source, relative_path)
+            try:
+                return hash_cache.get_hash(local_path, algorithm) == digest
+            except ValueError:
+                # unsupported hash algorithm
+                return False
+
+        with ThreadPoolExecutor(max_workers=max(parallel, 1)) as executor:
+            unchanged = list(executor.map(is_unchanged, candidates))
+        hash_cache.save()
+
+        for relative_path, skip in zip(candidates, unchanged):
+            if not skip:
+                uploads[relative_path] = True
+        self.print_debug(
+            str(len(uploads)) + " new or changed file(s) found in " + source + "."
+        )
+
+        results, failures = fetch_all(
+            sorted(uploads),
+            lambda relative_path: self.create(
+                identifier,
+                None,
+                os.path.join(source, relative_path),
+                target_path + relative_path,
+                auth,
+                force=uploads[relative_path],
+            ),
+            parallel,
+        )
+        elapsed = time.monotonic() - start
+
+        failed = set(relative_path for relative_path, _ in failures)
+        uploaded = [p for p in uploads if p not in failed]
+        size = sum(os.path.getsize(os.path.join(source, p)) for p in uploaded)
+        skipped = unchanged.count(True)
+        print_transfer_summary("Uploaded", len(uploaded), size, elapsed, skipped)
+
+        return results, failures
+
     def update(
         self,
         identifier: str,
@@ -149,7 +342,8 @@ class BaseRepoClient(ServiceClient):
             ServiceClient.print_error("Provided metadata seems to be invalid.")
             return None
 
-        headers = {"Content-Type": "application/json"}
+        # the same Accept header as for get, such that an ETag obtained before is reused
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
 
         # authenticate if required, stop if login fails
         if not self.login(auth, headers):
@@ -177,7 +371,13 @@ class BaseRepoClient(ServiceClient):
         return resource_response_json
 
     def patch(
-        self, identifier: str, payload: str, path: Optional[str], auth: bool = False
+        self,
+        identifier: str,
+        payload: str,
+        path: Optional[str],
+        auth: bool = False,
+        echo: bool = True,
+        local_echo: bool = False,
     ):
         """
         Path data resource or content information element. Compared to a full update, a patch operation only
@@ -188,6 +388,9 @@ class BaseRepoClient(ServiceClient):
         :param payload: The patch instructions.
         :param path: The relative path of the content information element to patch, e.g., file.txt or folder/file.txt.
         :param auth: True|False Either perform or skip authorization.
+        :param echo: True|False Either return the patched element or an empty list, which saves one request.
+        :param local_echo: True|False Either apply the patch instructions to the element obtained before patching
+        or request the patched element from the server afterwards.
         :return: A single data resource or content information element in a list.
         """
         metadata_patch = check_json_file(payload)
@@ -200,31 +403,51 @@ class BaseRepoClient(ServiceClient):
 
         if not path:
             # no path, patch data resource
-            # obtain etag from resource
             resource_path = "api/v1/dataresources/" + identifier
             headers["Accept"] = "application/json"
-            etag = self.do_get_etag(self.server_url, resource_path, headers)
-
-            headers["If-Match"] = etag
-            # do patch with metadata_patch
-            if self.do_patch(self.server_url, resource_path, headers, metadata_patch):
-                # obtain patched resource
-                resource_response = self.do_get(self.server_url, resource_path, headers)
-                response_json = json.loads(resource_response)
         else:
             # with path, patch content information
-            # obtain etag for content information
             resource_path = (
                 "api/v1/dataresources/" + identifier + "/data/" + path.lstrip("/")
             )
             headers["Accept"] = "application/vnd.datamanager.content-information+json"
-            etag = self.do_get_etag(self.server_url, resource_path, headers)
-            headers["If-Match"] = etag
-            # do patch with metadata_patch
-            if self.do_patch(self.server_url, resource_path, headers, metadata_patch):
-                # obtain patched resource
-                resource_response = self.do_get(self.server_url, resource_path, headers)
-                response_json = json.loads(resource_response)
+
+        pre_image = None
+        if echo and local_echo:
+            # the element before patching, obtaining it also provides the etag
+            pre_image = self.get_document(self.server_url, resource_path, headers)
+        # obtain etag
+        etag = self.do_get_etag(self.server_url, resource_path, headers)
+        headers["If-Match"] = etag
+        # do patch with metadata_patch
+        url = self.server_url + resource_path
+        try:
+            patched = self.do_patch(
+                self.server_url, resource_path, headers, metadata_patch
+            )
+        finally:
+            with self.etag_cache_lock:
+                retried = url in self.precondition_retries
+                self.precondition_retries.discard(url)
+        if not patched:
+            return None
+        # the document obtained before patching is outdated
+        self.forget_document(self.server_url, resource_path, headers)
+        if not echo:
+            return []
+
+        response_json = None
+        if pre_image is not None and not retried:
+            # patch was applied to the element obtained before, compute the result locally
+            try:
+                response_json = apply_patch(pre_image, json.loads(metadata_patch))
+            except (ValueError, JsonPatchError) as e:
+                self.print_debug("Failed to apply patch locally: " + str(e))
+        if response_json is None:
+            # obtain patched resource
+            del headers["If-Match"]
+            resource_response = self.do_get(self.server_url, resource_path, headers)
+            response_json = json.loads(resource_response)
 
         # ensure a list to be returned
         if isinstance(response_json, dict):
@@ -280,7 +503,12 @@ class BaseRepoClient(ServiceClient):
         return response_json
 
     def download(
-        self, resource_id: str, path: str, version: Optional[int], auth: bool = False
+        self,
+        resource_id: str,
+        path: str,
+        version: Optional[int],
+        auth: bool = False,
+        output: Optional[str] = None,
     ):
         """
         Download the file referred by a specific content information element, optionally in a specific version.
@@ -292,7 +520,9 @@ class BaseRepoClient(ServiceClient):
         server. The version argument is only used while accessing single content information elements and will be
         ignored when accessing a relative path.
         :param auth: True|False Either perform or skip authorization.
-        :return: The downloaded bitstream, which can be further processed or stored in a local file.
+        :param output: Optional path of a local file. If provided, the content is streamed directly into this file.
+        :return: The downloaded bitstream, which can be further processed or stored in a local file, or the output
+        path if an output file was provided.
         """
         headers = {}
         if path.endswith("/"):
@@ -312,8 +542,91 @@ class BaseRepoClient(ServiceClient):
         if not self.login(auth, headers):
             return None
 
+        if output:
+            return self.do_download(self.server_url, resource_path, headers, output)
+
         return self.do_get(self.server_url, resource_path, headers)
 
+    def list_content(self, identifier: str, path: Optional[str], auth: bool = False):
+        """
+        Obtain all content information elements of a data resource below the provided path by requesting all pages
+        of the content listing.
+
+        :param identifier: The identifier of the data resource.
+        :param path: The relative path of a folder, e.g., folder/. If omitted, the entire content is listed.
+        :param auth: True|False Either perform or skip authorization.
+        :return: All content information elements in a list.
+        """
+        folder = "/"
+        if path and path.strip("/"):
+            folder = path.strip("/") + "/"
+
+        query_params = [
+            get_query_param_entry("page", "0"),
+            get_query_param_entry("size", "100"),
+        ]
+        result = []
+        for elements in self.iterate_pages(identifier, folder, query_params, auth):
+            result += elements
+        return result
+
+    def mirror_content(
+        self,
+        identifier: str,
+        path: Optional[str],
+        destination: str,
+        parallel: int = 4,
+        auth: bool = False,
+    ):
+        """
+        Mirror the content of a data resource into a local folder. All content information elements below the provided
+        path are listed and the referenced files are downloaded concurrently, each streamed directly to disk. The
+        relative path of each element is kept below the destination folder. Files that already exist locally with a
+        checksum matching the 'hash' attribute of their content information are skipped. A summary of the transfer
+        is printed to stderr.
+
+        :param identifier: The identifier of the data resource.
+        :param path: The relative path of a folder, e.g., folder/. If omitted, the entire content is mirrored.
+        :param destination: The local folder receiving the content.
+        :param parallel: The max. number of concurrent downloads.
+        :param auth: True|False Either perform or skip authorization.
+        :return: A tuple of the content information elements of all downloaded files in a list and a list of
+        (path, message) tuples for failed downloads.
+        """
+        start = time.monotonic()
+        elements = self.list_content(identifier, path, auth)
+        destination = os.path.abspath(destination)
+
+        downloads = {}
+        skipped = 0
+        for element in elements:
+            relative_path = element["relativePath"].lstrip("/")
+            local_path = os.path.abspath(os.path.join(destination, relative_path))
+            if not local_path.startswith(destination + os.sep):
+                self.print_error(
+                    "Skipping invalid relative path " + relative_path + "."
+                )
+                continue
+            if matches_hash(local_path, element.get("hash")):
+                self.print_debug("Skipping unchanged file " + relative_path + ".")
+                skipped += 1
+                continue
+            downloads[relative_path] = (element, local_path)
+
+        def download_element(relative_path):
+            element, local_path = downloads[relative_path]
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            if self.download(identifier, relative_path, None, auth, local_path):
+                return [element]
+            return None
+
+        results, failures = fetch_all(list(downloads), download_element, parallel)
+        elapsed = time.monotonic() - start
+
+        size = sum(element.get("size") or 0 for element in results)
+        print_transfer_summary("Downloaded", len(results), size, elapsed, skipped)
+        return results, failures
+
     def delete(
         self,
         identifier: str,
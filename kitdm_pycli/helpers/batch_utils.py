@@ -0,0 +1,587 @@
+import io
+import json
+import os
+import re
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional
+from kitdm_pycli.helpers.multipart_utils import format_size
+from kitdm_pycli.helpers.exceptions import InputFileError, PyCliError
+
+
+def fetch_single(identifier, fetch):
+    """
+    Call the provided fetch function for a single identifier and catch all errors which would otherwise stop the
+    entire batch, i.e., errors of the service as well as local ones, e.g., an unwritable file or an invalid response.
+
+    :param identifier: The identifier to fetch.
+    :param fetch: A function receiving the identifier and returning a list of results.
+    :return: A tuple of the result list (or None) and an error message (or None).
+    """
+    try:
+        result = fetch(identifier)
+    except (PyCliError, OSError, ValueError) as e:
+        return None, str(e)
+    if result is None:
+        return None, "No result received."
+    return result, None
+
+
+def fetch_all(identifiers, fetch, parallel=1):
+    """
+    Fetch multiple identifiers, either sequentially or with up to 'parallel' concurrent requests. The order of the
+    results corresponds to the order of the provided identifiers. Failures for single identifiers do not abort the
+    batch but are collected and returned together with the results.
+
+    :param identifiers: A list of identifiers.
+    :param fetch: A function receiving one identifier and returning a list of results.
+    :param parallel: The max. number of concurrent requests.
+    :return: A tuple of all results in a single list and a list of (identifier, message) tuples for failed ones.
+    """
+    if parallel and parallel > 1:
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            outcomes = list(
+                executor.map(
+                    lambda identifier: fetch_single(identifier, fetch), identifiers
+                )
+            )
+    else:
+        outcomes = [fetch_single(identifier, fetch) for identifier in identifiers]
+
+    all_results = []
+    failures = []
+    for identifier, (result, error) in zip(identifiers, outcomes):
+        if error:
+            failures.append((identifier, error))
+        else:
+            all_results += result
+
+    return all_results, failures
+
+
+def report_failures(failures):
+    """
+    Print all collected failures to stderr, one line per identifier.
+
+    :param failures: A list of (identifier, message) tuples.
+    """
+    if not failures:
+        return
+    print(str(len(failures)) + " request(s) failed:", file=sys.stderr)
+    for identifier, message in failures:
+        print("  " + identifier + ": " + message, file=sys.stderr)
+
+
+def print_transfer_summary(
+    label: str, files: int, size: int, elapsed: float, skipped: int = 0
+):
+    """
+    Print the number of transferred files and bytes together with the achieved throughput to stderr.
+
+    :param label: The kind of transfer, e.g., 'Uploaded'.
+    :param files: The number of transferred files.
+    :param size: The number of transferred bytes.
+    :param elapsed: The duration of the transfer in seconds.
+    :param skipped: The number of files skipped as they were unchanged.
+    """
+    elapsed = max(elapsed, 1e-6)
+    message = "{} {} file(s), {} in {:.2f}s ({:.1f} files/s, {}/s)".format(
+        label,
+        files,
+        format_size(size),
+        elapsed,
+        files / elapsed,
+        format_size(size / elapsed),
+    )
+    if skipped:
+        message += ", " + str(skipped) + " unchanged file(s) skipped"
+    print(message + ".", file=sys.stderr)
+
+
+def read_identifiers(path: str):
+    """
+    Lazily read identifiers from a text file containing one identifier per line. Empty lines are ignored.
+
+    :param path: The path of the file or '-' for reading from stdin.
+    :return: A generator yielding the identifiers.
+    """
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        for line in f:
+            identifier = line.strip()
+            if identifier:
+                yield identifier
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+class Checkpoint:
+    """
+    Text file listing all identifiers which were already processed successfully, one per line. Identifiers are
+    appended as soon as they are finished, such that an interrupted bulk operation can be resumed by skipping them.
+    """
+
+    def __init__(self, checkpoint_file: str):
+        self.finished = set()
+        if os.path.exists(checkpoint_file):
+            with open(checkpoint_file) as f:
+                self.finished = {line.strip() for line in f if line.strip()}
+        self.file = open(checkpoint_file, "a")
+
+    def __contains__(self, identifier):
+        return identifier in self.finished
+
+    def add(self, identifier: str):
+        self.finished.add(identifier)
+        self.file.write(identifier + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def run_bulk(identifiers, operation, parallel=1, checkpoint=None, stream=None):
+    """
+    Apply an operation to many identifiers with up to 'parallel' concurrent executions. Identifiers are consumed
+    lazily and only a bounded number of operations is pending at any time, such that neither identifiers nor results
+    are collected in memory. The outcome of each identifier is written as soon as it is available as one JSON line
+    containing the identifier and either the result or an error message. The order of the lines may differ from the
+    order of the identifiers.
+
+    An operation may consist of multiple stages, e.g., revoking and purging a resource. The next stage of an
+    identifier is started as soon as its previous stage has finished, such that different stages of different
+    identifiers are running at the same time.
+
+    :param identifiers: An iterable of identifiers, e.g., as returned by read_identifiers.
+    :param operation: A function receiving one identifier and returning a result, which is None on failure, or a
+    list of such functions applied one after another.
+    :param parallel: The max. number of concurrent operations.
+    :param checkpoint: An optional Checkpoint. Identifiers contained are skipped, finished ones are added.
+    :param stream: The stream receiving the outcomes, stdout by default.
+    :return: A tuple of the numbers of succeeded, failed and skipped identifiers.
+    """
+    stream = stream if stream else sys.stdout
+    parallel = max(parallel or 1, 1)
+    stages = operation if isinstance(operation, (list, tuple)) else [operation]
+    counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+    # future -> (identifier, stage index)
+    pending = {}
+
+    def write_outcome(identifier, result, error):
+        if error:
+            counts["failed"] += 1
+            outcome = {"id": identifier, "error": error}
+        else:
+            counts["succeeded"] += 1
+            outcome = {"id": identifier, "result": result}
+            if checkpoint:
+                checkpoint.add(identifier)
+        stream.write(json.dumps(outcome) + "\n")
+        stream.flush()
+
+    def process_finished(executor):
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            identifier, stage = pending.pop(future)
+            result, error = future.result()
+            if not error and stage + 1 < len(stages):
+                next_future = executor.submit(
+                    fetch_single, identifier, stages[stage + 1]
+                )
+                pending[next_future] = (identifier, stage + 1)
+            else:
+                write_outcome(identifier, result, error)
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        for identifier in identifiers:
+            if checkpoint and identifier in checkpoint:
+                counts["skipped"] += 1
+                continue
+            future = executor.submit(fetch_single, identifier, stages[0])
+            pending[future] = (identifier, 0)
+            while len(pending) >= 2 * parallel:
+                # wait for some operations to finish before consuming more identifiers
+                process_finished(executor)
+        while pending:
+            process_finished(executor)
+
+    return counts["succeeded"], counts["failed"], counts["skipped"]
+
+
+def print_bulk_summary(label: str, succeeded: int, failed: int, skipped: int):
+    """
+    Print the outcome of a bulk operation to stderr.
+
+    :param label: The performed operation, e.g., 'Patched'.
+    :param succeeded: The number of successfully processed identifiers.
+    :param failed: The number of failed identifiers.
+    :param skipped: The number of identifiers skipped as they were contained in the checkpoint.
+    """
+    message = "{} {} element(s), {} failed".format(label, succeeded, failed)
+    if skipped:
+        message += ", " + str(skipped) + " skipped according to checkpoint"
+    print(message + ".", file=sys.stderr)
+
+
+def run_bulk_operation(identifiers, operation, args, label: str) -> int:
+    """
+    Run a bulk operation as configured via command line, i.e., with args.parallel concurrent operations, an
+    optional checkpoint file provided via args.checkpoint, and outcomes written to args.output or stdout. A summary
+    is printed to stderr afterwards.
+
+    :param identifiers: An iterable of identifiers.
+    :param operation: A function or a list of functions (stages) as accepted by run_bulk.
+    :param args: The parsed command line arguments.
+    :param label: The performed operation used in the summary, e.g., 'Patched'.
+    :return: The number of failed identifiers.
+    """
+    checkpoint = Checkpoint(args.checkpoint) if args.checkpoint else None
+    stream = open(args.output, "w") if args.output else None
+    try:
+        succeeded, failed, skipped = run_bulk(
+            identifiers, operation, args.parallel, checkpoint, stream
+        )
+    finally:
+        if checkpoint:
+            checkpoint.close()
+        if stream:
+            stream.close()
+    print_bulk_summary(label, succeeded, failed, skipped)
+    return failed
+
+
+def run_bulk_delete(identifiers, delete, args) -> int:
+    """
+    Delete many elements as bulk operation configured via command line. If args.soft is False, each element is
+    deleted twice, where revoking some elements and purging already revoked ones happens at the same time.
+
+    :param identifiers: An iterable of identifiers.
+    :param delete: A function receiving one identifier and deleting the element once, i.e., revoking or purging it.
+    :param args: The parsed command line arguments.
+    :return: The number of failed identifiers.
+    """
+    stages = [delete] if args.soft else [delete, delete]
+    return run_bulk_operation(identifiers, stages, args, "Deleted")
+
+
+# reference to the result of another manifest entry, e.g., ${resource.id}
+REFERENCE_PATTERN = re.compile(r"\$\{([^}.]+)(?:\.([^}]*))?\}")
+
+
+def read_manifest(path: str) -> list:
+    """
+    Read a manifest in JSON Lines format, where each line describes one operation, e.g.,
+    {"ref": "resource", "operation": "createResource", "args": {"metadata": "resource.json"}}. Arguments are provided
+    either as dictionary of option names and values or as list of command line arguments. String values may refer to
+    results of previous lines via ${ref.path}, e.g., ${resource.id}. Additional dependencies without references can be
+    listed in 'dependsOn', either as list of refs or as single ref. Empty lines are ignored.
+
+    :param path: The path of the manifest or '-' for reading from stdin.
+    :return: A list of entries containing the line number, ref, operation, args and dependencies.
+    :raises InputFileError: If the manifest cannot be read or is invalid.
+    """
+    entries = []
+    refs = set()
+    # refs listed in dependsOn together with their line number
+    listed_dependencies = set()
+    try:
+        f = sys.stdin if path == "-" else open(path)
+    except OSError as e:
+        raise InputFileError("Manifest " + path + " not found.") from e
+    try:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                raise InputFileError(
+                    "Invalid JSON in line " + str(number) + " of " + path + "."
+                ) from e
+            if not isinstance(entry, dict) or not entry.get("operation"):
+                raise InputFileError(
+                    "No operation in line " + str(number) + " of " + path + "."
+                )
+            ref = entry.get("ref")
+            if ref is not None and ref in refs:
+                raise InputFileError(
+                    "Duplicate ref " + str(ref) + " in line " + str(number) + "."
+                )
+            arguments = entry.get("args") or []
+            depends_on = entry.get("dependsOn") or []
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+            if not isinstance(depends_on, list):
+                raise InputFileError(
+                    "Invalid dependsOn in line " + str(number) + " of " + path + "."
+                )
+            listed_dependencies.update((ref, number) for ref in depends_on)
+            dependencies = set(depends_on)
+            dependencies.update(find_references(arguments))
+            entries.append(
+                {
+                    "line": number,
+                    "ref": ref,
+                    "operation": entry["operation"],
+                    "args": arguments,
+                    "dependencies": dependencies,
+                }
+            )
+            if ref is not None:
+                refs.add(ref)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    for ref, number in sorted(listed_dependencies, key=lambda item: item[1]):
+        if ref not in refs:
+            raise InputFileError(
+                "Unknown ref " + str(ref) + " in dependsOn of line " + str(number) + "."
+            )
+    return entries
+
+
+def find_references(value) -> set:
+    """
+    Collect the refs of all entries referred to in the arguments of an entry.
+    """
+    if isinstance(value, str):
+        return {match.group(1) for match in REFERENCE_PATTERN.finditer(value)}
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return set().union(*[find_references(item) for item in value])
+    return set()
+
+
+def get_result_value(result, path: Optional[str]):
+    """
+    Select a value from the result of an entry using a path of keys and list indices separated by dots, e.g.,
+    titles.0.value. Results consisting of a single element, e.g., a created resource, are unwrapped first.
+    """
+    if isinstance(result, list) and len(result) == 1:
+        result = result[0]
+    for token in path.split(".") if path else []:
+        if isinstance(result, list) and token.isdigit() and int(token) < len(result):
+            result = result[int(token)]
+        elif isinstance(result, dict) and token in result:
+            result = result[token]
+        else:
+            raise PyCliError("Path " + path + " not found in referenced result.")
+    return result
+
+
+def resolve_references(value, results: dict):
+    """
+    Replace all references in the arguments of an entry by the values selected from the results of other entries.
+    """
+    if isinstance(value, str):
+        return REFERENCE_PATTERN.sub(
+            lambda match: str(
+                get_result_value(results[match.group(1)], match.group(2))
+            ),
+            value,
+        )
+    if isinstance(value, dict):
+        return {key: resolve_references(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(item, results) for item in value]
+    return value
+
+
+def encode_result(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return str(value)
+
+
+class ThreadOutput:
+    """
+    Replacement of sys.stdout collecting the output written by a thread in its own buffer while capturing, e.g., the
+    JSON Lines written by a bulk operation. Output of all other threads, e.g., of a caller of run_manifest, is passed
+    to the original stream unchanged. Use install_thread_output and uninstall_thread_output instead of replacing
+    sys.stdout directly, such that concurrent manifests share one replacement.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def capture(self):
+        self.local.buffer = io.StringIO()
+
+    def release(self) -> str:
+        output = self.local.buffer.getvalue()
+        self.local.buffer = None
+        return output
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer if buffer else self.stream).write(text)
+
+    def flush(self):
+        if not getattr(self.local, "buffer", None):
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+# number of running manifests using the replacement of sys.stdout
+thread_output_users = 0
+thread_output_lock = threading.Lock()
+
+
+def install_thread_output() -> ThreadOutput:
+    """
+    Replace sys.stdout by a ThreadOutput, unless another manifest has already done so.
+
+    :return: The installed ThreadOutput.
+    """
+    global thread_output_users
+    with thread_output_lock:
+        if not isinstance(sys.stdout, ThreadOutput):
+            sys.stdout = ThreadOutput(sys.stdout)
+        thread_output_users += 1
+        return sys.stdout
+
+
+def uninstall_thread_output():
+    """
+    Restore the original sys.stdout after the last running manifest has finished.
+    """
+    global thread_output_users
+    with thread_output_lock:
+        thread_output_users -= 1
+        if not thread_output_users and isinstance(sys.stdout, ThreadOutput):
+            sys.stdout = sys.stdout.stream
+
+
+def perform_captured(task, perform, output: ThreadOutput):
+    """
+    Call fetch_single for a prepared task and collect the output written by the operation meanwhile.
+
+    :return: A tuple of the result (or None), an error message (or None) and the output written.
+    """
+    output.capture()
+    try:
+        result, error = fetch_single(task, perform)
+    finally:
+        written = output.release()
+    return result, error, written
+
+
+def run_manifest(entries, prepare, perform, parallel=1, stream=None):
+    """
+    Perform the operations of a manifest with up to 'parallel' concurrent executions. An entry is started as soon as
+    all entries it depends on have succeeded, i.e., independent entries run concurrently while, e.g., content is only
+    uploaded after its resource was created. Entries depending on a failed entry are skipped. The outcome of each
+    entry is written as soon as it is available as one JSON line containing line number, ref and operation of the
+    entry and either the result or an error message. Output written to stdout by an operation itself, e.g., by a bulk
+    operation, is included in its outcome as 'output', such that the outcomes remain valid JSON Lines. Therefore,
+    sys.stdout is replaced while running. Output of other threads is passed through and concurrent calls are
+    supported, but sys.stdout must not be replaced by others meanwhile.
+
+    :param entries: The entries as returned by read_manifest.
+    :param prepare: A function receiving operation and resolved arguments of an entry, which is called one after
+    another and returns the task passed to perform.
+    :param perform: A function receiving a prepared task and returning the result, called concurrently.
+    :param parallel: The max. number of concurrent operations.
+    :param stream: The stream receiving the outcomes, stdout by default.
+    :return: A tuple of the numbers of succeeded, failed and skipped entries.
+    """
+    stream = stream if stream else sys.stdout
+    parallel = max(parallel or 1, 1)
+    counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+    # position of each ref, only earlier entries can be referenced
+    positions = {}
+    for index, entry in enumerate(entries):
+        if entry["ref"] is not None:
+            positions[entry["ref"]] = index
+    referenced = set().union(*[entry["dependencies"] for entry in entries])
+    # results kept for referenced entries only
+    results = {}
+    # number of unfinished dependencies and dependent entries by index
+    remaining = [0] * len(entries)
+    dependents = [[] for _ in entries]
+    # message of the first failed dependency by index
+    blocked = {}
+    # message of the first invalid dependency by index
+    invalid = {}
+    ready = deque()
+    for index, entry in enumerate(entries):
+        for dependency in sorted(entry["dependencies"]):
+            position = positions.get(dependency)
+            if position is None or position >= index:
+                invalid.setdefault(
+                    index, "Unknown or later ref " + str(dependency) + "."
+                )
+            else:
+                remaining[index] += 1
+                dependents[position].append(index)
+        if not remaining[index]:
+            ready.append(index)
+    # future -> index
+    pending = {}
+
+    def finish(index, result, error, skipped=False, written=None):
+        entry = entries[index]
+        outcome = {"line": entry["line"], "operation": entry["operation"]}
+        if entry["ref"] is not None:
+            outcome["ref"] = entry["ref"]
+        if written:
+            outcome["output"] = written
+        if error:
+            counts["skipped" if skipped else "failed"] += 1
+            outcome["error"] = error
+        else:
+            counts["succeeded"] += 1
+            outcome["result"] = result
+            if entry["ref"] in referenced:
+                results[entry["ref"]] = result
+        stream.write(json.dumps(outcome, default=encode_result) + "\n")
+        stream.flush()
+        for dependent in dependents[index]:
+            if error:
+                blocked.setdefault(
+                    dependent, "Dependency " + str(entry["ref"]) + " failed."
+                )
+            remaining[dependent] -= 1
+            if not remaining[dependent]:
+                ready.append(dependent)
+
+    def start(executor, index):
+        if index in invalid:
+            finish(index, None, invalid[index])
+            return
+        if index in blocked:
+            finish(index, None, blocked[index], skipped=True)
+            return
+        entry = entries[index]
+        try:
+            task = prepare(
+                entry["operation"], resolve_references(entry["args"], results)
+            )
+        except PyCliError as e:
+            finish(index, None, str(e))
+            return
+        pending[executor.submit(perform_captured, task, perform, output)] = index
+
+    output = install_thread_output()
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            while ready or pending:
+                while ready and len(pending) < 2 * parallel:
+                    start(executor, ready.popleft())
+                if not pending:
+                    continue
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    result, error, written = future.result()
+                    finish(pending.pop(future), result, error, written=written)
+    finally:
+        uninstall_thread_output()
+
+    return counts["succeeded"], counts["failed"], counts["skipped"]
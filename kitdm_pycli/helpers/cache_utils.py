@@ -0,0 +1,23 @@
+import os
+
+
+def get_cache_dir(properties) -> str:
+    """
+    Determine the local folder used for caching information between invocations. The folder can be configured via
+    'directory' in the optional 'cache' section of the properties. Otherwise, kitdm-pycli below $XDG_CACHE_HOME or
+    ~/.cache is used. The folder is created if it does not exist, yet, and is only accessible by the current user.
+
+    :param properties: The entire properties dictionary loaded from properties.json.
+    :return: The path of the cache folder.
+    """
+    cache_dir = None
+    if properties and properties.get("cache"):
+        cache_dir = properties["cache"].get("directory")
+    if not cache_dir:
+        base_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        cache_dir = os.path.join(base_dir, "kitdm-pycli")
+    cache_dir = os.path.expanduser(cache_dir)
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    return cache_dir
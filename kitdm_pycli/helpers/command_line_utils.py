@@ -1,6 +1,13 @@
 import argparse
-import dateparser
+import shlex
+import sys
+import time
+from typing import Optional
+from kitdm_pycli.helpers.exceptions import PyCliError
 from kitdm_pycli.helpers.url_utils import get_query_param_entry
+from kitdm_pycli.helpers.date_utils import format_query_date
+from kitdm_pycli.helpers.daemon_utils import forward_to_daemon
+from kitdm_pycli.helpers.batch_utils import read_manifest, run_manifest
 
 
 def add_single_identifier_argument(command_parser):
@@ -13,17 +20,101 @@ def add_single_identifier_argument(command_parser):
     )
 
 
-def add_multiple_identifier_argument(command_parser):
+def add_multiple_identifier_argument(command_parser, required=True):
     command_parser.add_argument(
         "-id",
         "--identifier",
         type=str,
         nargs="+",
-        required=True,
+        required=required,
         help="One or more space-separated resource identifiers.",
     )
 
 
+def add_parallel_argument(command_parser, default=1, help_text=None):
+    if not help_text:
+        help_text = (
+            "The max. number of concurrent requests if multiple identifiers are provided. "
+            "By default, all identifiers are requested one after another. The results are "
+            "always returned in the order of the provided identifiers. Requests failing for "
+            "single identifiers are reported at the end without aborting the remaining ones."
+        )
+    command_parser.add_argument(
+        "-P",
+        "--parallel",
+        type=int,
+        default=default,
+        help=help_text,
+    )
+
+
+def add_echo_arguments(command_parser, local_echo=False):
+    command_parser.add_argument(
+        "--echo",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Print the affected element after the operation, which requires an additional "
+        "request. With --no-echo, this request is skipped and nothing is printed.",
+    )
+    if local_echo:
+        command_parser.add_argument(
+            "--localEcho",
+            action="store_true",
+            help="Obtain the element before patching and apply the patch document locally "
+            "instead of requesting the patched element afterwards. If the element was "
+            "changed concurrently, it is requested from the server.",
+        )
+
+
+def add_bulk_arguments(command_parser, selection_group=None):
+    # the identifiers file is an alternative to other ways of selecting elements, if a group is provided
+    (selection_group if selection_group else command_parser).add_argument(
+        "--idsFile",
+        type=str,
+        help="The path of a text file containing one identifier per line, or '-' for reading "
+        "identifiers from stdin. The outcome of each identifier is written as one JSON line.",
+    )
+    command_parser.add_argument(
+        "--checkpoint",
+        type=str,
+        help="The path of a checkpoint file used together with -id, --idsFile or --fromQuery. "
+        "Successfully processed identifiers are appended to this file and skipped if the "
+        "operation is started again, e.g., after it was interrupted.",
+    )
+
+
+def add_bulk_selection_arguments(command_parser):
+    """
+    Add the mutually exclusive -id and --idsFile arguments, of which one is required, as well as --checkpoint.
+
+    :param command_parser: The parser of the operation.
+    :return: The argument group, which may receive further alternatives.
+    """
+    selection_group = command_parser.add_mutually_exclusive_group(required=True)
+    add_multiple_identifier_argument(selection_group, required=False)
+    add_bulk_arguments(command_parser, selection_group)
+    return selection_group
+
+
+def add_file_filter_arguments(command_parser):
+    command_parser.add_argument(
+        "-i",
+        "--include",
+        type=str,
+        nargs="+",
+        help="One or more glob patterns, e.g., '*.tif' or 'raw/*'. If provided, only local files "
+        "whose path relative to the source folder matches at least one pattern are used.",
+    )
+    command_parser.add_argument(
+        "-e",
+        "--exclude",
+        type=str,
+        nargs="+",
+        help="One or more glob patterns, e.g., '*.tmp' or '.git/*'. Local files whose path "
+        "relative to the source folder matches one of the patterns are skipped.",
+    )
+
+
 def add_version_argument(command_parser):
     command_parser.add_argument(
         "-v",
@@ -101,6 +192,25 @@ def add_pagination_arguments(command_parser):
     )
 
 
+def add_all_pages_argument(command_parser):
+    command_parser.add_argument(
+        "-A",
+        "--all",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Obtain all pages of the listing starting at the provided page. Pages are "
+        "requested one after another and each page is written as soon as it was "
+        "received. Raw results are written as JSON Lines, i.e., one element per line.",
+    )
+    command_parser.add_argument(
+        "--prefetch",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Request the next page in the background while the current page is written. "
+        "Only used in combination with --all.",
+    )
+
+
 def add_global_arguments(command_parser):
     command_parser.add_argument(
         "-a",
@@ -144,20 +254,269 @@ def add_global_arguments(command_parser):
         help="Enable verbose output for debugging. Disabled by default.",
     )
 
+    command_parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        help="Switch for enabling/disabling the local cache of received metadata. If enabled, "
+        "responses received via GET are stored in the cache folder and returned again "
+        "without contacting the service for 'response_ttl' seconds. Afterwards, they "
+        "are revalidated using their ETag. By default, the setting 'responses' in the "
+        "cache section of properties.json is used, which is disabled if not provided.",
+    )
+
+
+def add_shell_operation(operation_subparser):
+    # shell
+    operation_subparser.add_parser(
+        "shell",
+        help="Read operations line by line from stdin and perform them in one process, "
+        "which keeps connections, tokens and caches between operations. Global arguments "
+        "provided before 'shell' are used for all operations. Leave the shell via "
+        "'exit' or Ctrl-D.",
+    )
+
+
+def get_global_argument_list(args) -> list:
+    """
+    Reconstruct the global command line arguments, except for --output, from parsed arguments, such that they can
+    be applied to further operations.
+
+    :param args: The parsed command line arguments.
+    :return: The arguments as list of strings.
+    """
+    argument_list = ["--render_as", args.render_as]
+    if args.auth:
+        argument_list.append("--auth")
+    if args.debug:
+        argument_list.append("--debug")
+    if args.cache is not None:
+        argument_list.append("--cache" if args.cache else "--no-cache")
+    return argument_list
+
+
+def run_shell(process, parse_arguments, service_client, args, prompt: str):
+    """
+    Perform operations read line by line from stdin with one long-lived service client. Each line is parsed like the
+    command line of the client, e.g., 'getResource -id 123'. Errors of an operation are printed and do not end the
+    shell.
+
+    :param process: The function performing an operation, receiving the parsed arguments and the service client.
+    :param parse_arguments: The function parsing the command line of the client.
+    :param service_client: The service client used for all operations.
+    :param args: The parsed arguments of the shell invocation, providing global arguments for all operations.
+    :param prompt: The prompt shown if stdin is a terminal.
+    """
+    interactive = sys.stdin.isatty()
+    if interactive:
+        try:
+            # imported for its side effect on input(), i.e., line editing and history, if available
+            import readline  # noqa: F401
+        except ImportError:
+            pass
+    global_arguments = get_global_argument_list(args)
+    try:
+        while True:
+            try:
+                line = input(prompt if interactive else "").strip()
+            except EOFError:
+                break
+            except KeyboardInterrupt:
+                print()
+                continue
+            if not line or line.startswith("#"):
+                continue
+            if line in ("exit", "quit"):
+                break
+            try:
+                operation_args = parse_arguments(global_arguments + shlex.split(line))
+            except ValueError as e:
+                print(str(e), file=sys.stderr)
+                continue
+            except SystemExit:
+                # invalid arguments or help, already printed by argparse
+                continue
+            if operation_args.operation in (None, "shell"):
+                print("Please provide an operation.", file=sys.stderr)
+                continue
+            service_client.reset_request_count()
+            start = time.perf_counter()
+            try:
+                process(operation_args, service_client)
+            except (PyCliError, OSError, ValueError) as e:
+                print(str(e), file=sys.stderr)
+            except SystemExit:
+                # failures of a batch operation, already reported
+                pass
+            except KeyboardInterrupt:
+                # Ctrl-C only cancels the current operation
+                print("Operation cancelled.", file=sys.stderr)
+            service_client.print_debug(
+                "Operation took {:.1f}ms.".format((time.perf_counter() - start) * 1000)
+            )
+    finally:
+        service_client.close()
+
+
+def add_batch_operation(operation_subparser):
+    # batch
+    batch_parser = operation_subparser.add_parser(
+        "batch",
+        help="Perform the operations listed in a manifest in one process with one client. "
+        "The outcome of each line is written as JSON line to stdout or the output file.",
+    )
+    batch_parser.add_argument(
+        "-f",
+        "--file",
+        type=str,
+        required=True,
+        help="The manifest in JSON Lines format or '-' for reading from stdin. Each line contains "
+        "an 'operation', its 'args' as object, e.g., {\"identifier\": [\"123\"]}, or as list of "
+        "command line arguments, and an optional 'ref'. Values may refer to results of previous "
+        "lines, e.g., ${resource.id}, and further dependencies can be listed in 'dependsOn'.",
+    )
+    add_parallel_argument(
+        batch_parser,
+        help_text="The max. number of concurrent operations. Lines are only started after all "
+        "lines they depend on have succeeded. Lines depending on failed ones are skipped.",
+    )
+
+
+def get_operation_argument_list(arguments) -> list:
+    """
+    Convert the arguments of a manifest line into command line arguments. Keys of a dictionary are used as long
+    options, e.g., {"identifier": ["1", "2"], "soft": true} results in --identifier 1 2 --soft. Lists are used as
+    they are.
+
+    :param arguments: The arguments as dictionary or list.
+    :return: The arguments as list of strings.
+    """
+    if isinstance(arguments, list):
+        return [str(argument) for argument in arguments]
+    argument_list = []
+    for key, value in arguments.items():
+        option = key if key.startswith("-") else "--" + key
+        if value is None:
+            continue
+        if value is True:
+            argument_list.append(option)
+        elif value is False:
+            argument_list.append("--no-" + option.lstrip("-"))
+        elif isinstance(value, list):
+            argument_list += [option] + [str(item) for item in value]
+        else:
+            argument_list += [option, str(value)]
+    return argument_list
+
+
+def run_batch(run_operation, parser, service_client, args):
+    """
+    Perform the operations of a manifest with one service client and up to args.parallel concurrent operations.
+    Each line is parsed like the command line of the client, where global arguments of the batch invocation apply
+    to all lines and results are always returned as RAW. The outcomes are written to args.output or stdout and a
+    summary is printed to stderr afterwards.
+
+    :param run_operation: The function performing an operation, receiving the parsed arguments and the service client.
+    :param parser: The parser of the command line of the client, shared by all lines.
+    :param service_client: The service client used for all operations.
+    :param args: The parsed arguments of the batch invocation.
+    :raises PyCliError: If the manifest cannot be read.
+    """
+    entries = read_manifest(args.file)
+    global_arguments = get_global_argument_list(args)
+    global_arguments[1] = "RAW"
+
+    def prepare(operation, arguments):
+        if operation in ("shell", "batch"):
+            raise PyCliError("Operation " + operation + " is not supported in batches.")
+        operation_arguments = (
+            global_arguments + [operation] + get_operation_argument_list(arguments)
+        )
+        try:
+            # argparse prints the reason to stderr
+            return parser.parse_args(operation_arguments)
+        except SystemExit:
+            raise PyCliError("Invalid arguments for operation " + operation + ".")
+
+    def perform(operation_args):
+        try:
+            result = run_operation(operation_args, service_client)
+        except SystemExit:
+            raise PyCliError("Operation " + operation_args.operation + " failed.")
+        except OSError as e:
+            raise PyCliError(str(e))
+        if result is None:
+            # output already written, e.g., by a bulk operation, and included in the outcome
+            return True
+        response, failures = result
+        if failures:
+            raise PyCliError(
+                "; ".join(
+                    identifier + ": " + message for identifier, message in failures
+                )
+            )
+        return response
+
+    stream = open(args.output, "w") if args.output else None
+    try:
+        succeeded, failed, skipped = run_manifest(
+            entries, prepare, perform, args.parallel, stream
+        )
+    finally:
+        if stream:
+            stream.close()
+    print(
+        "Performed {} operation(s), {} failed, {} skipped.".format(
+            succeeded, failed, skipped
+        ),
+        file=sys.stderr,
+    )
+    if failed or skipped:
+        exit(2)
+
+
+def add_cache_stats_operation(operation_subparser):
+    # cacheStats
+    operation_subparser.add_parser(
+        "cacheStats",
+        help="Show the number of entries of the local response cache and the ratio "
+        "of requests answered from the cache.",
+    )
+
 
 def parse_query_params(args):
     query_params = []
 
     if args.fromDate:
-        from_date = dateparser.parse(args.fromDate)
-        from_date = from_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        from_date = format_query_date(args.fromDate)
         query_params.append(get_query_param_entry("from", from_date))
     if args.untilDate:
-        until_date = dateparser.parse(args.untilDate)
-        until_date = until_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+        until_date = format_query_date(args.untilDate)
         query_params.append(get_query_param_entry("until", until_date))
 
     query_params.append(get_query_param_entry("page", str(args.page)))
     query_params.append(get_query_param_entry("size", str(args.pageSize)))
 
     return query_params
+
+
+def run_cli(process, args, client_name: Optional[str] = None):
+    """
+    Perform the operation selected via command line. If a daemon is running, the operation is forwarded to it.
+    Errors raised by the service clients are printed to stderr and translated into the exit code of the error, e.g.,
+    3 if the service could not be reached.
+
+    :param process: The function performing the operation, receiving the parsed arguments.
+    :param args: The parsed command line arguments.
+    :param client_name: The name of the client used to forward the operation to the daemon, None to never forward.
+    """
+    if client_name:
+        exit_code = forward_to_daemon(client_name, args)
+        if exit_code is not None:
+            if exit_code:
+                exit(exit_code)
+            return
+    try:
+        process(args)
+    except PyCliError as e:
+        print(str(e), file=sys.stderr)
+        exit(e.exit_code)
@@ -0,0 +1,94 @@
+import json
+import os
+import socket
+import sys
+from typing import Optional
+from kitdm_pycli.helpers.cache_utils import get_cache_dir
+
+
+def get_daemon_socket() -> str:
+    """
+    Determine the path of the Unix domain socket of the daemon, which can be configured via the environment variable
+    PYCLI_DAEMON_SOCKET. Otherwise, daemon.sock in the default cache folder is used.
+
+    :return: The path of the socket.
+    """
+    socket_path = os.environ.get("PYCLI_DAEMON_SOCKET")
+    if not socket_path:
+        socket_path = os.path.join(get_cache_dir(None), "daemon.sock")
+    return socket_path
+
+
+def send_message(connection_file, message: dict):
+    connection_file.write(json.dumps(message).encode("utf-8") + b"\n")
+    connection_file.flush()
+
+
+def receive_message(connection_file) -> Optional[dict]:
+    line = connection_file.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def can_forward(args) -> bool:
+    """
+    Check whether an operation can be performed by the daemon. Operations reading from stdin, i.e., the shell,
+    identifiers read via '--idsFile -' and manifests read via 'batch -f -', are always performed locally.
+    """
+    if os.environ.get("PYCLI_NO_DAEMON"):
+        return False
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    if args.operation in (None, "shell"):
+        return False
+    if getattr(args, "file", None) == "-":
+        return False
+    return getattr(args, "idsFile", None) != "-"
+
+
+def forward_to_daemon(client_name: str, args) -> Optional[int]:
+    """
+    Let a running daemon perform an operation with its warm service client. The parsed arguments are sent together
+    with the current folder and the properties file used. The output of the operation is written to stdout and
+    stderr afterwards.
+
+    :param client_name: The name of the client, i.e., base_repo, metastore or typed_pid_maker.
+    :param args: The parsed command line arguments.
+    :return: The exit code of the operation or None, if no daemon is running or it is busy and the operation must
+    be performed locally.
+    """
+    if not can_forward(args):
+        return None
+    socket_path = get_daemon_socket()
+    if not os.path.exists(socket_path):
+        return None
+    daemon_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        daemon_socket.connect(socket_path)
+    except OSError:
+        # stale socket file, e.g., of a killed daemon
+        daemon_socket.close()
+        return None
+
+    properties_file = os.environ.get("PYCLI_PROPERTIES") or "properties.json"
+    with daemon_socket, daemon_socket.makefile("rwb") as connection_file:
+        send_message(
+            connection_file,
+            {
+                "client": client_name,
+                "args": vars(args),
+                "cwd": os.getcwd(),
+                "properties": os.path.abspath(properties_file),
+            },
+        )
+        reply = receive_message(connection_file)
+    if reply is None:
+        print("Daemon closed the connection unexpectedly.", file=sys.stderr)
+        return 2
+    if reply.get("busy"):
+        # the daemon is performing another operation, e.g., of a parallel invocation
+        return None
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    return reply["exit_code"]
@@ -0,0 +1,88 @@
+import datetime
+import re
+from typing import Optional
+from kitdm_pycli.helpers.exceptions import PyCliError
+
+# format of dates sent as query parameters
+QUERY_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# compact formats not covered by datetime.fromisoformat in all supported Python versions
+COMPACT_DATE_FORMATS = ["%Y%m%d", "%Y%m%dT%H%M%S", "%Y/%m/%d", "%Y/%m/%d %H:%M:%S"]
+
+RELATIVE_DATE_PATTERN = re.compile(
+    r"^(\d+|an?)\s+(second|minute|hour|day|week)s?\s+ago$", re.IGNORECASE
+)
+
+
+def parse_iso_date(value: str) -> datetime.datetime:
+    """
+    Parse an ISO 8601 date, optionally with time and offset, e.g., 2023-11-02 or 2023-11-02T08:33:00Z.
+
+    :raises ValueError: If the value is no ISO date.
+    """
+    if value.endswith(("Z", "z")):
+        # only supported by fromisoformat since Python 3.11
+        value = value[:-1] + "+00:00"
+    return datetime.datetime.fromisoformat(value)
+
+
+def parse_relative_date(value: str) -> Optional[datetime.datetime]:
+    """
+    Resolve simple relative expressions, i.e., now, today, yesterday and 'N days ago' with seconds, minutes, hours,
+    days or weeks. As with dateparser, the current time of day is kept.
+
+    :return: The resolved date or None, if the value is no simple relative expression.
+    """
+    now = datetime.datetime.now()
+    value = value.lower()
+    if value in ("now", "today"):
+        return now
+    if value == "yesterday":
+        return now - datetime.timedelta(days=1)
+    match = RELATIVE_DATE_PATTERN.match(value)
+    if not match:
+        return None
+    amount = 1 if match.group(1) in ("a", "an") else int(match.group(1))
+    return now - datetime.timedelta(**{match.group(2) + "s": amount})
+
+
+def parse_date(value: str) -> datetime.datetime:
+    """
+    Resolve a date provided via command line. ISO dates, a few compact formats and simple relative expressions are
+    resolved directly. Only other values, e.g., 'two days ago' or 'last year', are passed to dateparser, which is
+    expensive to load.
+
+    :param value: The date as provided by the user.
+    :return: The resolved date.
+    :raises PyCliError: If the value cannot be resolved.
+    """
+    value = value.strip()
+    try:
+        return parse_iso_date(value)
+    except ValueError:
+        pass
+    for date_format in COMPACT_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, date_format)
+        except ValueError:
+            pass
+    result = parse_relative_date(value)
+    if result:
+        return result
+
+    import dateparser
+
+    result = dateparser.parse(value)
+    if not result:
+        raise PyCliError("Unable to parse date " + value + ".")
+    return result
+
+
+def format_query_date(value: str) -> str:
+    """
+    Resolve a date provided via command line and format it for the use as query parameter.
+
+    :param value: The date as provided by the user.
+    :return: The formatted date, e.g., 2023-11-02T08:33:00Z.
+    """
+    return parse_date(value).strftime(QUERY_DATE_FORMAT)
@@ -0,0 +1,83 @@
+from typing import Optional
+
+
+class PyCliError(Exception):
+    """
+    Base class of all errors raised by service clients. The command line clients print the message and exit with
+    the exit_code of the error.
+    """
+
+    exit_code = 2
+
+
+class ConfigurationError(PyCliError):
+    """
+    The properties file is missing or invalid.
+    """
+
+
+class InputFileError(PyCliError):
+    """
+    A local file provided as input, e.g., metadata, was not found.
+    """
+
+
+class ServiceError(PyCliError):
+    """
+    The service responded with an unexpected HTTP status.
+    """
+
+    exit_code = 2
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        url: Optional[str] = None,
+        body: Optional[bytes] = None,
+    ):
+        PyCliError.__init__(self, message)
+        self.status = status
+        self.url = url
+        self.body = body
+
+
+class PreconditionFailedError(ServiceError):
+    """
+    The service rejected a modification as the provided ETag does not match the current version (HTTP 412).
+    """
+
+    exit_code = 5
+
+
+class ServiceConnectionError(PyCliError):
+    """
+    The service or the KeyCloak instance could not be reached, or the connection was interrupted.
+    """
+
+    exit_code = 3
+
+
+class AuthenticationError(PyCliError):
+    """
+    The login at the KeyCloak instance failed.
+    """
+
+    exit_code = 4
+
+
+def error_for_status(
+    status: int, url: str, body: Optional[bytes] = None
+) -> ServiceError:
+    """
+    Create the error matching an unexpected HTTP status.
+
+    :param status: The received HTTP status.
+    :param url: The requested URL.
+    :param body: The received response body.
+    :return: The ServiceError to raise.
+    """
+    message = "Server returned status " + str(status) + ". Body: " + str(body)
+    if status == 412:
+        return PreconditionFailedError(message, status, url, body)
+    return ServiceError(message, status, url, body)
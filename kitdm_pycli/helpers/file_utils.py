@@ -1,6 +1,8 @@
 import json
 import sys
 import os
+from fnmatch import fnmatch
+from kitdm_pycli.helpers.exceptions import InputFileError
 
 
 def check_json_file(path, contained_keys=None):
@@ -31,8 +33,7 @@ def check_json_file(path, contained_keys=None):
             # no further check
             result = contents
     except FileNotFoundError as e:
-        print("Metadata file not found at " + path + ".", file=sys.stderr)
-        raise SystemExit(e)
+        raise InputFileError("Metadata file not found at " + path + ".") from e
     except json.JSONDecodeError:
         print("Invalid JSON file.", file=sys.stderr)
 
@@ -41,3 +42,26 @@ def check_json_file(path, contained_keys=None):
 
 def check_file_exists(file_path: str) -> bool:
     return os.path.exists(file_path)
+
+
+def list_local_files(source: str, include=None, exclude=None) -> list:
+    """
+    List all files below a local folder recursively. The returned paths are relative to the source folder and use
+    slashes as separator, such that they can be used as relative paths on the server.
+
+    :param source: The local folder.
+    :param include: An optional list of glob patterns. If provided, only files matching at least one pattern are listed.
+    :param exclude: An optional list of glob patterns. Files matching one of the patterns are not listed.
+    :return: A sorted list of relative file paths.
+    """
+    result = []
+    for root, _, files in os.walk(source):
+        for filename in files:
+            relative_path = os.path.relpath(os.path.join(root, filename), source)
+            relative_path = relative_path.replace(os.sep, "/")
+            if include and not any(fnmatch(relative_path, p) for p in include):
+                continue
+            if exclude and any(fnmatch(relative_path, p) for p in exclude):
+                continue
+            result.append(relative_path)
+    return sorted(result)
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_HASH_ALGORITHM = "sha1"
+
+
+def split_hash(value: str):
+    """
+    Split a checksum as provided in the 'hash' attribute of content information elements, e.g., sha1:0a1b2c...,
+    into algorithm and hex digest. If no algorithm prefix is present, sha1 is assumed.
+
+    :param value: The checksum value.
+    :return: A tuple of algorithm and digest, both in lower case.
+    """
+    if ":" in value:
+        algorithm, digest = value.split(":", 1)
+    else:
+        algorithm, digest = DEFAULT_HASH_ALGORITHM, value
+    return algorithm.lower().replace("-", ""), digest.lower()
+
+
+def compute_hash(
+    path: str, algorithm: str = DEFAULT_HASH_ALGORITHM, chunk_size: int = 1048576
+) -> str:
+    """
+    Compute the checksum of a local file reading it in chunks.
+
+    :param path: The path of the local file.
+    :param algorithm: The name of the hash algorithm, e.g., sha1, md5 or sha256.
+    :param chunk_size: The number of bytes read at once.
+    :return: The hex digest of the file.
+    """
+    hash_object = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hash_object.update(chunk)
+    return hash_object.hexdigest()
+
+
+def matches_hash(path: str, value: str) -> bool:
+    """
+    Check whether a local file exists and has the provided checksum.
+
+    :param path: The path of the local file.
+    :param value: The expected checksum, e.g., sha1:0a1b2c...
+    :return: True if the file exists and its checksum matches, False otherwise.
+    """
+    if not value or not os.path.isfile(path):
+        return False
+    algorithm, digest = split_hash(value)
+    if algorithm not in hashlib.algorithms_available:
+        return False
+    return compute_hash(path, algorithm) == digest
+
+
+class HashCache:
+    """
+    Persistent cache of local file checksums stored as JSON file. An entry is only used as long as modification time
+    and size of the file are unchanged, such that unchanged files are not hashed again.
+    """
+
+    def __init__(self, cache_file: str):
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.entries = {}
+        try:
+            with open(cache_file) as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    def get_hash(self, path: str, algorithm: str = DEFAULT_HASH_ALGORITHM) -> str:
+        """
+        Obtain the checksum of a local file, either from the cache or by computing and caching it.
+
+        :param path: The path of the local file.
+        :param algorithm: The name of the hash algorithm.
+        :return: The hex digest of the file.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = path + "|" + algorithm
+        with self.lock:
+            entry = self.entries.get(key)
+        if (
+            entry
+            and entry["mtime"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            return entry["digest"]
+
+        digest = compute_hash(path, algorithm)
+        with self.lock:
+            self.entries[key] = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "digest": digest,
+            }
+        return digest
+
+    def save(self):
+        """
+        Write the cache to its file, only readable by the current user.
+        """
+        with self.lock:
+            content = json.dumps(self.entries)
+        temp_file = self.cache_file + ".tmp"
+        with open(
+            os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w"
+        ) as f:
+            f.write(content)
+        os.replace(temp_file, self.cache_file)
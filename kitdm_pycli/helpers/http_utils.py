@@ -0,0 +1,50 @@
+DEFAULT_HTTP_PROPERTIES = {
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "pool_block": False,
+    "keep_alive": True,
+    "chunk_size": 1048576,
+}
+
+
+def get_http_properties(properties):
+    """
+    Obtain the transport settings from the optional 'http' section of the properties. Missing entries are
+    filled with default values.
+
+    :param properties: The entire properties dictionary loaded from properties.json.
+    :return: A dictionary containing all transport settings.
+    """
+    http_properties = dict(DEFAULT_HTTP_PROPERTIES)
+    if properties and "http" in properties and properties["http"]:
+        http_properties.update(properties["http"])
+    return http_properties
+
+
+def create_session(http_properties):
+    """
+    Create a requests session with a connection pool configured according to the provided transport settings.
+    All requests sent via the returned session reuse open connections, which avoids one TCP/TLS handshake per
+    request as long as keep-alive is enabled.
+
+    :param http_properties: The transport settings as returned by get_http_properties.
+    :return: The configured requests.Session object.
+    """
+    # imported on first use, invocations answered from local caches do not need it
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=int(http_properties["pool_connections"]),
+        pool_maxsize=int(http_properties["pool_maxsize"]),
+        pool_block=bool(http_properties["pool_block"]),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    if not http_properties["keep_alive"]:
+        # ask the server to close each connection after the response
+        session.headers["Connection"] = "close"
+
+    return session
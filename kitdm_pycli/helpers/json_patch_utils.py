@@ -0,0 +1,133 @@
+import copy
+
+
+class JsonPatchError(ValueError):
+    """
+    Raised if a patch document cannot be applied to a JSON document.
+    """
+
+
+def parse_pointer(pointer: str) -> list:
+    """
+    Split a JSON pointer as specified in RFC 6901, e.g., /titles/0/value, into its unescaped reference tokens.
+
+    :param pointer: The JSON pointer.
+    :return: A list of reference tokens, which is empty for the whole document.
+    """
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError("Invalid JSON pointer " + pointer + ".")
+    return [
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    ]
+
+
+def get_array_index(array: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(array)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError("Invalid array index " + token + ".")
+    index = int(token)
+    if index > len(array) or (index == len(array) and not allow_end):
+        raise JsonPatchError("Array index " + token + " out of range.")
+    return index
+
+
+def resolve_parent(document, tokens: list):
+    """
+    Resolve the container holding the element referenced by the provided tokens.
+
+    :return: A tuple of the parent container and the last reference token.
+    """
+    parent = document
+    for token in tokens[:-1]:
+        if isinstance(parent, list):
+            parent = parent[get_array_index(parent, token)]
+        elif isinstance(parent, dict) and token in parent:
+            parent = parent[token]
+        else:
+            raise JsonPatchError("Path element " + token + " not found.")
+    return parent, tokens[-1]
+
+
+def get_value(document, tokens: list):
+    if not tokens:
+        return document
+    parent, token = resolve_parent(document, tokens)
+    if isinstance(parent, list):
+        return parent[get_array_index(parent, token)]
+    if isinstance(parent, dict) and token in parent:
+        return parent[token]
+    raise JsonPatchError("Path element " + token + " not found.")
+
+
+def add_value(document, tokens: list, value):
+    if not tokens:
+        return value
+    parent, token = resolve_parent(document, tokens)
+    if isinstance(parent, list):
+        parent.insert(get_array_index(parent, token, True), value)
+    elif isinstance(parent, dict):
+        parent[token] = value
+    else:
+        raise JsonPatchError("Cannot add value below a scalar.")
+    return document
+
+
+def remove_value(document, tokens: list):
+    if not tokens:
+        raise JsonPatchError("The whole document cannot be removed.")
+    parent, token = resolve_parent(document, tokens)
+    if isinstance(parent, list):
+        return parent.pop(get_array_index(parent, token))
+    if isinstance(parent, dict) and token in parent:
+        return parent.pop(token)
+    raise JsonPatchError("Path element " + token + " not found.")
+
+
+def apply_patch(document, patch: list):
+    """
+    Apply a JSON patch document as specified in RFC 6902 to a JSON document. The provided document is not modified.
+    All operations, i.e., add, remove, replace, move, copy and test, are supported.
+
+    :param document: The parsed JSON document, e.g., a data resource.
+    :param patch: The parsed patch document, i.e., a list of operations.
+    :return: The patched copy of the document.
+    :raises JsonPatchError: If an operation is invalid or cannot be applied.
+    """
+    if not isinstance(patch, list):
+        raise JsonPatchError("Patch document must be a list of operations.")
+    result = copy.deepcopy(document)
+    for operation in patch:
+        if not isinstance(operation, dict) or "op" not in operation:
+            raise JsonPatchError("Invalid patch operation " + str(operation) + ".")
+        op = operation["op"]
+        tokens = parse_pointer(operation.get("path", ""))
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError("Operation " + op + " requires a value.")
+
+        if op == "add":
+            result = add_value(result, tokens, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            remove_value(result, tokens)
+        elif op == "replace":
+            if tokens:
+                remove_value(result, tokens)
+            result = add_value(result, tokens, copy.deepcopy(operation["value"]))
+        elif op == "move":
+            source = parse_pointer(operation.get("from", ""))
+            if tokens[: len(source)] == source and tokens != source:
+                raise JsonPatchError("Cannot move a value into one of its children.")
+            value = remove_value(result, source)
+            result = add_value(result, tokens, value)
+        elif op == "copy":
+            source = parse_pointer(operation.get("from", ""))
+            value = copy.deepcopy(get_value(result, source))
+            result = add_value(result, tokens, value)
+        elif op == "test":
+            if get_value(result, tokens) != operation["value"]:
+                raise JsonPatchError("Test of " + operation["path"] + " failed.")
+        else:
+            raise JsonPatchError("Unsupported patch operation " + op + ".")
+    return result
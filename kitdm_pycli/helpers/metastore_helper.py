@@ -4,6 +4,8 @@ from kitdm_pycli.helpers.service_helper import ServiceClient
 from kitdm_pycli.helpers.render_utils import render_as_table, render_as_list
 from kitdm_pycli.helpers.file_utils import check_json_file
 from kitdm_pycli.helpers.url_utils import add_query_parameters
+from kitdm_pycli.helpers.cache_utils import get_cache_dir
+from kitdm_pycli.helpers.schema_store import SchemaStore
 
 
 def id_for_element(elem):
@@ -18,11 +20,19 @@ class MetaStoreClient(ServiceClient):
     Client implementation for accessing a MetaStore service instance.
     """
 
+    properties_section = "metastore"
+
     def __init__(self, debug=False):
         ServiceClient.__init__(self, debug)
-        self.server_url = self.properties["metastore"]["server_url"]
-        self.tableItemsSchema = self.properties["metastore"]["tableItemsSchema"]
-        self.tableItemsDocument = self.properties["metastore"]["tableItemsDocument"]
+        service_properties = self.properties[self.properties_section]
+        self.server_url = service_properties["server_url"]
+        self.tableItemsSchema = service_properties["tableItemsSchema"]
+        self.tableItemsDocument = service_properties["tableItemsDocument"]
+        # downloaded schemas are kept locally unless disabled in the cache section
+        self.use_schema_store = (self.properties.get("cache") or {}).get(
+            "schemas", True
+        )
+        self.schema_store = None
 
     def create(
         self,
@@ -315,7 +325,12 @@ class MetaStoreClient(ServiceClient):
         return result
 
     def download(
-        self, resource_id: str, path: str, version: Optional[int], auth: bool = False
+        self,
+        resource_id: str,
+        path: str,
+        version: Optional[int],
+        auth: bool = False,
+        output: Optional[str] = None,
     ):
         """
         Download the schema or document, optionally in a specific version. Which kind of resource is downloaded is
@@ -327,7 +342,9 @@ class MetaStoreClient(ServiceClient):
         :param version: The version of schema or document if versioning is enabled on the
         server.
         :param auth: True|False Either perform or skip authorization.
-        :return: The downloaded bitstream, which can be further processed or stored in a local file.
+        :param output: Optional path of a local file. If provided, the content is streamed directly into this file.
+        :return: The downloaded bitstream, which can be further processed or stored in a local file, or the output
+        path if an output file was provided.
         """
         headers: dict[str, str] = {}
         resource_path = "api/v1/"
@@ -352,8 +369,71 @@ class MetaStoreClient(ServiceClient):
         if not self.login(auth, headers):
             return None
 
+        if path == "schema" and self.use_schema_store:
+            return self.download_schema(
+                resource_id, version, resource_path, headers, output
+            )
+
+        if output:
+            return self.do_download(self.server_url, resource_path, headers, output)
+
         return self.do_get(self.server_url, resource_path, headers)
 
+    def get_schema_store(self) -> SchemaStore:
+        with self.etag_cache_lock:
+            if not self.schema_store:
+                self.schema_store = SchemaStore(
+                    get_cache_dir(self.properties), self.server_url
+                )
+            return self.schema_store
+
+    def download_schema(
+        self,
+        schema_id: str,
+        version: Optional[int],
+        resource_path: str,
+        headers,
+        output: Optional[str] = None,
+    ):
+        """
+        Download a schema via the local schema store. A specific version is only requested once, as versions of a
+        schema never change. The latest version is revalidated via If-None-Match, such that it is only transferred
+        again if a new version was created.
+
+        :param schema_id: The schema identifier.
+        :param version: The schema version or None for the latest version.
+        :param resource_path: The path of the schema relative to the server URL.
+        :param headers: The request headers.
+        :param output: Optional path of a local file the schema is written to.
+        :return: The schema document or the output path if an output file was provided.
+        """
+        schema_store = self.get_schema_store()
+        stored = schema_store.get(schema_id, version)
+        if stored and version:
+            self.print_debug("Using stored schema " + schema_id + " v" + str(version))
+            content = stored[0]
+        else:
+            if stored and stored[1]:
+                self.print_debug("Revalidating stored schema " + schema_id)
+                headers = dict(headers)
+                headers["If-None-Match"] = stored[1]
+            response = self.do_request(
+                "GET", self.server_url, resource_path, headers, (200, 304)
+            )
+            if response.status_code == 304:
+                self.print_debug("Stored schema " + schema_id + " is up to date.")
+                content = stored[0]
+            else:
+                content = response.content
+                etag = None if version else response.headers.get("etag")
+                schema_store.put(schema_id, version, content, etag)
+
+        if output:
+            with open(output, "wb") as f:
+                f.write(content)
+            return output
+        return content
+
     def patch(
         self,
         resource_id: str,
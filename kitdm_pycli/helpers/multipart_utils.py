@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+import uuid
+
+
+def quote_header_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', "%22").replace("\r\n", "%0D%0A")
+
+
+class MultipartStream:
+    """
+    File-like multipart/form-data body which is produced while it is sent. File contents are read in small blocks
+    from disk on demand, such that memory consumption does not depend on the size of the uploaded files. As the
+    length of the body is known in advance, the request is sent with a proper Content-Length header.
+    """
+
+    def __init__(self, fields, progress=None):
+        """
+        :param fields: A list of (name, filename, file_path, content_type) tuples, one per part. The content_type may
+        be None, which omits the Content-Type header of the part.
+        :param progress: An optional callback receiving the number of bytes sent so far after each read.
+        """
+        self.boundary = uuid.uuid4().hex
+        self.content_type = "multipart/form-data; boundary=" + self.boundary
+        self.progress = progress
+        # the body is a sequence of byte strings (headers) and file paths (contents)
+        self.parts = []
+        for name, filename, file_path, content_type in fields:
+            header = "--" + self.boundary + "\r\n"
+            header += (
+                'Content-Disposition: form-data; name="'
+                + quote_header_value(name)
+                + '"; filename="'
+                + quote_header_value(filename)
+                + '"\r\n'
+            )
+            if content_type:
+                header += "Content-Type: " + content_type + "\r\n"
+            header += "\r\n"
+            self.parts.append(header.encode("utf-8"))
+            self.parts.append(file_path)
+            self.parts.append(b"\r\n")
+        self.parts.append(("--" + self.boundary + "--\r\n").encode("utf-8"))
+
+        self.length = 0
+        for part in self.parts:
+            if isinstance(part, bytes):
+                self.length += len(part)
+            else:
+                self.length += os.path.getsize(part)
+
+        self.part_index = 0
+        self.part_offset = 0
+        self.current_file = None
+        self.bytes_read = 0
+
+    def __len__(self):
+        return self.length
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read up to size bytes of the multipart body. If size is negative, the remaining body is returned, which should
+        be avoided for large files.
+
+        :param size: The max. number of bytes to read.
+        :return: The next bytes of the body or an empty bytes object if the body was read entirely.
+        """
+        result = b""
+        while self.part_index < len(self.parts) and (size < 0 or len(result) < size):
+            remaining = -1 if size < 0 else size - len(result)
+            part = self.parts[self.part_index]
+            if isinstance(part, bytes):
+                if remaining < 0:
+                    chunk = part[self.part_offset :]
+                else:
+                    chunk = part[self.part_offset : self.part_offset + remaining]
+                self.part_offset += len(chunk)
+                finished = self.part_offset >= len(part)
+            else:
+                if not self.current_file:
+                    self.current_file = open(part, "rb")
+                chunk = self.current_file.read(remaining)
+                finished = not chunk or (remaining > 0 and len(chunk) < remaining)
+                if finished:
+                    self.current_file.close()
+                    self.current_file = None
+            result += chunk
+            if finished:
+                self.part_index += 1
+                self.part_offset = 0
+
+        self.bytes_read += len(result)
+        if self.progress:
+            self.progress(self.bytes_read)
+        return result
+
+    def close(self):
+        if self.current_file:
+            self.current_file.close()
+            self.current_file = None
+
+
+class ProgressReporter:
+    """
+    Progress callback printing the transferred amount of data and the throughput to stderr. Updates are printed at
+    most every 'interval' seconds and once the transfer has finished.
+    """
+
+    def __init__(self, total: int, interval: float = 0.5, stream=None):
+        self.total = total
+        self.interval = interval
+        self.stream = stream if stream else sys.stderr
+        self.start = time.monotonic()
+        self.last_update = 0.0
+        self.finished = False
+
+    def __call__(self, transferred: int):
+        now = time.monotonic()
+        done = transferred >= self.total
+        if self.finished or (not done and now - self.last_update < self.interval):
+            return
+        self.finished = done
+        self.last_update = now
+        elapsed = max(now - self.start, 1e-6)
+        percent = 100.0 * transferred / self.total if self.total else 100.0
+        message = "\r{} / {} ({:.0f}%) {}/s".format(
+            format_size(transferred),
+            format_size(self.total),
+            percent,
+            format_size(transferred / elapsed),
+        )
+        print(message, end="\n" if done else "", file=self.stream, flush=True)
+
+
+def format_size(size) -> str:
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return "{:.1f} {}".format(size, unit)
+        size /= 1024
+    return "{:.1f} TiB".format(size)
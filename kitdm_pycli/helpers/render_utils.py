@@ -1,5 +1,14 @@
-from prettytable import PrettyTable
-import flatdict
+import json
+import sys
+
+
+def is_table(response) -> bool:
+    """
+    Check whether a rendered response is a PrettyTable. As prettytable is only imported when rendering tables, no
+    other response can be a table if it has not been imported, yet.
+    """
+    prettytable = sys.modules.get("prettytable")
+    return prettytable is not None and isinstance(response, prettytable.PrettyTable)
 
 
 def render_as_table(content, table_items_callback):
@@ -14,6 +23,9 @@ def render_as_table(content, table_items_callback):
     if not content or len(content) == 0:
         return None
 
+    from prettytable import PrettyTable
+    import flatdict
+
     table_items = table_items_callback(content[0])
     result_table = PrettyTable(table_items.keys())
     result_table.max_width = 60
@@ -39,6 +51,8 @@ def render_as_list(content, id_callback):
     if len(content) == 0:
         return None
 
+    from prettytable import PrettyTable
+
     result_table = PrettyTable(["Id"])
     for elem in content:
         result_table.add_row([id_callback(elem)])
@@ -46,10 +60,37 @@ def render_as_list(content, id_callback):
     return result_table
 
 
+def render_statistics(statistics: dict, render_as: str):
+    """
+    Render statistics, e.g., of the response cache, either as table with one row per value or as JSON document.
+
+    :param statistics: The statistics as dictionary.
+    :param render_as: TABLE, LIST or RAW.
+    :return: The rendered output as PrettyTable object or JSON string.
+    """
+    if render_as == "RAW":
+        return json.dumps(statistics)
+
+    from prettytable import PrettyTable
+
+    result_table = PrettyTable(["Name", "Value"])
+    result_table.align = "l"
+    for key, value in statistics.items():
+        result_table.add_row([key, value])
+
+    return result_table
+
+
 def render_to_file(response, args):
     # write to file
     file_content = None
-    if type(response) == PrettyTable:
+    if isinstance(response, bytes):
+        # binary content, e.g., a download, is written as it is
+        with open(args.output, "wb") as f:
+            f.write(response)
+        print("Output written to " + args.output)
+        return
+    elif is_table(response):
         # PrettyTable can be written depending on output extension
         if args.output.endswith(".csv"):
             file_content = response.get_csv_string()
@@ -65,3 +106,58 @@ def render_to_file(response, args):
 
     open(args.output, "wb").write(bytes(file_content, "UTF-8"))
     print("Output written to " + args.output)
+
+
+def write_page(response, args, first_page: bool):
+    """
+    Write the rendered elements of a single page of a listing either to stdout or to the output file provided in
+    args. Tables are written without header except for the first page, raw results are written as JSON Lines, i.e.,
+    one element per line. The output file is created for the first page and extended for all following pages.
+
+    :param response: The rendered page, i.e., a PrettyTable or a list of elements.
+    :param args: The parsed command line arguments.
+    :param first_page: True for the first page of the listing, False otherwise.
+    """
+    if response is None:
+        return
+
+    if is_table(response):
+        if args.output and args.output.endswith(".csv"):
+            content = response.get_csv_string(header=first_page)
+        elif args.output and args.output.endswith(".json"):
+            content = ""
+            for row in response.rows:
+                content += json.dumps(dict(zip(response.field_names, row))) + "\n"
+        elif args.output and args.output.endswith(".html"):
+            content = response.get_html_string() + "\n"
+        else:
+            content = response.get_string(header=first_page) + "\n"
+    else:
+        content = ""
+        for elem in response:
+            content += json.dumps(elem) + "\n"
+
+    if args.output:
+        with open(args.output, "wb" if first_page else "ab") as f:
+            f.write(bytes(content, "UTF-8"))
+    else:
+        print(content, end="", flush=True)
+
+
+def write_all_pages(service_client, pages, args):
+    """
+    Render and write all pages provided by a page iterator one after another, such that elements are written as soon
+    as their page was received.
+
+    :param service_client: The client used to render each page.
+    :param pages: An iterator yielding one list of elements per page, see ServiceClient.iterate_pages().
+    :param args: The parsed command line arguments.
+    """
+    first_page = True
+    for page in pages:
+        write_page(
+            service_client.render_response(page, args.render_as), args, first_page
+        )
+        first_page = False
+    if args.output and not first_page:
+        print("Output written to " + args.output)
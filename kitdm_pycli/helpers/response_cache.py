@@ -0,0 +1,233 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+DEFAULT_RESPONSE_CACHE_PROPERTIES = {
+    "responses": False,
+    "response_ttl": 300,
+    "max_responses": 1000,
+    "max_response_size": 1048576,
+}
+
+# outcomes of a cache lookup, counted in the cache database
+CACHE_OUTCOMES = ("hits", "revalidations", "misses")
+
+
+def get_response_cache_properties(properties):
+    """
+    Obtain the response cache settings from the optional 'cache' section of the properties. Missing entries are
+    filled with default values. By default, responses are not cached.
+
+    :param properties: The entire properties dictionary loaded from properties.json.
+    :return: A dictionary containing all response cache settings.
+    """
+    cache_properties = dict(DEFAULT_RESPONSE_CACHE_PROPERTIES)
+    if properties and properties.get("cache"):
+        cache_properties.update(
+            {
+                key: value
+                for key, value in properties["cache"].items()
+                if key in DEFAULT_RESPONSE_CACHE_PROPERTIES
+            }
+        )
+    return cache_properties
+
+
+def get_auth_identity(headers) -> str:
+    """
+    Determine the identity a request is sent for, such that responses received by one user are never returned to
+    another one. For bearer tokens, the subject of the token is used, which does not change if the token is
+    refreshed. Other credentials are hashed.
+
+    :param headers: The request headers.
+    :return: The identity or an empty string for anonymous requests.
+    """
+    authorization = headers.get("Authorization") if headers else None
+    if not authorization:
+        return ""
+    if authorization.startswith("Bearer "):
+        try:
+            # the token was issued by KeyCloak, it is only read and not verified here
+            payload = authorization[7:].split(".")[1]
+            claims = json.loads(
+                base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+            )
+            return "sub:" + claims["sub"]
+        except (IndexError, ValueError, KeyError, TypeError):
+            pass
+    return "hash:" + hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent cache of JSON responses to GET requests, stored in an SQLite database in the cache folder. Entries are
+    identified by URL, accepted media type and identity of the user. Entries younger than 'response_ttl' seconds are
+    returned without contacting the server, older entries are revalidated using their ETag. If more than
+    'max_responses' entries are stored, the least recently used ones are removed.
+    """
+
+    def __init__(self, database_file: str, cache_properties):
+        self.ttl = float(cache_properties["response_ttl"])
+        self.max_responses = max(int(cache_properties["max_responses"]), 1)
+        self.max_response_size = int(cache_properties["max_response_size"])
+        self.lock = threading.Lock()
+        # shared by all threads of a client, access is serialized via the lock
+        self.connection = sqlite3.connect(
+            database_file, timeout=5.0, check_same_thread=False
+        )
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, resource TEXT, "
+                "etag TEXT, content BLOB, stored REAL, accessed REAL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_resource ON responses (resource)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS statistics (outcome TEXT PRIMARY KEY, count INTEGER)"
+            )
+
+    @staticmethod
+    def get_key(url: str, headers) -> str:
+        accept = headers.get("Accept", "") if headers else ""
+        key = "|".join([url, accept, get_auth_identity(headers)])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def execute(self, statement: str, parameters=()) -> Optional[list]:
+        """
+        Execute a statement in its own transaction. As the cache is only an optimization, failures, e.g., due to a
+        database locked by another process for too long, are ignored.
+
+        :return: All result rows or None, if the statement failed.
+        """
+        try:
+            with self.lock, self.connection:
+                return self.connection.execute(statement, parameters).fetchall()
+        except sqlite3.Error:
+            return None
+
+    def lookup(self, key: str):
+        """
+        Obtain a cached response and mark it as recently used.
+
+        :param key: The key obtained via get_key().
+        :return: A tuple of content, ETag and a flag telling whether the entry is still fresh, or None.
+        """
+        rows = self.execute(
+            "SELECT content, etag, stored FROM responses WHERE key = ?", (key,)
+        )
+        if not rows:
+            return None
+        content, etag, stored = rows[0]
+        now = time.time()
+        self.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return content, etag, now - stored < self.ttl
+
+    def store(self, key: str, url: str, response) -> bool:
+        """
+        Keep a received JSON response. Other responses and responses larger than 'max_response_size' are not cached.
+
+        :return: True if the response was stored.
+        """
+        content = response.content
+        if (
+            "json" not in response.headers.get("Content-Type", "")
+            or len(content) > self.max_response_size
+        ):
+            return False
+        now = time.time()
+        self.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (key, url.split("?")[0], response.headers.get("etag"), content, now, now),
+        )
+        # remove the least recently used entries
+        self.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+            "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_responses,),
+        )
+        return True
+
+    def refresh(self, key: str):
+        """
+        Restart the lifetime of an entry after the server confirmed that it is still up to date.
+        """
+        self.execute(
+            "UPDATE responses SET stored = ? WHERE key = ?", (time.time(), key)
+        )
+
+    def invalidate(self, url: str):
+        """
+        Remove all entries of a modified or deleted element, including versions requested via query parameters, as
+        well as the entries of all elements containing it, e.g., the data resource of a content element, and of all
+        listings it may appear in, e.g., /api/v1/dataresources/.
+        """
+        resource = url.split("?")[0]
+        self.execute(
+            "DELETE FROM responses WHERE resource = ? OR instr(?, resource || '/') = 1 "
+            "OR (substr(resource, -1) = '/' AND instr(?, resource) = 1)",
+            (resource, resource, resource),
+        )
+
+    def record(self, outcome: str):
+        self.execute(
+            "INSERT INTO statistics VALUES (?, 1) "
+            "ON CONFLICT (outcome) DO UPDATE SET count = count + 1",
+            (outcome,),
+        )
+
+    def get_statistics(self) -> dict:
+        """
+        Summarize the usage of the cache since it was created.
+
+        :return: A dictionary containing the number of entries, their total size, the number of lookups per outcome
+        and the ratios of requests answered from the cache.
+        """
+        statistics = {"entries": 0, "size": 0}
+        rows = self.execute("SELECT COUNT(*), SUM(LENGTH(content)) FROM responses")
+        if rows:
+            statistics["entries"] = rows[0][0]
+            statistics["size"] = rows[0][1] or 0
+        counts = dict(self.execute("SELECT outcome, count FROM statistics") or [])
+        for outcome in CACHE_OUTCOMES:
+            statistics[outcome] = counts.get(outcome, 0)
+        lookups = sum(statistics[outcome] for outcome in CACHE_OUTCOMES)
+        statistics["lookups"] = lookups
+        # hits do not contact the server at all, revalidations do not transfer the body again
+        statistics["hit_ratio"] = (
+            round(statistics["hits"] / lookups, 4) if lookups else 0.0
+        )
+        statistics["reuse_ratio"] = (
+            round((statistics["hits"] + statistics["revalidations"]) / lookups, 4)
+            if lookups
+            else 0.0
+        )
+        return statistics
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def get_response_cache_file(cache_dir: str) -> str:
+    return os.path.join(cache_dir, "responses.sqlite")
+
+
+def open_response_cache(cache_dir: str, cache_properties) -> Optional[ResponseCache]:
+    """
+    Open the response cache in the provided cache folder.
+
+    :return: The response cache or None, if the database cannot be opened.
+    """
+    try:
+        return ResponseCache(get_response_cache_file(cache_dir), cache_properties)
+    except sqlite3.Error:
+        return None
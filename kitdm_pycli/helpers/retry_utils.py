@@ -0,0 +1,99 @@
+import datetime
+import random
+import time
+from typing import Optional
+
+DEFAULT_RETRY_PROPERTIES = {
+    "max_attempts": 3,
+    "backoff_factor": 0.5,
+    "max_backoff": 30.0,
+    "status_codes": [429, 502, 503, 504],
+    "methods": ["GET", "HEAD", "PUT", "DELETE", "OPTIONS"],
+    "respect_retry_after": True,
+}
+
+
+def get_retry_properties(properties):
+    """
+    Obtain the retry policy from the optional 'retry' section of the properties. Missing entries are filled with
+    default values. By default, only idempotent requests are retried.
+
+    :param properties: The entire properties dictionary loaded from properties.json.
+    :return: A dictionary containing all retry settings.
+    """
+    retry_properties = dict(DEFAULT_RETRY_PROPERTIES)
+    if properties and "retry" in properties and properties["retry"]:
+        retry_properties.update(properties["retry"])
+    return retry_properties
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the value of a Retry-After header, which is either a number of seconds or an HTTP date.
+
+    :param value: The header value.
+    :return: The number of seconds to wait or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    # email.utils is only needed for HTTP dates, which are rarely sent
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((retry_at - now).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is sent again and how long to wait before. The delay grows exponentially with
+    each attempt and is randomized (full jitter), such that concurrent clients do not retry at the same time. A
+    Retry-After header sent by the server takes precedence, limited by 'max_backoff'.
+    """
+
+    def __init__(self, retry_properties):
+        self.max_attempts = max(int(retry_properties["max_attempts"]), 1)
+        self.backoff_factor = float(retry_properties["backoff_factor"])
+        self.max_backoff = float(retry_properties["max_backoff"])
+        self.status_codes = set(retry_properties["status_codes"])
+        self.methods = {method.upper() for method in retry_properties["methods"]}
+        self.respect_retry_after = bool(retry_properties["respect_retry_after"])
+
+    def can_retry(self, method: str, attempt: int) -> bool:
+        """
+        :param method: The HTTP method of the request.
+        :param attempt: The number of attempts made so far.
+        :return: True if the request may be sent once more.
+        """
+        return method.upper() in self.methods and attempt < self.max_attempts
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in self.status_codes
+
+    def get_delay(self, attempt: int, response=None) -> float:
+        """
+        Determine the time to wait before the next attempt.
+
+        :param attempt: The number of attempts made so far.
+        :param response: The last response, if any, which may contain a Retry-After header.
+        :return: The delay in seconds.
+        """
+        if self.respect_retry_after and response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        return random.uniform(0, backoff)
+
+    @staticmethod
+    def wait(delay: float):
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Optional
+
+
+def write_atomically(path: str, content: bytes):
+    """
+    Write a file via a temporary file in the same folder, such that concurrent readers never see partial content.
+    """
+    handle, part_file = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(handle, "wb") as f:
+            f.write(content)
+        os.replace(part_file, path)
+    finally:
+        if os.path.exists(part_file):
+            os.remove(part_file)
+
+
+class SchemaStore:
+    """
+    Content-addressed local store of schema documents received from a MetaStore instance. Each distinct schema
+    document is stored once, named by its SHA-256 digest. References map server, schema id and version to a digest.
+    As a version of a schema never changes, a referenced version is returned without contacting the server. For the
+    latest version, the ETag is kept as well, such that the server only has to confirm that it is still current.
+    """
+
+    def __init__(self, cache_dir: str, server_url: str):
+        self.server_url = server_url
+        store_dir = os.path.join(cache_dir, "schemas")
+        self.objects_dir = os.path.join(store_dir, "objects")
+        self.refs_dir = os.path.join(store_dir, "refs")
+        os.makedirs(self.objects_dir, mode=0o700, exist_ok=True)
+        os.makedirs(self.refs_dir, mode=0o700, exist_ok=True)
+        # documents read during this invocation by digest
+        self.documents = {}
+        self.lock = threading.Lock()
+
+    def get_ref_file(self, schema_id: str, version: Optional[int]) -> str:
+        key = "|".join([self.server_url, schema_id, str(version or "latest")])
+        return os.path.join(
+            self.refs_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+        )
+
+    def load_ref(self, schema_id: str, version: Optional[int]) -> Optional[dict]:
+        """
+        Read the reference of a schema version.
+
+        :param schema_id: The schema identifier.
+        :param version: The schema version or None for the latest version.
+        :return: A dictionary containing the digest and, for the latest version, the ETag, or None.
+        """
+        try:
+            with open(self.get_ref_file(schema_id, version)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read(self, digest: str) -> Optional[bytes]:
+        """
+        Read a stored schema document. Documents not matching their digest, e.g., after a partial copy, are ignored.
+
+        :param digest: The SHA-256 digest of the document.
+        :return: The document or None, if it is not stored.
+        """
+        with self.lock:
+            if digest in self.documents:
+                return self.documents[digest]
+        try:
+            with open(os.path.join(self.objects_dir, digest), "rb") as f:
+                content = f.read()
+        except OSError:
+            return None
+        if hashlib.sha256(content).hexdigest() != digest:
+            return None
+        with self.lock:
+            self.documents[digest] = content
+        return content
+
+    def get(self, schema_id: str, version: Optional[int]):
+        """
+        Obtain a stored schema document.
+
+        :param schema_id: The schema identifier.
+        :param version: The schema version or None for the latest version.
+        :return: A tuple of document and ETag, or None if the schema version is not stored.
+        """
+        ref = self.load_ref(schema_id, version)
+        if not ref:
+            return None
+        content = self.read(ref["digest"])
+        if content is None:
+            return None
+        return content, ref.get("etag")
+
+    def put(
+        self,
+        schema_id: str,
+        version: Optional[int],
+        content: bytes,
+        etag: Optional[str] = None,
+    ):
+        """
+        Store a schema document and reference it by schema id and version.
+
+        :param schema_id: The schema identifier.
+        :param version: The schema version or None for the latest version.
+        :param content: The schema document.
+        :param etag: The ETag of the latest version, used to revalidate it later.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        object_file = os.path.join(self.objects_dir, digest)
+        if not os.path.exists(object_file):
+            write_atomically(object_file, content)
+        with self.lock:
+            self.documents[digest] = content
+        ref = {"digest": digest}
+        if etag:
+            ref["etag"] = etag
+        write_atomically(
+            self.get_ref_file(schema_id, version), json.dumps(ref).encode("utf-8")
+        )
@@ -2,19 +2,84 @@ import os
 import sys
 import json
 import getpass
-import requests
 import datetime
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
 from json import JSONDecodeError
 from typing import Optional
-from keycloak import (
-    KeycloakOpenID,
-    KeycloakConnectionError,
-    KeycloakAuthenticationError,
+from kitdm_pycli.helpers.http_utils import create_session, get_http_properties
+from kitdm_pycli.helpers.retry_utils import RetryPolicy, get_retry_properties
+from kitdm_pycli.helpers.throttle_utils import Throttle, get_throttle_properties
+from kitdm_pycli.helpers.cache_utils import get_cache_dir
+from kitdm_pycli.helpers.token_cache import TokenCache
+from kitdm_pycli.helpers.response_cache import (
+    get_response_cache_file,
+    get_response_cache_properties,
+    open_response_cache,
 )
+from kitdm_pycli.helpers.exceptions import (
+    AuthenticationError,
+    ConfigurationError,
+    ServiceConnectionError,
+    error_for_status,
+)
+
+# max. number of ETags and documents kept per client, the least recently stored ones are removed first
+MAX_CACHED_ETAGS = 1000
+
+
+def etag_cache_accept(headers) -> Optional[str]:
+    if headers:
+        return headers.get("Accept")
+    return None
+
+
+def get_payload_objects(data, files) -> list:
+    """
+    Collect the request body and all file objects of a multipart request.
+
+    :param data: The request body.
+    :param files: The files sent as multipart request, either as dictionary or list of tuples.
+    :return: A list of all payload objects.
+    """
+    items = [data]
+    if isinstance(files, dict):
+        items += list(files.values())
+    elif files:
+        items += [value for _, value in files]
+    # (filename, file object, content type)
+    return [item[1] if isinstance(item, tuple) else item for item in items]
+
+
+def is_rewindable(data, files) -> bool:
+    """
+    Check whether a request payload can be sent again, i.e., all contained streams can be reset to their beginning.
+    """
+    return all(
+        hasattr(item, "seek")
+        for item in get_payload_objects(data, files)
+        if hasattr(item, "read")
+    )
+
+
+def rewind_payload(data, files):
+    """
+    Reset all file objects contained in a request payload to their beginning, such that the request can be sent again.
+
+    :param data: The request body.
+    :param files: The files sent as multipart request, either as dictionary or list of tuples.
+    """
+    for item in get_payload_objects(data, files):
+        if hasattr(item, "seek"):
+            item.seek(0)
 
 
 class ServiceClient(ABC):
+    # the section of the properties containing the settings of the service
+    properties_section = None
+
     def __init__(self, debug):
         properties_filename = os.environ.get("PYCLI_PROPERTIES")
         if not properties_filename:
@@ -26,23 +91,55 @@ class ServiceClient(ABC):
             self.refresh_token = None
             self.token_expires = None
             self.refresh_token_expires = None
+            self.token_cache = None
+            self.keycloak_openid = None
+            self.userinfo = None
+            # False if the user cannot be asked for missing credentials, e.g., in the daemon
+            self.interactive = True
+            # ETags of received resources by URL and accepted media type
+            self.etag_cache = OrderedDict()
+            # JSON documents received with the cached ETags
+            self.document_cache = {}
+            self.etag_cache_lock = threading.Lock()
+            # URLs of patches which were retried with a refreshed ETag, removed again by patch()
+            self.precondition_retries = set()
+            # number of HTTP requests sent by this client
+            self.request_count = 0
+            self.retry_count = 0
+            self.retry_wait = 0.0
+            self.request_count_lock = threading.Lock()
+            # serializes logins if requests are sent concurrently
+            self.login_lock = threading.Lock()
             f = open(properties_filename)
             self.properties = json.load(f)
             f.close()
+            # one pooled session per client, shared by all requests of this client and created at first use
+            self.http_properties = get_http_properties(self.properties)
+            self.session = None
+            self.session_lock = threading.Lock()
+            self.chunk_size = int(self.http_properties["chunk_size"])
+            self.retry_policy = RetryPolicy(get_retry_properties(self.properties))
+            self.throttle = Throttle(
+                get_throttle_properties(self.properties.get(self.properties_section))
+            )
+            # persistent cache of GET responses, opened at first use if enabled
+            self.response_cache_properties = get_response_cache_properties(
+                self.properties
+            )
+            self.use_response_cache = bool(self.response_cache_properties["responses"])
+            self.response_cache = None
             return
-        except FileNotFoundError:
-            ServiceClient.print_error(
+        except FileNotFoundError as e:
+            raise ConfigurationError(
                 "PyCli properties not found at " + properties_filename + "."
-            )
-            exit(2)
+            ) from e
         except JSONDecodeError as f:
-            ServiceClient.print_error(
+            raise ConfigurationError(
                 "Invalid PyCli properties file format in file "
                 + properties_filename
                 + ". Message: "
                 + f.msg
-            )
-            exit(2)
+            ) from f
 
     @abstractmethod
     def create(
@@ -103,6 +200,7 @@ class ServiceClient(ABC):
         path: Optional[str],
         version: Optional[int],
         auth: bool = False,
+        output: Optional[str] = None,
     ):
         pass
 
@@ -110,21 +208,157 @@ class ServiceClient(ABC):
     def render_response(self, content: list, render_as: str):
         pass
 
+    def iterate_pages(
+        self,
+        resource_id: Optional[str],
+        path: Optional[str],
+        query_params: Optional[list],
+        auth: bool = False,
+        prefetch: bool = False,
+    ):
+        """
+        Lazily iterate over all pages of a listing obtained via get(). Starting at the page contained in query_params,
+        pages are requested one after another until an empty page or a page smaller than the page size is received.
+        Optionally, the next page is requested in the background while the current page is processed by the caller.
+
+        :param resource_id: The resource identifier passed to get().
+        :param path: The path passed to get().
+        :param query_params: All query parameters in a list, typically including 'page' and 'size' entries.
+        :param auth: True|False Either perform or skip authorization.
+        :param prefetch: True|False Either request the next page in the background or not.
+        :return: A generator yielding one list of elements per page.
+        """
+        query_params = list(query_params) if query_params else []
+        page = 0
+        page_size = 20
+        for param in query_params:
+            if param["name"] == "page" and param["value"] != "None":
+                page = int(param["value"])
+            elif param["name"] == "size" and param["value"] != "None":
+                page_size = int(param["value"])
+        other_params = [p for p in query_params if p["name"] not in ("page", "size")]
+
+        def get_page(page_number):
+            page_params = other_params + [
+                {"name": "page", "value": str(page_number)},
+                {"name": "size", "value": str(page_size)},
+            ]
+            return self.get(resource_id, path, page_params, auth)
+
+        if not prefetch:
+            while True:
+                elements = get_page(page)
+                if not elements:
+                    return
+                yield elements
+                if len(elements) < page_size:
+                    return
+                page += 1
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = executor.submit(get_page, page)
+            while True:
+                elements = next_page.result()
+                if not elements:
+                    return
+                if len(elements) == page_size:
+                    # request the following page while the current one is processed
+                    next_page = executor.submit(get_page, page + 1)
+                yield elements
+                if len(elements) < page_size:
+                    return
+                page += 1
+
     def login(self, do_auth, headers) -> bool:
         if not do_auth:
             # skip login
             self.print_debug("Skipping KeyCloak login.")
             return True
 
-        keycloak_openid = KeycloakOpenID(
-            server_url=self.properties["keycloak"]["server_url"],
-            client_id=self.properties["keycloak"]["client_id"],
-            realm_name=self.properties["keycloak"]["realm_name"],
-        )
+        with self.login_lock:
+            return self.keycloak_login(headers)
+
+    def get_token_cache(self) -> Optional[TokenCache]:
+        """
+        Obtain the on-disk token cache for the configured KeyCloak server, realm, client and user. The cache can be
+        disabled by setting 'token_cache' to false in the keycloak section of the properties.
+
+        :return: The token cache or None, if the cache is disabled.
+        """
+        keycloak_properties = self.properties["keycloak"]
+        if not keycloak_properties.get("token_cache", True):
+            return None
+        if not self.token_cache:
+            self.token_cache = TokenCache(
+                get_cache_dir(self.properties),
+                keycloak_properties["server_url"],
+                keycloak_properties["realm_name"],
+                keycloak_properties["client_id"],
+                keycloak_properties.get("username"),
+            )
+        return self.token_cache
+
+    def forget_tokens(self):
+        """
+        Discard the tokens of this client and remove them from the token cache, e.g., if they were rejected, such that
+        the next login does not use them again.
+        """
+        self.print_debug("Discarding rejected tokens.")
+        self.access_token = None
+        self.token_expires = None
+        self.refresh_token = None
+        self.refresh_token_expires = None
+        if self.token_cache:
+            self.token_cache.clear()
+
+    def get_keycloak_openid(self):
+        """
+        Obtain the KeyCloak client of this service client, which is created at the first call and reused afterwards.
+
+        :return: The KeycloakOpenID object.
+        """
+        if not self.keycloak_openid:
+            # only imported if authentication is used
+            from keycloak import KeycloakOpenID
+
+            self.keycloak_openid = KeycloakOpenID(
+                server_url=self.properties["keycloak"]["server_url"],
+                client_id=self.properties["keycloak"]["client_id"],
+                realm_name=self.properties["keycloak"]["realm_name"],
+            )
+        return self.keycloak_openid
+
+    def keycloak_login(self, headers) -> bool:
+        token_cache = self.get_token_cache()
+        if not self.access_token and token_cache:
+            # obtain tokens of previous invocations
+            cached_token = token_cache.load()
+            if cached_token:
+                self.print_debug("Using tokens from token cache.")
+                self.access_token = cached_token["access_token"]
+                self.token_expires = cached_token["token_expires"]
+                self.refresh_token = cached_token["refresh_token"]
+                self.refresh_token_expires = cached_token["refresh_token_expires"]
+
+        in_thirty_seconds = datetime.datetime.now() + datetime.timedelta(seconds=30)
+        if (
+            self.access_token
+            and self.token_expires
+            and in_thirty_seconds < self.token_expires
+        ):
+            # token lifetime larger 30 seconds -> reuse token
+            self.print_debug("Adding valid access token to request header.")
+            headers["Authorization"] = "Bearer " + self.access_token
+            return True
+
+        from keycloak import KeycloakConnectionError, KeycloakAuthenticationError
+        from keycloak.exceptions import KeycloakError
+
+        keycloak_openid = self.get_keycloak_openid()
         try:
             # first check for possibility to refresh
             self.print_debug("Starting KeyCloak login.")
-            in_thirty_seconds = datetime.datetime.now() + datetime.timedelta(seconds=30)
+            token = None
             if (
                 self.token_expires
                 and in_thirty_seconds > self.token_expires
@@ -134,19 +368,33 @@ class ServiceClient(ABC):
             ):
                 # token lifetime smaller 30 seconds, refresh token available and still usable -> do refresh
                 self.print_debug("Refreshing existing JSON Web Token via KeyCloak.")
-                token = keycloak_openid.refresh_token(self.refresh_token, "password")
-            else:
+                try:
+                    token = keycloak_openid.refresh_token(self.refresh_token)
+                except KeycloakConnectionError:
+                    raise
+                except KeycloakError as e:
+                    # refresh token rejected, e.g., as the session has ended
+                    self.print_debug(
+                        "Failed to refresh token. Message: " + str(e.error_message)
+                    )
+                    self.forget_tokens()
+            if not token:
                 # no refresh possible, either due to initial receive or refresh token expired
                 self.print_debug(
                     "No refresh token found. Performing initial login to KeyCloak."
                 )
                 username = self.properties["keycloak"]["username"]
-                if not username:
-                    username = input("Username: ")
                 password = None
                 if "password" in self.properties["keycloak"]:
                     password = self.properties["keycloak"]["password"]
-                
+                if not (username and password) and not self.interactive:
+                    raise AuthenticationError(
+                        "Username and password must be configured in the properties "
+                        "for logging in without user interaction."
+                    )
+
+                if not username:
+                    username = input("Username: ")
                 if not password:
                     password = getpass.getpass("Password: ")
                 self.print_debug("Performing KeyCloak login.")
@@ -168,11 +416,23 @@ class ServiceClient(ABC):
                     self.print_debug("Extracting refresh token from response.")
                     self.refresh_token = token["refresh_token"]
 
+                if token_cache:
+                    self.print_debug("Writing tokens to token cache.")
+                    token_cache.save(
+                        self.access_token,
+                        self.token_expires,
+                        self.refresh_token,
+                        self.refresh_token_expires,
+                    )
+
                 self.print_debug("Adding access token to request header.")
                 headers["Authorization"] = "Bearer " + self.access_token
                 if self.debug:
-                    self.print_debug("Obtaining user information from KeyCloak.")
-                    userinfo = keycloak_openid.userinfo(token["access_token"])
+                    if not self.userinfo:
+                        # only obtained once, the user does not change with a refreshed token
+                        self.print_debug("Obtaining user information from KeyCloak.")
+                        self.userinfo = keycloak_openid.userinfo(token["access_token"])
+                    userinfo = self.userinfo
                     self.print_debug(
                         "Successfully logged in as username: "
                         + userinfo["preferred_username"]
@@ -184,20 +444,18 @@ class ServiceClient(ABC):
                     )
                 return True
             else:
-                self.print_error("No access_token found in KeyCloak response.")
+                raise AuthenticationError("No access_token found in KeyCloak response.")
         except KeycloakConnectionError as e:
-            self.print_error(
+            raise ServiceConnectionError(
                 "Failed to connect to KeyCloak instance. Message: "
                 + str(e.error_message)
-            )
+            ) from e
         except KeycloakAuthenticationError as f:
-            self.print_error(
+            self.forget_tokens()
+            raise AuthenticationError(
                 "Failed to authenticate at KeyCloak instance. Message: "
                 + str(f.error_message)
-            )
-
-        # if we did not return, yet, login has failed
-        return False
+            ) from f
 
     @classmethod
     def check_file_exists(cls, file_path: str) -> bool:
@@ -211,144 +469,472 @@ class ServiceClient(ABC):
     def print_error(cls, message: str):
         print(message, file=sys.stderr)
 
-    def do_get(self, base_url: str, path: str, headers):
-        url = base_url + path
-        self.print_debug("Performing GET " + url)
-        try:
-            response = requests.request("GET", url, headers=headers)
+    def close(self):
+        """
+        Close all pooled connections held by this client.
+        """
+        if self.session:
+            self.session.close()
+        if self.response_cache:
+            self.response_cache.close()
+            self.response_cache = None
 
-            if response.status_code == 200:
-                # render result
-                self.print_debug("Successfully received HTTP 200. Returning response.")
-                return response.content
-            else:
-                self.print_error(
-                    "Server returned status "
-                    + str(response.status_code)
-                    + ". Body: "
-                    + str(response.content)
+    def get_response_cache(self, force: bool = False):
+        """
+        Obtain the persistent response cache, which is opened at the first call. The cache can be enabled via
+        'responses' in the 'cache' section of the properties or via --cache.
+
+        :param force: If True, the cache is opened even if it is disabled, e.g., to report its statistics.
+        :return: The response cache or None, if the cache is disabled or cannot be opened.
+        """
+        if not (self.use_response_cache or force):
+            return None
+        with self.etag_cache_lock:
+            if not self.response_cache:
+                self.response_cache = open_response_cache(
+                    get_cache_dir(self.properties), self.response_cache_properties
                 )
-                exit(2)
-        except requests.exceptions.RequestException as e:
-            self.print_error("Failed to connect to " + base_url + ".")
-            raise SystemExit(e)
+            return self.response_cache
 
-    def do_get_etag(self, base_url: str, path: str, headers) -> str:
-        url = base_url + path
-        self.print_debug("Performing GET " + url)
-        try:
-            response = requests.request("GET", url, headers=headers)
+    def has_response_cache(self) -> bool:
+        """
+        Check whether a response cache was created before, e.g., by an invocation with --cache, even if the cache is
+        disabled for this client.
+        """
+        return os.path.exists(get_response_cache_file(get_cache_dir(self.properties)))
 
-            if response.status_code == 200:
-                # render result
-                self.print_debug("Successfully received HTTP 200. Extracting ETag.")
-                return response.headers.get("etag")
-            else:
-                self.print_error(
-                    "Server returned status "
-                    + str(response.status_code)
-                    + ". Body: "
-                    + str(response.content)
-                )
-                exit(2)
-        except requests.exceptions.RequestException as e:
-            self.print_error("Failed to connect to " + base_url + ".")
-            raise SystemExit(e)
+    def get_response_cache_statistics(self) -> dict:
+        """
+        :return: The statistics of the response cache, see ResponseCache.get_statistics().
+        """
+        response_cache = self.get_response_cache(force=True)
+        if not response_cache:
+            raise ConfigurationError("Response cache could not be opened.")
+        return response_cache.get_statistics()
 
-    def do_post(self, base_url: str, path: str, headers, payload):
+    def get_session(self):
+        """
+        Obtain the pooled session of this client, which is created at the first call.
+
+        :return: The requests.Session object.
+        """
+        with self.session_lock:
+            if not self.session:
+                self.session = create_session(self.http_properties)
+            return self.session
+
+    def do_request(
+        self,
+        method: str,
+        base_url: str,
+        path: str,
+        headers,
+        expected_status,
+        data=None,
+        files=None,
+        stream: bool = False,
+    ):
+        """
+        Send a single request via the pooled session of this client. If the server responds with the expected status,
+        the response is returned. Otherwise, a ServiceError or, if the service cannot be reached, a
+        ServiceConnectionError is raised.
+
+        :param method: The HTTP method, e.g., GET or POST.
+        :param base_url: The base URL of the service.
+        :param path: The path appended to the base URL.
+        :param headers: The request headers.
+        :param expected_status: The HTTP status expected for a successful request or a tuple of expected statuses.
+        :param data: An optional request body.
+        :param files: Optional files sent as multipart request.
+        :param stream: If True, the response body is not read before returning the response.
+        :return: The response object.
+        """
         url = base_url + path
-        self.print_debug("Performing POST " + url)
-        try:
-            if isinstance(payload, str):
-                self.print_debug("Posting payload in body.")
-                response = requests.request("POST", url, headers=headers, data=payload)
-            else:
-                self.print_debug("Posting payload as files.")
-                response = requests.request("POST", url, headers=headers, files=payload)
+        response = self.send_request(method, url, headers, data, files, stream)
 
-            if response.status_code == 201:
-                # render result
-                self.print_debug("Successfully received HTTP 201. Returning response.")
-                return response.content
-            else:
-                self.print_error(
-                    "Server returned status "
-                    + str(response.status_code)
-                    + ". Body: "
-                    + str(response.content)
+        if (
+            response.status_code == 412
+            and method in ("PUT", "PATCH", "DELETE")
+            and headers
+            and headers.get("If-Match")
+        ):
+            # the ETag used is outdated, obtain the current one and retry once
+            self.print_debug("Precondition failed. Retrying with current ETag.")
+            self.forget_etags(url)
+            if method == "PATCH":
+                # only patch() needs to know, whether a document obtained before is outdated
+                with self.etag_cache_lock:
+                    self.precondition_retries.add(url)
+            headers = dict(headers)
+            headers["If-Match"] = self.do_get_etag(base_url, path, headers)
+            rewind_payload(data, files)
+            response = self.send_request(method, url, headers, data, files, stream)
+
+        if response.status_code == 401 and headers and headers.get("Authorization"):
+            # the access token was rejected, e.g., as it was revoked
+            with self.login_lock:
+                if headers["Authorization"] == "Bearer " + str(self.access_token):
+                    self.forget_tokens()
+
+        if 200 <= response.status_code < 300:
+            self.remember_etag(method, url, headers, response, stream)
+            response_cache = (
+                self.get_response_cache(
+                    force=self.use_response_cache or self.has_response_cache()
                 )
-                exit(2)
-        except requests.exceptions.RequestException as e:
-            self.print_error("Failed to connect to " + base_url + ".")
-            raise SystemExit(e)
+                if method not in ("GET", "HEAD")
+                else None
+            )
+            if response_cache:
+                # cached responses of the modified element are outdated, also for invocations using the cache later
+                response_cache.invalidate(url)
 
-    def do_put(self, base_url: str, path: str, headers, payload):
-        url = base_url + path
-        self.print_debug("Performing PUT " + url)
-        try:
-            if isinstance(payload, str):
-                self.print_debug("Putting payload in body.")
-                response = requests.request("PUT", url, headers=headers, data=payload)
-            else:
-                self.print_debug("Putting payload as files.")
-                response = requests.request("PUT", url, headers=headers, files=payload)
+        if not isinstance(expected_status, tuple):
+            expected_status = (expected_status,)
+        if response.status_code in expected_status:
+            return response
+        else:
+            raise error_for_status(response.status_code, url, response.content)
 
-            if response.status_code == 200:
-                # render result
-                self.print_debug("Successfully received HTTP 200. Returning response.")
-                return response.content
-            else:
-                self.print_error(
-                    "Server returned status "
-                    + str(response.status_code)
-                    + ". Body: "
-                    + str(response.content)
+    def send_request(self, method: str, url: str, headers, data, files, stream: bool):
+        """
+        Send a request according to the retry policy of this client. Requests failing due to connection errors or
+        with a retryable status, e.g., 503, are sent again after a delay, as long as the method may be retried and
+        the payload can be rewound.
+
+        :return: The last received response.
+        :raises ServiceConnectionError: If the last attempt failed due to a connection error.
+        """
+        import requests
+
+        session = self.get_session()
+        policy = self.retry_policy
+        retryable = is_rewindable(data, files)
+        attempt = 0
+        waited = 0.0
+        while True:
+            attempt += 1
+            response = None
+            try:
+                self.count_request()
+                with self.throttle.slot() as record_status:
+                    response = session.request(
+                        method,
+                        url,
+                        headers=headers,
+                        data=data,
+                        files=files,
+                        stream=stream,
+                    )
+                    if record_status(response.status_code):
+                        self.print_debug(
+                            "Server is overloaded. Reduced max. number of concurrent "
+                            "requests to " + str(self.throttle.limiter.limit) + "."
+                        )
+                if not policy.is_retryable_status(response.status_code):
+                    break
+                reason = "status " + str(response.status_code)
+            except requests.exceptions.RequestException as e:
+                if not (retryable and policy.can_retry(method, attempt)):
+                    raise ServiceConnectionError(
+                        "Failed to connect to " + url + "."
+                    ) from e
+                reason = type(e).__name__
+            if not (retryable and policy.can_retry(method, attempt)):
+                break
+            delay = policy.get_delay(attempt, response)
+            if response is not None:
+                response.close()
+            self.print_debug(
+                "Attempt {} of {} {} failed with {}. Retrying in {:.2f}s.".format(
+                    attempt, method, url, reason, delay
                 )
-                exit(2)
-        except requests.exceptions.RequestException as e:
-            self.print_error("Failed to connect to " + base_url + ".")
-            raise SystemExit(e)
+            )
+            policy.wait(delay)
+            waited += delay
+            rewind_payload(data, files)
+
+        if attempt > 1:
+            self.print_debug(
+                "{} {} took {} attempt(s), waited {:.2f}s in total.".format(
+                    method, url, attempt, waited
+                )
+            )
+            with self.request_count_lock:
+                self.retry_count += attempt - 1
+                self.retry_wait += waited
+        return response
+
+    def do_get(self, base_url: str, path: str, headers, use_cache: bool = True):
+        """
+        Perform a GET request and return the response body. If the response cache is enabled, fresh cached responses
+        are returned without contacting the server and outdated ones are revalidated via If-None-Match.
+
+        :param base_url: The base URL of the service.
+        :param path: The path appended to the base URL.
+        :param headers: The request headers.
+        :param use_cache: False to bypass the response cache, e.g., if the current version is required.
+        :return: The response body.
+        """
+        response_cache = self.get_response_cache() if use_cache else None
+        if not response_cache:
+            self.print_debug("Performing GET " + base_url + path)
+            response = self.do_request("GET", base_url, path, headers, 200)
+            # render result
+            self.print_debug("Successfully received HTTP 200. Returning response.")
+            return response.content
 
-    def do_delete(self, base_url: str, path: str, headers):
         url = base_url + path
-        self.print_debug("Performing DELETE " + url)
-        try:
-            response = requests.request("DELETE", url, headers=headers)
+        key = response_cache.get_key(url, headers)
+        entry = response_cache.lookup(key)
+        if entry and entry[2]:
+            self.print_debug("Returning cached response for GET " + url)
+            response_cache.record("hits")
+            return entry[0]
+        if entry and entry[1]:
+            self.print_debug("Revalidating cached response for GET " + url)
+            headers = dict(headers)
+            headers["If-None-Match"] = entry[1]
+        else:
+            self.print_debug("Performing GET " + url)
+        response = self.do_request("GET", base_url, path, headers, (200, 304))
+        if response.status_code == 304:
+            self.print_debug("Cached response is still valid. Returning it.")
+            response_cache.refresh(key)
+            response_cache.record("revalidations")
+            return entry[0]
+        self.print_debug("Successfully received HTTP 200. Returning response.")
+        response_cache.store(key, url, response)
+        response_cache.record("misses")
+        return response.content
 
-            if response.status_code == 204:
-                # render result
-                self.print_debug("Successfully received HTTP 204. Returning True.")
-                return True
-            else:
-                self.print_error(
-                    "Server returned status "
-                    + str(response.status_code)
-                    + ". Body: "
-                    + str(response.content)
-                )
-                exit(2)
+    def do_download(self, base_url: str, path: str, headers, output: str):
+        """
+        Stream the response body of a GET request directly into a local file. The body is written in chunks of
+        'chunk_size' bytes, such that memory consumption is independent of the size of the download. The data is
+        received in a temporary file next to the output file, which is renamed after the download has finished.
+
+        :param base_url: The base URL of the service.
+        :param path: The path appended to the base URL.
+        :param headers: The request headers.
+        :param output: The path of the local output file.
+        :return: The path of the output file.
+        """
+        import requests
+
+        self.print_debug("Performing streaming GET " + base_url + path)
+        response = self.do_request("GET", base_url, path, headers, 200, stream=True)
+        self.print_debug("Successfully received HTTP 200. Writing body to " + output)
+        part_file = output + ".part"
+        try:
+            with open(part_file, "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+            os.replace(part_file, output)
         except requests.exceptions.RequestException as e:
-            self.print_error("Failed to connect to " + base_url + ".")
-            raise SystemExit(e)
+            raise ServiceConnectionError(
+                "Download from " + base_url + " interrupted."
+            ) from e
+        finally:
+            response.close()
+            if os.path.exists(part_file):
+                os.remove(part_file)
+        return output
 
-    def do_patch(self, base_url: str, path: str, headers, payload: str):
+    def apply_options(self, debug: bool, cache: Optional[bool] = None):
+        """
+        Apply the global command line switches of an operation, which may differ between the operations performed
+        by one client, e.g., in shell mode.
+
+        :param debug: True|False Either print debug output or not.
+        :param cache: True|False Either use the response cache or not, None to use the setting of the properties.
+        """
+        self.debug = debug
+        if cache is None:
+            cache = bool(self.response_cache_properties["responses"])
+        self.use_response_cache = cache
+
+    def reset_request_count(self):
+        with self.request_count_lock:
+            self.request_count = 0
+            self.retry_count = 0
+            self.retry_wait = 0.0
+
+    def count_request(self):
+        with self.request_count_lock:
+            self.request_count += 1
+
+    def report_request_count(self, operation: str):
+        """
+        Print the number of HTTP requests sent so far in debug mode.
+
+        :param operation: The name of the performed operation.
+        """
+        message = (
+            "Operation "
+            + str(operation)
+            + " took "
+            + str(self.request_count)
+            + " HTTP request(s)"
+        )
+        if self.retry_count:
+            message += ", including {} retries after waiting {:.2f}s".format(
+                self.retry_count, self.retry_wait
+            )
+        self.print_debug(message + ".")
+
+    def remember_etag(
+        self, method: str, url: str, headers, response, stream: bool = False
+    ):
+        """
+        Keep the ETag of a successful response in the ETag cache of this client, such that it can be provided for
+        subsequent modifications of the same resource without requesting it again. For JSON documents obtained via
+        GET, the document is kept as well. The ETags of deleted resources are removed from the cache.
+
+        :param method: The HTTP method of the request.
+        :param url: The requested URL.
+        :param headers: The request headers.
+        :param response: The received response.
+        :param stream: True if the response body is streamed and must not be read.
+        """
+        if method == "DELETE":
+            self.forget_etags(url)
+        elif method in ("GET", "HEAD", "PUT", "PATCH"):
+            etag = response.headers.get("etag")
+            if not etag:
+                if method in ("PUT", "PATCH"):
+                    # the element has changed, but its new ETag is unknown
+                    self.forget_etags(url)
+                return
+            key = (url, etag_cache_accept(headers))
+            is_document = (
+                method == "GET"
+                and not stream
+                and "json" in response.headers.get("Content-Type", "")
+            )
+            document = response.text if is_document else None
+            with self.etag_cache_lock:
+                if method in ("PUT", "PATCH"):
+                    # the element has changed, ETags cached for other media types are outdated
+                    for other in [
+                        k for k in self.etag_cache if k[0] == url and k != key
+                    ]:
+                        del self.etag_cache[other]
+                        self.document_cache.pop(other, None)
+                if is_document:
+                    self.document_cache[key] = document
+                elif self.etag_cache.get(key) != etag:
+                    # the element has changed, the cached document is outdated
+                    self.document_cache.pop(key, None)
+                self.etag_cache[key] = etag
+                self.etag_cache.move_to_end(key)
+                while len(self.etag_cache) > MAX_CACHED_ETAGS:
+                    oldest, _ = self.etag_cache.popitem(last=False)
+                    self.document_cache.pop(oldest, None)
+
+    def forget_etags(self, url: str):
+        with self.etag_cache_lock:
+            for key in [key for key in self.etag_cache if key[0] == url]:
+                del self.etag_cache[key]
+                self.document_cache.pop(key, None)
+
+    def get_document(self, base_url: str, path: str, headers):
+        """
+        Obtain a JSON document either from the document cache, if it was received before, or from the server.
+
+        :param base_url: The base URL of the service.
+        :param path: The path appended to the base URL.
+        :param headers: The request headers.
+        :return: The parsed JSON document.
+        """
+        with self.etag_cache_lock:
+            document = self.document_cache.get(
+                (base_url + path, etag_cache_accept(headers))
+            )
+        if document is None:
+            # the current version is required, e.g., for applying a patch locally
+            document = self.do_get(base_url, path, headers, use_cache=False)
+        return json.loads(document)
+
+    def forget_document(self, base_url: str, path: str, headers):
+        """
+        Remove the cached JSON document of a modified element while keeping its ETag. A locally computed document,
+        e.g., a patched resource, is not cached, as it lacks fields computed by the server, e.g., lastUpdate.
+
+        :param base_url: The base URL of the service.
+        :param path: The path appended to the base URL.
+        :param headers: The request headers.
+        """
+        with self.etag_cache_lock:
+            self.document_cache.pop((base_url + path, etag_cache_accept(headers)), None)
+
+    def do_get_etag(self, base_url: str, path: str, headers) -> str:
         url = base_url + path
-        self.print_debug("Performing PATCH " + url)
-        try:
-            response = requests.request("PATCH", url, headers=headers, data=payload)
+        with self.etag_cache_lock:
+            # other threads may reorder or evict entries meanwhile
+            etag = self.etag_cache.get((url, etag_cache_accept(headers)))
+        if etag:
+            self.print_debug("Using cached ETag for " + url)
+            return etag
+        # the body is not required, HEAD only transfers the headers
+        self.print_debug("Performing HEAD " + url)
+        head_headers = {
+            key: value
+            for key, value in headers.items()
+            if key not in ("If-Match", "Content-Type")
+        }
+        response = self.do_request("HEAD", base_url, path, head_headers, 200)
+        # render result
+        self.print_debug("Successfully received HTTP 200. Extracting ETag.")
+        return response.headers.get("etag")
 
-            if response.status_code == 204:
-                # render result
-                self.print_debug("Successfully received HTTP 204. Returning True.")
-                return True
-            else:
-                self.print_error(
-                    "Server returned status "
-                    + str(response.status_code)
-                    + ". Body: "
-                    + str(response.content)
-                )
-                exit(2)
-        except requests.exceptions.RequestException as e:
-            self.print_error("Failed to connect to " + base_url + ".")
-            raise SystemExit(e)
+    def do_post(self, base_url: str, path: str, headers, payload):
+        self.print_debug("Performing POST " + base_url + path)
+        if isinstance(payload, str):
+            self.print_debug("Posting payload in body.")
+            response = self.do_request(
+                "POST", base_url, path, headers, 201, data=payload
+            )
+        elif hasattr(payload, "read"):
+            self.print_debug("Streaming payload in body.")
+            response = self.do_request(
+                "POST", base_url, path, headers, 201, data=payload
+            )
+        else:
+            self.print_debug("Posting payload as files.")
+            response = self.do_request(
+                "POST", base_url, path, headers, 201, files=payload
+            )
+        # render result
+        self.print_debug("Successfully received HTTP 201. Returning response.")
+        return response.content
+
+    def do_put(self, base_url: str, path: str, headers, payload):
+        self.print_debug("Performing PUT " + base_url + path)
+        if isinstance(payload, str):
+            self.print_debug("Putting payload in body.")
+            response = self.do_request(
+                "PUT", base_url, path, headers, 200, data=payload
+            )
+        else:
+            self.print_debug("Putting payload as files.")
+            response = self.do_request(
+                "PUT", base_url, path, headers, 200, files=payload
+            )
+        # render result
+        self.print_debug("Successfully received HTTP 200. Returning response.")
+        return response.content
+
+    def do_delete(self, base_url: str, path: str, headers):
+        self.print_debug("Performing DELETE " + base_url + path)
+        self.do_request("DELETE", base_url, path, headers, 204)
+        # render result
+        self.print_debug("Successfully received HTTP 204. Returning True.")
+        return True
+
+    def do_patch(self, base_url: str, path: str, headers, payload: str):
+        self.print_debug("Performing PATCH " + base_url + path)
+        self.do_request("PATCH", base_url, path, headers, 204, data=payload)
+        # render result
+        self.print_debug("Successfully received HTTP 204. Returning True.")
+        return True
@@ -0,0 +1,165 @@
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_THROTTLE_PROPERTIES = {
+    "requests_per_second": None,
+    "burst": 10,
+    "max_in_flight": None,
+    "min_in_flight": 1,
+    "increase_after": 10,
+}
+
+# responses indicating that the server is overloaded
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def get_throttle_properties(service_properties):
+    """
+    Obtain the throttling settings from the optional 'throttle' entry of a service section, e.g., 'base_repo'.
+    Missing entries are filled with default values, which do not limit requests at all.
+
+    :param service_properties: The service section of the properties.
+    :return: A dictionary containing all throttling settings.
+    """
+    throttle_properties = dict(DEFAULT_THROTTLE_PROPERTIES)
+    if service_properties and service_properties.get("throttle"):
+        throttle_properties.update(service_properties["throttle"])
+    return throttle_properties
+
+
+class TokenBucket:
+    """
+    Rate limiter allowing 'rate' requests per second on average and bursts of up to 'capacity' requests.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1.0)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, waiting until it is available if necessary.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.last) * self.rate
+            )
+            self.last = now
+            # the token is reserved immediately, such that concurrent callers queue up behind each other
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AdaptiveLimiter:
+    """
+    Limits the number of concurrent requests. The limit is halved whenever the server signals overload and increased
+    by one after 'increase_after' successful requests (additive increase, multiplicative decrease), but never exceeds
+    'max_limit' or falls below 'min_limit'.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, increase_after: int = 10):
+        self.max_limit = max(int(max_limit), 1)
+        self.min_limit = min(max(int(min_limit), 1), self.max_limit)
+        self.increase_after = max(int(increase_after), 1)
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self.successes = 0
+        # increased on each decrease, overload signals of older requests are ignored
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def acquire(self) -> int:
+        """
+        Wait for a free slot and occupy it.
+
+        :return: The generation of the limit the slot was obtained for.
+        """
+        with self.condition:
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+            self.in_flight += 1
+            return self.generation
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def on_success(self):
+        with self.condition:
+            self.successes += 1
+            if self.successes >= self.increase_after and self.limit < self.max_limit:
+                self.limit += 1
+                self.successes = 0
+                self.condition.notify_all()
+
+    def on_throttled(self, generation: int) -> bool:
+        """
+        Halve the limit, unless it was already decreased while the throttled request was running.
+
+        :param generation: The generation returned by acquire for the throttled request.
+        :return: True if the limit was decreased.
+        """
+        with self.condition:
+            self.successes = 0
+            if generation != self.generation or self.limit <= self.min_limit:
+                return False
+            self.limit = max(self.min_limit, self.limit // 2)
+            self.generation += 1
+            return True
+
+
+class Throttle:
+    """
+    Combination of an optional rate limit and an optional adaptive concurrency limit applied to all requests sent to
+    one service.
+    """
+
+    def __init__(self, throttle_properties):
+        self.bucket = None
+        self.limiter = None
+        if throttle_properties["requests_per_second"]:
+            self.bucket = TokenBucket(
+                throttle_properties["requests_per_second"], throttle_properties["burst"]
+            )
+        if throttle_properties["max_in_flight"]:
+            self.limiter = AdaptiveLimiter(
+                throttle_properties["max_in_flight"],
+                throttle_properties["min_in_flight"],
+                throttle_properties["increase_after"],
+            )
+
+    @contextmanager
+    def slot(self):
+        """
+        Wait until a request may be sent according to rate and concurrency limit. The concurrency slot is released
+        when leaving the context.
+
+        :return: A callback receiving the HTTP status of the response, which returns True if the concurrency limit
+        was decreased due to this status.
+        """
+        if self.bucket:
+            self.bucket.acquire()
+        if not self.limiter:
+            yield lambda status: False
+            return
+
+        generation = self.limiter.acquire()
+
+        def record(status: int) -> bool:
+            if status in THROTTLE_STATUS_CODES:
+                return self.limiter.on_throttled(generation)
+            self.limiter.on_success()
+            return False
+
+        try:
+            yield record
+        finally:
+            self.limiter.release()
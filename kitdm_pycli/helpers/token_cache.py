@@ -0,0 +1,83 @@
+import datetime
+import hashlib
+import json
+import os
+
+
+class TokenCache:
+    """
+    On-disk cache of the tokens received from KeyCloak. There is one cache file per KeyCloak server, realm, client and
+    user, which is only readable and writable by the current user. Using the cache, tokens obtained by one invocation
+    can be reused or refreshed by subsequent invocations without performing a new login.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        server_url: str,
+        realm_name: str,
+        client_id: str,
+        username: str,
+    ):
+        key = "|".join([server_url, realm_name, client_id, username or ""])
+        token_dir = os.path.join(cache_dir, "tokens")
+        os.makedirs(token_dir, mode=0o700, exist_ok=True)
+        self.token_file = os.path.join(
+            token_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+        )
+
+    def load(self):
+        """
+        Read the cached tokens.
+
+        :return: A dictionary containing access_token, token_expires, refresh_token and refresh_token_expires, where
+        both expiration times are datetime objects, or None if no usable cache entry exists.
+        """
+        try:
+            with open(self.token_file) as f:
+                entry = json.load(f)
+            return {
+                "access_token": entry["access_token"],
+                "token_expires": datetime.datetime.fromtimestamp(
+                    entry["token_expires"]
+                ),
+                "refresh_token": entry.get("refresh_token"),
+                "refresh_token_expires": datetime.datetime.fromtimestamp(
+                    entry["refresh_token_expires"]
+                ),
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(
+        self,
+        access_token: str,
+        token_expires: datetime.datetime,
+        refresh_token: str,
+        refresh_token_expires: datetime.datetime,
+    ):
+        """
+        Write the provided tokens and their expiration times to the cache file, which is created with permissions
+        only granting access to the current user.
+        """
+        content = json.dumps(
+            {
+                "access_token": access_token,
+                "token_expires": token_expires.timestamp(),
+                "refresh_token": refresh_token,
+                "refresh_token_expires": refresh_token_expires.timestamp(),
+            }
+        )
+        temp_file = self.token_file + ".tmp"
+        with open(
+            os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w"
+        ) as f:
+            f.write(content)
+        os.replace(temp_file, self.token_file)
+
+    def clear(self):
+        """
+        Remove the cache file, e.g., if the cached tokens were rejected.
+        """
+        if os.path.exists(self.token_file):
+            os.remove(self.token_file)
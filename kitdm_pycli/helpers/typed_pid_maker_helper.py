@@ -15,11 +15,14 @@ class TypedPidMakerClient(ServiceClient):
     Client implementation for accessing a Typed PID Maker service instance.
     """
 
+    properties_section = "type_pid_maker"
+
     def __init__(self, debug=False):
         ServiceClient.__init__(self, debug)
-        self.server_url = self.properties["type_pid_maker"]["server_url"]
-        self.tableItemsRecord = self.properties["type_pid_maker"]["tableItemsRecord"]
-        self.tableItemsPid = self.properties["type_pid_maker"]["tableItemsPid"]
+        service_properties = self.properties[self.properties_section]
+        self.server_url = service_properties["server_url"]
+        self.tableItemsRecord = service_properties["tableItemsRecord"]
+        self.tableItemsPid = service_properties["tableItemsPid"]
 
     def create(
         self,
@@ -203,6 +206,7 @@ class TypedPidMakerClient(ServiceClient):
         path: Optional[str],
         version: Optional[int],
         auth: bool = False,
+        output: Optional[str] = None,
     ):
         print("Not supported")
 
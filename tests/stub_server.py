@@ -0,0 +1,124 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_any(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length and self.server.discard_body:
+            # only count the received bytes, used for large uploads
+            body = b""
+            while length > 0:
+                received = len(self.rfile.read(min(length, 65536)))
+                self.server.received_bytes += received
+                length -= received
+        elif length:
+            body = self.rfile.read(length)
+        elif self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        else:
+            body = b""
+        self.server.requests.append((self.command, self.path, dict(self.headers)))
+        status, headers, content = self.server.handler(
+            self.command, self.path, self.headers, body
+        )
+        if isinstance(content, (dict, list)):
+            content = json.dumps(content).encode("utf-8")
+        elif isinstance(content, str):
+            content = content.encode("utf-8")
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(content)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(content)
+
+    do_GET = handle_any
+    do_HEAD = handle_any
+    do_POST = handle_any
+    do_PUT = handle_any
+    do_PATCH = handle_any
+    do_DELETE = handle_any
+
+
+def echo_handler(method, path, headers, body):
+    """
+    Default behaviour of the stub server: every resource exists and is returned as JSON with its path as id.
+    """
+    if method == "POST":
+        return 201, {"Content-Type": "application/json"}, {"id": path}
+    if method in ("DELETE", "PATCH"):
+        return 204, {"ETag": '"1"'}, b""
+    return 200, {"Content-Type": "application/json", "ETag": '"1"'}, {"id": path}
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Local HTTP server counting accepted connections and received requests.
+    Use as context manager, the server is running in a background thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler=echo_handler, discard_body=False):
+        ThreadingHTTPServer.__init__(self, ("127.0.0.1", 0), StubRequestHandler)
+        self.handler = handler
+        self.discard_body = discard_body
+        self.received_bytes = 0
+        self.connections = 0
+        self.requests = []
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def get_request(self):
+        request = ThreadingHTTPServer.get_request(self)
+        self.connections += 1
+        return request
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:" + str(self.server_address[1]) + "/"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+def write_properties(tmp_path, server_url, extra=None):
+    """
+    Write a properties file pointing all services to the provided server URL.
+
+    :return: The path of the written properties file.
+    """
+    with open("./tests/properties-test.json") as f:
+        properties = json.load(f)
+    for section in ("base_repo", "metastore", "type_pid_maker"):
+        properties[section]["server_url"] = server_url
+    for key, value in (extra or {}).items():
+        if isinstance(value, dict) and isinstance(properties.get(key), dict):
+            properties[key].update(value)
+        else:
+            properties[key] = value
+    properties_file = tmp_path / "properties.json"
+    properties_file.write_text(json.dumps(properties))
+    return str(properties_file)
@@ -0,0 +1,44 @@
+import asyncio
+from kitdm_pycli.helpers.async_helper import AsyncMetaStoreClient
+from kitdm_pycli.helpers.exceptions import ServiceError, ServiceConnectionError
+from tests.stub_server import StubServer, write_properties
+
+
+def document_handler(method, path, headers, body):
+    if path.endswith("/missing"):
+        return 404, {}, b"not found"
+    return 200, {"Content-Type": "application/json", "ETag": '"1"'}, {"id": path}
+
+
+async def get_documents(identifiers):
+    async with AsyncMetaStoreClient(max_concurrency=8) as client:
+        return await asyncio.gather(
+            *[client.get(identifier, "document", None) for identifier in identifiers],
+            return_exceptions=True,
+        )
+
+
+def test_concurrent_lookups(monkeypatch, tmp_path):
+    identifiers = [str(i) for i in range(1000)] + ["missing"]
+    with StubServer(document_handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        results = asyncio.run(get_documents(identifiers))
+
+    assert results[:2] == [
+        [{"id": "/api/v1/metadata/0"}],
+        [{"id": "/api/v1/metadata/1"}],
+    ]
+    assert all(isinstance(result, list) for result in results[:-1])
+    # failures are raised instead of exiting
+    assert isinstance(results[-1], ServiceError)
+    assert results[-1].status == 404
+    # all requests share the pooled connections
+    assert server.connections <= 8
+
+
+def test_connection_error(monkeypatch, tmp_path):
+    monkeypatch.setenv(
+        "PYCLI_PROPERTIES", write_properties(tmp_path, "http://127.0.0.1:1/")
+    )
+    results = asyncio.run(get_documents(["1"]))
+    assert isinstance(results[0], ServiceConnectionError)
@@ -1,3 +1,4 @@
+import pytest
 from kitdm_pycli.clients.base_repo_client import parse_arguments
 
 
@@ -273,3 +274,88 @@ def test_delete_content():
     assert result.output == "file.json"
     assert result.auth is True
     assert result.render_as == "LIST"
+
+
+def test_get_resource_parallel():
+    # getResource -id 123 456 -P 4
+    args = ["getResource", "-id", "123", "456", "--parallel", "4"]
+    result = parse_arguments(args)
+    assert result.operation == "getResource"
+    assert result.parallel == 4
+    result = parse_arguments(["getResource", "-id", "123"])
+    assert result.parallel == 1
+
+
+def test_create_content_progress():
+    # createContent -id 123 -pl file.txt --progress
+    args = ["createContent", "-id", "123", "-pl", "data.txt", "--progress"]
+    result = parse_arguments(args)
+    assert result.operation == "createContent"
+    assert result.progress is True
+    result = parse_arguments(["createContent", "-id", "123", "-pl", "data.txt"])
+    assert result.progress is False
+
+
+def test_upload_directory():
+    # uploadDirectory -id 123 -src folder [-rp folder/] [-i '*.tif'] [-e '*.tmp'] [-P 4]
+    args = [
+        "uploadDirectory",
+        "-id",
+        "123",
+        "-src",
+        "data",
+        "-rp",
+        "raw/",
+        "-i",
+        "*.tif",
+        "*.txt",
+        "-e",
+        "*.tmp",
+        "-P",
+        "8",
+    ]
+    result = parse_arguments(args)
+    assert result.operation == "uploadDirectory"
+    assert result.identifier == "123"
+    assert result.source == "data"
+    assert result.relativePath == "raw/"
+    assert result.include == ["*.tif", "*.txt"]
+    assert result.exclude == ["*.tmp"]
+    assert result.parallel == 8
+
+
+def test_patch_resource_echo():
+    # patchResource -id 123 -pl patch.json [--no-echo] [--localEcho]
+    result = parse_arguments(["patchResource", "-id", "123", "-pl", "patch.json"])
+    assert result.echo is True
+    assert result.localEcho is False
+
+    args = ["patchResource", "-id", "123", "-pl", "patch.json", "--localEcho"]
+    result = parse_arguments(args)
+    assert result.localEcho is True
+
+    args = ["createContent", "-id", "123", "-pl", "data.txt", "--no-echo"]
+    result = parse_arguments(args)
+    assert result.echo is False
+
+
+def test_patch_resource_bulk():
+    # patchResource --idsFile ids.txt [--checkpoint done.txt] [-P 8] -pl patch.json
+    args = ["patchResource", "--idsFile", "-", "--checkpoint", "done.txt", "-P", "8"]
+    result = parse_arguments(args + ["-pl", "patch.json"])
+    assert result.identifier is None
+    assert result.idsFile == "-"
+    assert result.checkpoint == "done.txt"
+    assert result.parallel == 8
+
+    # patchResource --fromQuery -f 'yesterday' -A -pl patch.json
+    args = ["patchResource", "--fromQuery", "-f", "yesterday", "-A", "-pl", "p.json"]
+    result = parse_arguments(args)
+    assert result.fromQuery is True
+    assert result.all is True
+
+    # exactly one way of selecting resources is required
+    with pytest.raises(SystemExit):
+        parse_arguments(["patchResource", "--fromQuery", "-id", "1", "-pl", "p.json"])
+    with pytest.raises(SystemExit):
+        parse_arguments(["patchResource", "-pl", "p.json"])
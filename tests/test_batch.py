@@ -0,0 +1,253 @@
+import io
+import json
+import sys
+import threading
+import time
+import pytest
+from kitdm_pycli.clients import base_repo_client
+from kitdm_pycli.helpers.batch_utils import read_manifest, run_manifest
+from kitdm_pycli.helpers.command_line_utils import get_operation_argument_list
+from kitdm_pycli.helpers.exceptions import InputFileError
+from tests.stub_server import StubServer, echo_handler, write_properties
+
+
+def resource_handler(method, path, headers, body):
+    if method == "POST" and path == "/api/v1/dataresources/":
+        return 201, {"Content-Type": "application/json"}, {"id": "42"}
+    if path.endswith("/missing"):
+        return 404, {}, b""
+    return echo_handler(method, path, headers, body)
+
+
+def write_manifest(tmp_path, lines):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+    return str(manifest)
+
+
+def run_batch(monkeypatch, tmp_path, server, lines, options=()):
+    monkeypatch.setenv("PYCLI_NO_DAEMON", "1")
+    monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+    manifest = write_manifest(tmp_path, lines)
+    monkeypatch.setattr(
+        sys, "argv", ["client", "batch", "-f", manifest] + list(options)
+    )
+    base_repo_client.main()
+
+
+def read_outcomes(output):
+    return sorted(
+        (json.loads(line) for line in output.splitlines()),
+        key=lambda outcome: outcome["line"],
+    )
+
+
+def test_results_can_be_referenced(monkeypatch, tmp_path, capsys):
+    (tmp_path / "resource.json").write_text('{"resourceType": {}}')
+    lines = [
+        {
+            "ref": "resource",
+            "operation": "createResource",
+            "args": {"metadata": str(tmp_path / "resource.json")},
+        },
+        {"operation": "getResource", "args": {"identifier": "${resource.id}"}},
+        {"operation": "getResource", "args": ["-id", "1"]},
+    ]
+    with StubServer(resource_handler) as server:
+        run_batch(monkeypatch, tmp_path, server, lines)
+
+    paths = [path for method, path, _ in server.requests if method == "GET"]
+    assert "/api/v1/dataresources/42" in paths
+    # one client for all operations
+    assert server.connections == 1
+    captured = capsys.readouterr()
+    outcomes = read_outcomes(captured.out)
+    assert [outcome["line"] for outcome in outcomes] == [1, 2, 3]
+    assert outcomes[0]["ref"] == "resource"
+    assert outcomes[1]["result"] == [{"id": "/api/v1/dataresources/42"}]
+    assert "Performed 3 operation(s), 0 failed, 0 skipped." in captured.err
+
+
+def test_dependents_of_failed_lines_are_skipped(monkeypatch, tmp_path, capsys):
+    lines = [
+        {"ref": "a", "operation": "getResource", "args": {"identifier": "missing"}},
+        {"ref": "b", "operation": "getResource", "args": {"identifier": "${a.id}"}},
+        {"operation": "getResource", "args": {"identifier": "2"}, "dependsOn": ["b"]},
+        {"operation": "getResource", "args": {"unknown": "1"}},
+        {"operation": "getResource", "args": {"identifier": "${later.id}"}},
+        {"ref": "later", "operation": "getResource", "args": {"identifier": "3"}},
+    ]
+    with StubServer(resource_handler) as server:
+        with pytest.raises(SystemExit) as e:
+            run_batch(monkeypatch, tmp_path, server, lines)
+
+    assert e.value.code == 2
+    paths = [path for _, path, _ in server.requests]
+    assert sorted(paths) == [
+        "/api/v1/dataresources/3",
+        "/api/v1/dataresources/missing",
+    ]
+    captured = capsys.readouterr()
+    outcomes = read_outcomes(captured.out)
+    assert outcomes[1]["error"] == "Dependency a failed."
+    assert outcomes[2]["error"] == "Dependency b failed."
+    assert outcomes[3]["error"] == "Invalid arguments for operation getResource."
+    assert outcomes[4]["error"] == "Unknown or later ref later."
+    assert "result" in outcomes[5]
+    assert "Performed 1 operation(s), 3 failed, 2 skipped." in captured.err
+
+
+def test_outcomes_are_written_to_output_file(monkeypatch, tmp_path, capsys):
+    lines = [{"operation": "getResource", "args": {"identifier": "1"}}]
+    output = tmp_path / "outcomes.jsonl"
+    with StubServer() as server:
+        monkeypatch.setenv("PYCLI_NO_DAEMON", "1")
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        manifest = write_manifest(tmp_path, lines)
+        monkeypatch.setattr(
+            sys, "argv", ["client", "-o", str(output), "batch", "-f", manifest]
+        )
+        base_repo_client.main()
+
+    assert capsys.readouterr().out == ""
+    assert json.loads(output.read_text())["result"] == [
+        {"id": "/api/v1/dataresources/1"}
+    ]
+
+
+def test_independent_lines_run_concurrently():
+    entries = [
+        {"line": i, "ref": None, "operation": "op", "args": [], "dependencies": set()}
+        for i in range(8)
+    ]
+    lock = threading.Lock()
+    running = {"current": 0, "max": 0}
+
+    def perform(task):
+        with lock:
+            running["current"] += 1
+            running["max"] = max(running["max"], running["current"])
+        time.sleep(0.02)
+        with lock:
+            running["current"] -= 1
+        return task
+
+    class Stream:
+        def write(self, line):
+            pass
+
+        def flush(self):
+            pass
+
+    counts = run_manifest(entries, lambda *args: "ok", perform, 4, Stream())
+
+    assert counts == (8, 0, 0)
+    assert running["max"] > 1
+
+
+def test_invalid_manifests_are_rejected(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text('{"operation": "getResource"}\n\n{"args": []}\n')
+    with pytest.raises(InputFileError, match="line 3"):
+        read_manifest(str(manifest))
+    manifest.write_text(
+        '{"ref": "a", "operation": "x"}\n{"ref": "a", "operation": "x"}\n'
+    )
+    with pytest.raises(InputFileError, match="Duplicate ref a"):
+        read_manifest(str(manifest))
+    with pytest.raises(InputFileError):
+        read_manifest(str(tmp_path / "missing.jsonl"))
+    manifest.write_text('{"operation": "x", "dependsOn": {"ref": "a"}}\n')
+    with pytest.raises(InputFileError, match="Invalid dependsOn in line 1"):
+        read_manifest(str(manifest))
+    manifest.write_text(
+        '{"ref": "a", "operation": "x"}\n{"operation": "x", "dependsOn": ["b"]}\n'
+    )
+    with pytest.raises(InputFileError, match="Unknown ref b in dependsOn of line 2"):
+        read_manifest(str(manifest))
+
+
+def test_single_dependency_can_be_provided_as_string(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(
+        '{"operation": "x", "dependsOn": "resource"}\n'
+        '{"ref": "resource", "operation": "x"}\n'
+    )
+    assert read_manifest(str(manifest))[0]["dependencies"] == {"resource"}
+
+
+def test_argument_dictionaries_are_converted():
+    arguments = {"identifier": ["1", "2"], "soft": True, "echo": False, "x": None}
+    assert get_operation_argument_list(arguments) == [
+        "--identifier",
+        "1",
+        "2",
+        "--soft",
+        "--no-echo",
+    ]
+    assert get_operation_argument_list(["-id", 1]) == ["-id", "1"]
+
+
+def test_output_of_operations_is_included_in_outcomes(monkeypatch, tmp_path, capsys):
+    lines = [
+        {
+            "operation": "deleteResource",
+            "args": {"identifier": ["1", "2"], "soft": True},
+        },
+        {"operation": "getResources", "args": {"all": True}},
+        {"operation": "getResource", "args": {"identifier": "3"}},
+    ]
+    with StubServer(resource_handler) as server:
+        run_batch(monkeypatch, tmp_path, server, lines, ["-P", "3"])
+
+    # each line of stdout is one outcome
+    outcomes = read_outcomes(capsys.readouterr().out)
+    assert [outcome["line"] for outcome in outcomes] == [1, 2, 3]
+    deleted = [json.loads(line) for line in outcomes[0]["output"].splitlines()]
+    assert sorted(outcome["id"] for outcome in deleted) == ["1", "2"]
+    assert outcomes[1]["output"]
+    assert "output" not in outcomes[2]
+
+
+def test_concurrent_manifests_only_capture_their_operations(capsys):
+    original = sys.stdout
+    started = threading.Barrier(3)
+
+    def perform(task):
+        print("output of " + task)
+        return task
+
+    def run(name, outcomes):
+        entries = [
+            {
+                "line": 1,
+                "ref": None,
+                "operation": "op",
+                "args": [],
+                "dependencies": set(),
+            }
+        ]
+
+        def prepare(operation, arguments):
+            started.wait()
+            return name
+
+        run_manifest(entries, prepare, perform, 1, outcomes)
+
+    streams = {"a": io.StringIO(), "b": io.StringIO()}
+    threads = [
+        threading.Thread(target=run, args=(name, stream))
+        for name, stream in streams.items()
+    ]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    # output of other threads is not captured while manifests are running
+    print("unrelated")
+    for thread in threads:
+        thread.join()
+
+    assert sys.stdout is original
+    assert "unrelated" in capsys.readouterr().out
+    for name, stream in streams.items():
+        assert json.loads(stream.getvalue())["output"] == "output of " + name + "\n"
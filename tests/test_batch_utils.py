@@ -0,0 +1,30 @@
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from kitdm_pycli.helpers.batch_utils import fetch_all
+from tests.stub_server import StubServer, echo_handler, write_properties
+
+
+def missing_handler(method, path, headers, body):
+    if path.endswith("/missing"):
+        return 404, {}, b"Not found"
+    return echo_handler(method, path, headers, body)
+
+
+def test_fetch_all_keeps_order_and_reports_failures(monkeypatch, tmp_path):
+    identifiers = ["id-" + str(i) for i in range(20)]
+    identifiers.insert(7, "missing")
+    with StubServer(missing_handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        results, failures = fetch_all(
+            identifiers,
+            lambda identifier: service_client.get(identifier, None, None),
+            8,
+        )
+
+    assert [result["id"] for result in results] == [
+        "/api/v1/dataresources/" + identifier
+        for identifier in identifiers
+        if identifier != "missing"
+    ]
+    assert len(failures) == 1
+    assert failures[0][0] == "missing"
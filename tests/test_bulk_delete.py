@@ -0,0 +1,84 @@
+import io
+import json
+import sys
+import pytest
+from kitdm_pycli.clients import base_repo_client, metastore_client
+from tests.stub_server import StubServer, write_properties
+
+
+class DeleteHandler:
+    """
+    Stub server behaviour where the first delete of an element revokes it and the second one removes it.
+    """
+
+    def __init__(self):
+        self.states = {}
+
+    def __call__(self, method, path, headers, body):
+        identifier = path.split("/")[-1]
+        state = self.states.get(identifier, "VOLATILE")
+        if state == "GONE" or identifier == "missing":
+            return 404, {}, b""
+        etag = '"' + state + '"'
+        if method == "DELETE":
+            if headers.get("If-Match") != etag:
+                return 412, {}, b""
+            self.states[identifier] = "REVOKED" if state == "VOLATILE" else "GONE"
+            return 204, {}, b""
+        return 200, {"Content-Type": "application/json", "ETag": etag}, {"id": path}
+
+
+def run_main(monkeypatch, tmp_path, server, client, args):
+    monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+    monkeypatch.setattr(sys, "argv", ["client"] + args)
+    client.main()
+
+
+def test_bulk_delete_from_stdin(monkeypatch, tmp_path, capsys):
+    identifiers = [str(i) for i in range(20)]
+    monkeypatch.setattr(sys, "stdin", io.StringIO("\n".join(identifiers) + "\n"))
+    handler = DeleteHandler()
+    with StubServer(handler) as server:
+        args = ["deleteResource", "--idsFile", "-", "--no-soft", "-P", "4"]
+        run_main(monkeypatch, tmp_path, server, base_repo_client, args)
+
+    outcomes = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(outcome["id"] for outcome in outcomes) == sorted(identifiers)
+    assert all(outcome["result"] is True for outcome in outcomes)
+    assert set(handler.states.values()) == {"GONE"}
+    # revoking and purging require one HEAD and one DELETE each
+    assert len(server.requests) == 4 * len(identifiers)
+
+
+def test_bulk_delete_reports_failures(monkeypatch, tmp_path, capsys):
+    handler = DeleteHandler()
+    with StubServer(handler) as server:
+        args = ["deleteSchema", "-id", "1", "missing", "2", "-P", "2"]
+        with pytest.raises(SystemExit):
+            run_main(monkeypatch, tmp_path, server, metastore_client, args)
+
+    captured = capsys.readouterr()
+    outcomes = {
+        outcome["id"]: outcome for outcome in map(json.loads, captured.out.splitlines())
+    }
+    assert outcomes["1"]["result"] is True
+    assert "error" in outcomes["missing"]
+    assert handler.states == {"1": "REVOKED", "2": "REVOKED"}
+    assert "Deleted 2 element(s), 1 failed." in captured.err
+
+
+def test_checkpoint_is_used_for_single_identifier(monkeypatch, tmp_path, capsys):
+    monkeypatch.setenv("PYCLI_NO_DAEMON", "1")
+    checkpoint = tmp_path / "checkpoint.txt"
+    handler = DeleteHandler()
+    with StubServer(handler) as server:
+        args = ["deleteResource", "-id", "1", "--checkpoint", str(checkpoint)]
+        run_main(monkeypatch, tmp_path, server, base_repo_client, args)
+        # the identifier is skipped when the deletion is started again
+        run_main(monkeypatch, tmp_path, server, base_repo_client, args)
+
+    assert checkpoint.read_text() == "1\n"
+    assert handler.states == {"1": "REVOKED"}
+    captured = capsys.readouterr()
+    assert json.loads(captured.out.splitlines()[0]) == {"id": "1", "result": True}
+    assert "skipped according to checkpoint" in captured.err
@@ -0,0 +1,102 @@
+import json
+import sys
+import pytest
+from kitdm_pycli.clients import base_repo_client
+from kitdm_pycli.helpers.batch_utils import run_bulk, Checkpoint
+from tests.stub_server import StubServer, write_properties
+
+
+def resource_handler(method, path, headers, body):
+    if method == "PATCH":
+        if path.endswith("/bad"):
+            return 404, {}, b""
+        return 204, {"ETag": '"2"'}, b""
+    if path.startswith("/api/v1/dataresources/?"):
+        # listing with a single, short page
+        return 200, {"Content-Type": "application/json"}, [{"id": "a"}, {"id": "b"}]
+    identifier = path.split("?")[0].split("/")[-1]
+    return 200, {"Content-Type": "application/json", "ETag": '"1"'}, {"id": identifier}
+
+
+def run_main(monkeypatch, tmp_path, server, args):
+    monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+    patch_file = tmp_path / "patch.json"
+    patch_file.write_text(json.dumps([{"op": "add", "path": "/x", "value": 1}]))
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["base-repo-client", "patchResource", "-pl", str(patch_file)] + args,
+    )
+    base_repo_client.main()
+
+
+def test_run_bulk_is_bounded_and_resumable(tmp_path):
+    consumed = []
+
+    def identifiers():
+        for i in range(100):
+            consumed.append(i)
+            yield str(i)
+
+    def operation(identifier):
+        # at most 2 * parallel identifiers are consumed ahead of the finished ones
+        assert len(consumed) <= int(identifier) + 1 + 2 * 4
+        return [] if identifier != "13" else None
+
+    checkpoint_file = str(tmp_path / "checkpoint.txt")
+    lines = []
+
+    class Stream:
+        def write(self, line):
+            lines.append(json.loads(line))
+
+        def flush(self):
+            pass
+
+    checkpoint = Checkpoint(checkpoint_file)
+    assert run_bulk(identifiers(), operation, 4, checkpoint, Stream()) == (99, 1, 0)
+    checkpoint.close()
+    assert {"id": "13", "error": "No result received."} in lines
+
+    # only the failed identifier is processed again
+    checkpoint = Checkpoint(checkpoint_file)
+    consumed.clear()
+    assert run_bulk(
+        (str(i) for i in range(100)), lambda identifier: [], 4, checkpoint, Stream()
+    ) == (1, 0, 99)
+    checkpoint.close()
+
+
+def test_patch_ids_file(monkeypatch, tmp_path, capsys):
+    ids_file = tmp_path / "ids.txt"
+    ids_file.write_text("1\n\n2\nbad\n")
+    checkpoint_file = tmp_path / "checkpoint.txt"
+    with StubServer(resource_handler) as server:
+        with pytest.raises(SystemExit):
+            run_main(
+                monkeypatch,
+                tmp_path,
+                server,
+                ["--idsFile", str(ids_file), "--checkpoint", str(checkpoint_file)],
+            )
+
+    outcomes = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(outcome["id"] for outcome in outcomes) == ["1", "2", "bad"]
+    assert {"id": "1", "result": [{"id": "1"}]} in outcomes
+    assert "error" in [outcome for outcome in outcomes if outcome["id"] == "bad"][0]
+    assert sorted(checkpoint_file.read_text().split()) == ["1", "2"]
+
+
+def test_patch_from_query(monkeypatch, tmp_path, capsys):
+    with StubServer(resource_handler) as server:
+        run_main(
+            monkeypatch,
+            tmp_path,
+            server,
+            ["--fromQuery", "-f", "2024-01-01", "--all", "-P", "2", "--no-echo"],
+        )
+
+    outcomes = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(outcome["id"] for outcome in outcomes) == ["a", "b"]
+    patched = [path for method, path, _ in server.requests if method == "PATCH"]
+    assert sorted(patched) == ["/api/v1/dataresources/a", "/api/v1/dataresources/b"]
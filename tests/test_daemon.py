@@ -0,0 +1,173 @@
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import pytest
+from kitdm_pycli.clients import base_repo_client
+from kitdm_pycli.clients.daemon import CLIENTS, PyCliDaemon
+from tests.stub_server import StubServer, echo_handler, write_properties
+
+
+def missing_handler(method, path, headers, body):
+    if path.endswith("/missing"):
+        return 404, {}, b""
+    return echo_handler(method, path, headers, body)
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    # socket paths are limited to about 100 characters, pytest's tmp_path may be longer
+    socket_dir = tempfile.mkdtemp(prefix="pycli")
+    socket_path = os.path.join(socket_dir, "daemon.sock")
+    monkeypatch.setenv("PYCLI_DAEMON_SOCKET", socket_path)
+    server = PyCliDaemon(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    os.rmdir(socket_dir)
+
+
+def run_client(monkeypatch, args):
+    monkeypatch.setattr(sys, "argv", ["client"] + args)
+    base_repo_client.main()
+
+
+def test_operations_are_forwarded_to_daemon(monkeypatch, tmp_path, daemon, capsys):
+    with StubServer(missing_handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        run_client(monkeypatch, ["-r", "RAW", "getResource", "-id", "1"])
+        run_client(monkeypatch, ["-r", "RAW", "getResource", "-id", "2"])
+        with pytest.raises(SystemExit) as e:
+            run_client(monkeypatch, ["getResource", "-id", "missing"])
+
+    # the warm client of the daemon reuses its connection
+    assert server.connections == 1
+    assert len(daemon.service_clients) == 1
+    assert e.value.code == 2
+    captured = capsys.readouterr()
+    assert "[{'id': '/api/v1/dataresources/2'}]" in captured.out
+    assert "status 404" in captured.err
+
+
+def test_output_is_written_relative_to_client_folder(
+    monkeypatch, tmp_path, daemon, capsys
+):
+    with StubServer() as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        monkeypatch.chdir(tmp_path)
+        run_client(
+            monkeypatch, ["-r", "RAW", "-o", "out.txt", "getResource", "-id", "1"]
+        )
+
+    assert "dataresources/1" in (tmp_path / "out.txt").read_text()
+
+
+def test_operation_is_performed_locally_without_daemon(monkeypatch, tmp_path):
+    monkeypatch.setenv("PYCLI_DAEMON_SOCKET", str(tmp_path / "missing.sock"))
+    with StubServer() as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        run_client(monkeypatch, ["getResource", "-id", "1"])
+
+    assert len(server.requests) == 1
+
+
+def test_busy_daemon_lets_client_perform_operation(
+    monkeypatch, tmp_path, daemon, capsys
+):
+    with StubServer() as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        # e.g., an operation of a parallel invocation is running
+        with daemon.perform_lock:
+            run_client(monkeypatch, ["-r", "RAW", "getResource", "-id", "1"])
+
+    assert daemon.service_clients == {}
+    assert len(server.requests) == 1
+    assert "dataresources/1" in capsys.readouterr().out
+
+
+def test_socket_is_only_accessible_by_owner(daemon):
+    assert stat.S_IMODE(os.stat(daemon.socket_path).st_mode) == 0o600
+
+
+def test_unexpected_errors_are_reported(monkeypatch, tmp_path, daemon, capsys):
+    def fail(args, service_client):
+        print("partial output")
+        raise KeyError("boom")
+
+    monkeypatch.setitem(CLIENTS, "base_repo", (fail, CLIENTS["base_repo"][1]))
+    with StubServer() as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        with pytest.raises(SystemExit) as e:
+            run_client(monkeypatch, ["getResource", "-id", "1"])
+
+    assert e.value.code == 2
+    captured = capsys.readouterr()
+    assert "partial output" in captured.out
+    assert "KeyError('boom')" in captured.err
+
+
+def test_modified_properties_replace_client(monkeypatch, tmp_path, daemon):
+    monkeypatch.delenv("PYCLI_PROPERTIES", raising=False)
+    with StubServer() as server:
+        properties_file = write_properties(tmp_path, server.url)
+        first = daemon.get_service_client("base_repo", properties_file)
+        # the process environment of the daemon is left unchanged
+        assert "PYCLI_PROPERTIES" not in os.environ
+        assert daemon.get_service_client("base_repo", properties_file) is first
+        closed = []
+        monkeypatch.setattr(first, "close", lambda: closed.append(first))
+        modified = os.path.getmtime(properties_file) + 10
+        os.utime(properties_file, (modified, modified))
+        second = daemon.get_service_client("base_repo", properties_file)
+
+    assert second is not first
+    assert list(daemon.service_clients.values()) == [second]
+    assert closed == [first]
+
+
+# the full benchmark performs 1000 invocations, a small one runs by default
+@pytest.mark.parametrize(
+    "count",
+    [
+        20,
+        pytest.param(
+            int(os.environ.get("PYCLI_BENCHMARK_DAEMON_COUNT", 1000)),
+            marks=pytest.mark.skipif(
+                not os.environ.get("PYCLI_BENCHMARK_DAEMON"),
+                reason="Set PYCLI_BENCHMARK_DAEMON for the full comparison of "
+                "invocations with and without daemon.",
+            ),
+        ),
+    ],
+)
+def test_benchmark_daemon(monkeypatch, tmp_path, daemon, capsys, count):
+    command = [sys.executable, "-m", "kitdm_pycli.clients.base_repo_client"]
+    with StubServer() as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        elapsed = {}
+        for mode in ("without", "with"):
+            env = dict(os.environ)
+            if mode == "without":
+                env["PYCLI_NO_DAEMON"] = "1"
+            start = time.perf_counter()
+            for i in range(count):
+                subprocess.run(
+                    command + ["-r", "RAW", "getResource", "-id", str(i)],
+                    env=env,
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                )
+            elapsed[mode] = time.perf_counter() - start
+
+    with capsys.disabled():
+        print(
+            "\n{} getResource invocations: {:.2f}s without daemon, {:.2f}s with daemon".format(
+                count, elapsed["without"], elapsed["with"]
+            )
+        )
+    assert elapsed["with"] < elapsed["without"]
@@ -0,0 +1,38 @@
+import datetime
+import dateparser
+import pytest
+from kitdm_pycli.helpers.date_utils import format_query_date, parse_date
+from kitdm_pycli.helpers.exceptions import PyCliError
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2023-11-02",
+        "2023-11-02T08:33:00Z",
+        "2023-11-02T08:33:00+02:00",
+        "2023-11-02 08:33",
+        "2023-11-02T08:33:00.123456",
+        "2023/11/02",
+    ],
+)
+def test_absolute_dates_match_dateparser(value):
+    assert parse_date(value) == dateparser.parse(value)
+
+
+@pytest.mark.parametrize(
+    "value", ["now", "yesterday", "3 days ago", "1 hour ago", "2 weeks ago"]
+)
+def test_relative_dates_match_dateparser(value):
+    difference = parse_date(value) - dateparser.parse(value)
+    assert abs(difference) < datetime.timedelta(seconds=5)
+
+
+def test_natural_language_falls_back_to_dateparser():
+    assert parse_date("last year").year == datetime.datetime.now().year - 1
+    with pytest.raises(PyCliError):
+        parse_date("no date at all")
+
+
+def test_compact_date_is_formatted_for_queries():
+    assert format_query_date("20231102") == "2023-11-02T00:00:00Z"
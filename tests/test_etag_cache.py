@@ -0,0 +1,109 @@
+import json
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from tests.stub_server import StubServer, write_properties
+
+
+def write_patch(tmp_path):
+    patch_file = tmp_path / "patch.json"
+    patch_file.write_text(
+        json.dumps([{"op": "replace", "path": "/publisher", "value": "KIT"}])
+    )
+    return str(patch_file)
+
+
+def test_patch_after_get_uses_cached_etag(monkeypatch, tmp_path):
+    with StubServer() as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        service_client.get("123", None, None)
+        server.requests.clear()
+        service_client.patch("123", write_patch(tmp_path), None)
+
+    methods = [method for method, _, _ in server.requests]
+    # no request is needed to obtain the ETag
+    assert methods == ["PATCH", "GET"]
+    assert server.requests[0][2]["If-Match"] == '"1"'
+
+
+def test_uncached_etag_is_obtained_via_head(monkeypatch, tmp_path):
+    with StubServer() as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        service_client.delete("123", None, True)
+
+    methods = [method for method, _, _ in server.requests]
+    assert methods == ["HEAD", "DELETE"]
+    assert service_client.etag_cache == {}
+
+
+def test_outdated_etag_is_refreshed_once(monkeypatch, tmp_path):
+    def handler(method, path, headers, body):
+        if method == "PATCH" and headers.get("If-Match") != '"2"':
+            return 412, {}, b""
+        if method == "PATCH":
+            return 204, {"ETag": '"3"'}, b""
+        etag = '"1"' if method == "GET" else '"2"'
+        return 200, {"Content-Type": "application/json", "ETag": etag}, {"id": path}
+
+    with StubServer(handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        service_client.get("123", None, None)
+        server.requests.clear()
+        result = service_client.patch("123", write_patch(tmp_path), None)
+
+    methods = [method for method, _, _ in server.requests]
+    assert methods == ["PATCH", "HEAD", "PATCH", "GET"]
+    assert result == [{"id": "/api/v1/dataresources/123"}]
+    # retried URLs are not collected in long-lived clients, e.g., of the shell
+    assert service_client.precondition_retries == set()
+
+
+def test_outdated_etag_of_delete_is_refreshed(monkeypatch, tmp_path):
+    def handler(method, path, headers, body):
+        if method == "DELETE" and headers.get("If-Match") != '"2"':
+            return 412, {}, b""
+        if method == "DELETE":
+            return 204, {}, b""
+        etag = '"1"' if method == "GET" else '"2"'
+        return 200, {"Content-Type": "application/json", "ETag": etag}, {"id": path}
+
+    with StubServer(handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        service_client.get("123", None, None)
+        server.requests.clear()
+        assert service_client.delete("123", None, True)
+
+    methods = [method for method, _, _ in server.requests]
+    assert methods == ["DELETE", "HEAD", "DELETE"]
+    assert service_client.precondition_retries == set()
+
+
+def test_update_reuses_etag_of_get_and_refreshes_it(monkeypatch, tmp_path):
+    version = {"etag": 1}
+
+    def handler(method, path, headers, body):
+        etag = '"' + str(version["etag"]) + '"'
+        if method in ("PUT", "PATCH"):
+            if headers.get("If-Match") != etag:
+                return 412, {}, b""
+            version["etag"] += 1
+            etag = '"' + str(version["etag"]) + '"'
+            status = 200 if method == "PUT" else 204
+            return status, {"Content-Type": "application/json", "ETag": etag}, {}
+        return 200, {"Content-Type": "application/json", "ETag": etag}, {"id": path}
+
+    metadata = tmp_path / "resource.json"
+    metadata.write_text(json.dumps({"id": "123", "resourceType": {}}))
+    with StubServer(handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        service_client.get("123", None, None)
+        server.requests.clear()
+        service_client.update("123", str(metadata), None, None)
+        service_client.patch("123", write_patch(tmp_path), None, echo=False)
+
+    methods = [method for method, _, _ in server.requests]
+    # neither a HEAD nor a retry is needed
+    assert methods == ["PUT", "PATCH"]
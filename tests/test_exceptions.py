@@ -0,0 +1,82 @@
+import io
+import sys
+import pytest
+from kitdm_pycli.clients import base_repo_client
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from kitdm_pycli.helpers.batch_utils import fetch_all, run_bulk
+from kitdm_pycli.helpers.exceptions import (
+    ConfigurationError,
+    PreconditionFailedError,
+    ServiceError,
+)
+from tests.stub_server import StubServer, write_properties
+
+
+def failing_handler(method, path, headers, body):
+    if method == "DELETE":
+        # the resource is modified concurrently all the time
+        return 412, {}, b""
+    if path.endswith("/missing"):
+        return 404, {}, b"not found"
+    return 200, {"Content-Type": "application/json", "ETag": '"1"'}, {"id": path}
+
+
+def run_main(monkeypatch, args):
+    monkeypatch.setattr(sys, "argv", ["base-repo-client"] + args)
+    with pytest.raises(SystemExit) as e:
+        base_repo_client.main()
+    return e.value.code
+
+
+def test_helpers_raise_errors(monkeypatch, tmp_path):
+    with StubServer(failing_handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        with pytest.raises(ServiceError) as e:
+            service_client.get("missing", None, None)
+        assert e.value.status == 404
+        assert e.value.url == server.url + "api/v1/dataresources/missing"
+        with pytest.raises(PreconditionFailedError):
+            service_client.delete("123", None, True)
+
+    monkeypatch.setenv("PYCLI_PROPERTIES", str(tmp_path / "missing.json"))
+    with pytest.raises(ConfigurationError):
+        BaseRepoClient(False)
+
+
+def test_main_translates_errors_to_exit_codes(monkeypatch, tmp_path, capsys):
+    with StubServer(failing_handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        assert run_main(monkeypatch, ["getResource", "-id", "missing"]) == 2
+        assert "Server returned status 404" in capsys.readouterr().err
+        assert run_main(monkeypatch, ["deleteResource", "-id", "123"]) == 5
+
+    monkeypatch.setenv(
+        "PYCLI_PROPERTIES", write_properties(tmp_path, "http://127.0.0.1:1/")
+    )
+    assert run_main(monkeypatch, ["getResource", "-id", "123"]) == 3
+    assert "Failed to connect to http://127.0.0.1:1/" in capsys.readouterr().err
+
+
+def invalid_json_handler(method, path, headers, body):
+    if path.endswith("/broken"):
+        return 200, {"Content-Type": "application/json"}, b"{not json"
+    return 200, {"Content-Type": "application/json"}, {"id": path}
+
+
+def test_local_errors_fail_single_identifiers(monkeypatch, tmp_path):
+    stream = io.StringIO()
+    with StubServer(invalid_json_handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+
+        def fetch(identifier):
+            return service_client.get(identifier, None, None)
+
+        results, failures = fetch_all(["1", "broken", "2"], fetch, 2)
+        counts = run_bulk(["1", "broken", "2"], fetch, 2, stream=stream)
+
+    assert len(results) == 2
+    assert [identifier for identifier, _ in failures] == ["broken"]
+    assert counts == (2, 1, 0)
+    assert '"id": "broken", "error"' in stream.getvalue()
@@ -0,0 +1,42 @@
+import time
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from tests.stub_server import StubServer, write_properties
+
+
+def fetch_resources(monkeypatch, tmp_path, count, http_properties):
+    with StubServer() as server:
+        properties = write_properties(tmp_path, server.url, {"http": http_properties})
+        monkeypatch.setenv("PYCLI_PROPERTIES", properties)
+        service_client = BaseRepoClient(False)
+        start = time.perf_counter()
+        for i in range(count):
+            response = service_client.get("resource-" + str(i), None, None)
+            assert response[0]["id"] == "/api/v1/dataresources/resource-" + str(i)
+        elapsed = time.perf_counter() - start
+        service_client.close()
+        return server.connections, elapsed
+
+
+def test_pooled_session_reuses_connection(monkeypatch, tmp_path):
+    connections, _ = fetch_resources(monkeypatch, tmp_path, 20, {})
+    assert connections == 1
+
+
+def test_disabled_keep_alive_opens_connection_per_request(monkeypatch, tmp_path):
+    connections, _ = fetch_resources(monkeypatch, tmp_path, 20, {"keep_alive": False})
+    assert connections == 20
+
+
+def test_benchmark_handshake_savings(monkeypatch, tmp_path, capsys):
+    pooled_connections, pooled = fetch_resources(monkeypatch, tmp_path, 200, {})
+    single_connections, single = fetch_resources(
+        monkeypatch, tmp_path, 200, {"keep_alive": False}
+    )
+    with capsys.disabled():
+        print(
+            "\n200 GETs: pooled session {} connection(s) in {:.3f}s, without keep-alive "
+            "{} connections in {:.3f}s".format(
+                pooled_connections, pooled, single_connections, single
+            )
+        )
+    assert pooled_connections < single_connections
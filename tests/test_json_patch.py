@@ -0,0 +1,41 @@
+import pytest
+from kitdm_pycli.helpers.json_patch_utils import apply_patch, JsonPatchError
+
+
+def test_apply_all_operations():
+    document = {"a/b": 1, "list": [1, 2], "nested": {"x": "y"}}
+    patch = [
+        {"op": "add", "path": "/list/-", "value": 3},
+        {"op": "add", "path": "/list/0", "value": 0},
+        {"op": "replace", "path": "/a~1b", "value": 2},
+        {"op": "remove", "path": "/nested/x"},
+        {"op": "copy", "from": "/list", "path": "/copy"},
+        {"op": "move", "from": "/a~1b", "path": "/moved"},
+        {"op": "test", "path": "/moved", "value": 2},
+    ]
+    result = apply_patch(document, patch)
+
+    assert result == {
+        "list": [0, 1, 2, 3],
+        "nested": {},
+        "copy": [0, 1, 2, 3],
+        "moved": 2,
+    }
+    # the original document is unchanged
+    assert document == {"a/b": 1, "list": [1, 2], "nested": {"x": "y"}}
+
+
+@pytest.mark.parametrize(
+    "patch",
+    [
+        [{"op": "remove", "path": "/missing"}],
+        [{"op": "replace", "path": "/list/5", "value": 1}],
+        [{"op": "test", "path": "/list/0", "value": 2}],
+        [{"op": "add", "path": "list", "value": 1}],
+        [{"op": "unknown", "path": "/list"}],
+        {"op": "add", "path": "/a", "value": 1},
+    ],
+)
+def test_invalid_patches_are_rejected(patch):
+    with pytest.raises(JsonPatchError):
+        apply_patch({"list": [1]}, patch)
@@ -327,3 +327,16 @@ def test_delete_document():
     assert result.output == "file.json"
     assert result.auth is True
     assert result.render_as == "LIST"
+
+
+def test_get_schemas_all_pages():
+    # getSchemas [-p 1] [-s 100] --all [--prefetch]
+    args = ["getSchemas", "-s", "100", "--all", "--prefetch"]
+    result = parse_arguments(args)
+    assert result.operation == "getSchemas"
+    assert result.pageSize == 100
+    assert result.all is True
+    assert result.prefetch is True
+    result = parse_arguments(["getSchemas"])
+    assert result.all is False
+    assert result.prefetch is False
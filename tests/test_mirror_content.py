@@ -0,0 +1,76 @@
+import hashlib
+import json
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from tests.stub_server import StubServer, write_properties
+
+FILES = {
+    "a.txt": b"first file",
+    "folder/b.txt": b"second file",
+    "folder/sub/c.bin": bytes(range(256)),
+}
+
+
+def content_handler(method, path, headers, body):
+    prefix = "/api/v1/dataresources/123/data/"
+    if path.startswith(prefix + "?"):
+        page = int(path.split("page=")[1].split("&")[0])
+        elements = []
+        if page == 0:
+            for relative_path, content in FILES.items():
+                elements.append(
+                    {
+                        "relativePath": relative_path,
+                        "parentResource": {"id": "123"},
+                        "size": len(content),
+                        "hash": "sha1:" + hashlib.sha1(content).hexdigest(),
+                    }
+                )
+        return 200, {"Content-Type": "application/json"}, json.dumps(elements)
+    return 200, {}, FILES[path[len(prefix) :]]
+
+
+def test_mirror_content_skips_unchanged_files(monkeypatch, tmp_path):
+    destination = tmp_path / "mirror"
+    (destination / "folder").mkdir(parents=True)
+    # a.txt is outdated, folder/b.txt up to date
+    (destination / "a.txt").write_bytes(b"old content")
+    (destination / "folder" / "b.txt").write_bytes(FILES["folder/b.txt"])
+
+    with StubServer(content_handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        results, failures = service_client.mirror_content(
+            "123", None, str(destination), 2
+        )
+        downloaded = sorted(
+            path
+            for method, path, _ in server.requests
+            if "?" not in path and method == "GET"
+        )
+
+    assert failures == []
+    assert len(results) == 2
+    assert downloaded == [
+        "/api/v1/dataresources/123/data/a.txt",
+        "/api/v1/dataresources/123/data/folder/sub/c.bin",
+    ]
+    for relative_path, content in FILES.items():
+        assert (destination / relative_path).read_bytes() == content
+
+
+def test_local_errors_only_fail_affected_files(monkeypatch, tmp_path):
+    destination = tmp_path / "mirror"
+    destination.mkdir()
+    # a file blocks creating the folder of folder/b.txt and folder/sub/c.bin
+    (destination / "folder").write_bytes(b"not a folder")
+
+    with StubServer(content_handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        results, failures = service_client.mirror_content(
+            "123", None, str(destination), 2
+        )
+
+    assert [element["relativePath"] for element in results] == ["a.txt"]
+    assert sorted(path for path, _ in failures) == ["folder/b.txt", "folder/sub/c.bin"]
+    assert (destination / "a.txt").read_bytes() == FILES["a.txt"]
@@ -0,0 +1,51 @@
+import argparse
+import json
+import pytest
+from kitdm_pycli.helpers.metastore_helper import MetaStoreClient
+from kitdm_pycli.helpers.render_utils import write_all_pages
+from tests.stub_server import StubServer, write_properties
+
+SCHEMAS = [{"schemaId": "schema-" + str(i), "label": "Schema"} for i in range(45)]
+
+
+def listing_handler(method, path, headers, body):
+    query = dict(param.split("=") for param in path.split("?")[1].split("&"))
+    page, size = int(query["page"]), int(query["size"])
+    elements = SCHEMAS[page * size : (page + 1) * size]
+    return 200, {"Content-Type": "application/json"}, json.dumps(elements)
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_iterate_pages(monkeypatch, tmp_path, prefetch):
+    with StubServer(listing_handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = MetaStoreClient(False)
+        query_params = [
+            {"name": "page", "value": "0"},
+            {"name": "size", "value": "20"},
+        ]
+        pages = list(
+            service_client.iterate_pages(None, "schema", query_params, False, prefetch)
+        )
+        requests = len(server.requests)
+
+    assert [len(page) for page in pages] == [20, 20, 5]
+    assert [elem for page in pages for elem in page] == SCHEMAS
+    assert requests == 3
+
+
+def test_write_all_pages_as_json_lines(monkeypatch, tmp_path):
+    with StubServer(listing_handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = MetaStoreClient(False)
+        args = argparse.Namespace(render_as="RAW", output=str(tmp_path / "all.json"))
+        query_params = [
+            {"name": "page", "value": "1"},
+            {"name": "size", "value": "10"},
+        ]
+        pages = service_client.iterate_pages(None, "schema", query_params)
+        write_all_pages(service_client, pages, args)
+
+    with open(args.output) as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == SCHEMAS[10:]
@@ -0,0 +1,109 @@
+import json
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from tests.stub_server import StubServer, write_properties
+
+
+class ResourceHandler:
+    """
+    Stub server behaviour for a single data resource supporting PATCH, where each modification increases the ETag.
+    """
+
+    def __init__(self):
+        self.document = {"id": "123", "publisher": "nobody"}
+        self.version = 1
+
+    def __call__(self, method, path, headers, body):
+        etag = '"' + str(self.version) + '"'
+        if method == "PATCH":
+            if headers.get("If-Match") != etag:
+                return 412, {}, b""
+            for operation in json.loads(body):
+                self.document[operation["path"][1:]] = operation["value"]
+            self.version += 1
+            return 204, {"ETag": '"' + str(self.version) + '"'}, b""
+        return 200, {"Content-Type": "application/json", "ETag": etag}, self.document
+
+
+def write_patch(tmp_path, value):
+    patch_file = tmp_path / (value + ".json")
+    patch_file.write_text(
+        json.dumps([{"op": "replace", "path": "/publisher", "value": value}])
+    )
+    return str(patch_file)
+
+
+def patch_twice(monkeypatch, tmp_path, echo, local_echo):
+    with StubServer(ResourceHandler()) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        results = [
+            service_client.patch(
+                "123", write_patch(tmp_path, value), None, False, echo, local_echo
+            )
+            for value in ("KIT", "HZDR")
+        ]
+    return results, service_client.request_count, server.requests
+
+
+def test_remote_echo(monkeypatch, tmp_path):
+    results, request_count, _ = patch_twice(monkeypatch, tmp_path, True, False)
+    assert results[1] == [{"id": "123", "publisher": "HZDR"}]
+    # HEAD, PATCH, GET followed by PATCH, GET as the etag of the echo is reused
+    assert request_count == 5
+
+
+def test_local_echo(monkeypatch, tmp_path):
+    results, request_count, requests = patch_twice(monkeypatch, tmp_path, True, True)
+    assert results[0] == [{"id": "123", "publisher": "KIT"}]
+    assert results[1] == [{"id": "123", "publisher": "HZDR"}]
+    # the locally patched document is not cached, as it lacks server-computed fields
+    assert [method for method, _, _ in requests] == ["GET", "PATCH", "GET", "PATCH"]
+    assert request_count == 4
+
+
+def test_no_echo(monkeypatch, tmp_path):
+    results, request_count, _ = patch_twice(monkeypatch, tmp_path, False, False)
+    assert results == [[], []]
+    # HEAD, PATCH followed by PATCH only
+    assert request_count == 3
+
+
+def test_local_echo_after_concurrent_modification(monkeypatch, tmp_path):
+    handler = ResourceHandler()
+    with StubServer(handler) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        service_client.patch(
+            "123", write_patch(tmp_path, "KIT"), None, False, True, True
+        )
+        # modification by someone else, the cached document is outdated
+        handler.document["title"] = "changed"
+        handler.version += 1
+        server.requests.clear()
+        result = service_client.patch(
+            "123", write_patch(tmp_path, "HZDR"), None, False, True, True
+        )
+
+    methods = [method for method, _, _ in server.requests]
+    assert methods == ["GET", "PATCH"]
+    assert result == [{"id": "123", "publisher": "HZDR", "title": "changed"}]
+
+
+def test_local_echo_is_based_on_server_document(monkeypatch, tmp_path):
+    handler = ResourceHandler()
+
+    def handle(method, path, headers, body):
+        # lastUpdate is computed by the server on every modification
+        handler.document["lastUpdate"] = handler.version
+        return handler(method, path, headers, body)
+
+    with StubServer(handle) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        for value in ("KIT", "HZDR"):
+            result = service_client.patch(
+                "123", write_patch(tmp_path, value), None, False, True, True
+            )
+
+    # the second patch is applied to the document of version 2, not the first local echo
+    assert result == [{"id": "123", "publisher": "HZDR", "lastUpdate": 2}]
@@ -0,0 +1,141 @@
+import base64
+import json
+import sys
+import time
+from kitdm_pycli.clients import metastore_client
+from kitdm_pycli.helpers.metastore_helper import MetaStoreClient
+from kitdm_pycli.helpers.response_cache import ResponseCache, get_auth_identity
+from kitdm_pycli.helpers.response_cache import get_response_cache_properties
+from tests.stub_server import StubServer, echo_handler, write_properties
+
+
+def conditional_handler(method, path, headers, body):
+    if method == "GET" and headers.get("If-None-Match") == '"1"':
+        return 304, {"ETag": '"1"'}, b""
+    return echo_handler(method, path, headers, body)
+
+
+def cache_properties(tmp_path, **settings):
+    cache = {"directory": str(tmp_path / "cache"), "responses": True}
+    cache.update(settings)
+    return {"cache": cache}
+
+
+def create_client(monkeypatch, tmp_path, server, **settings):
+    monkeypatch.setenv(
+        "PYCLI_PROPERTIES",
+        write_properties(tmp_path, server.url, cache_properties(tmp_path, **settings)),
+    )
+    return MetaStoreClient(False)
+
+
+def test_fresh_response_is_served_across_clients(monkeypatch, tmp_path):
+    with StubServer() as server:
+        first = create_client(monkeypatch, tmp_path, server)
+        first.get("123", "schema", None)
+        first.close()
+        # a new client, e.g., the next invocation, uses the persistent cache
+        second = create_client(monkeypatch, tmp_path, server)
+        result = second.get("123", "schema", None)
+        statistics = second.get_response_cache_statistics()
+
+    assert len(server.requests) == 1
+    assert result == [{"id": "/api/v1/schemas/123"}]
+    assert statistics["hits"] == 1 and statistics["misses"] == 1
+    assert statistics["hit_ratio"] == 0.5
+
+
+def test_expired_response_is_revalidated(monkeypatch, tmp_path):
+    with StubServer(conditional_handler) as server:
+        service_client = create_client(monkeypatch, tmp_path, server, response_ttl=0)
+        service_client.get("123", "schema", None)
+        result = service_client.get("123", "schema", None)
+        statistics = service_client.get_response_cache_statistics()
+
+    assert server.requests[1][2]["If-None-Match"] == '"1"'
+    assert result == [{"id": "/api/v1/schemas/123"}]
+    assert statistics["revalidations"] == 1
+    assert statistics["reuse_ratio"] == 0.5
+
+
+def test_modification_invalidates_cached_responses(monkeypatch, tmp_path):
+    with StubServer() as server:
+        service_client = create_client(monkeypatch, tmp_path, server)
+        service_client.get("123", "schema", None)
+        service_client.delete("123", "schema", True)
+        service_client.get("123", "schema", None)
+
+    methods = [method for method, _, _ in server.requests]
+    assert methods == ["GET", "DELETE", "GET"]
+
+
+def test_modification_without_cache_invalidates_cached_responses(monkeypatch, tmp_path):
+    with StubServer() as server:
+        cached = create_client(monkeypatch, tmp_path, server)
+        cached.get("123", "schema", None)
+        cached.get(None, "schema", None)
+        cached.close()
+        # e.g., an invocation with --no-cache modifying the element
+        uncached = create_client(monkeypatch, tmp_path, server, responses=False)
+        uncached.delete("123", "schema", True)
+        cached = create_client(monkeypatch, tmp_path, server)
+        cached.get("123", "schema", None)
+        cached.get(None, "schema", None)
+
+    paths = [path for method, path, _ in server.requests if method == "GET"]
+    # the element and the listing it appears in are requested again
+    assert paths == [
+        "/api/v1/schemas/123",
+        "/api/v1/schemas",
+        "/api/v1/schemas/123",
+        "/api/v1/schemas",
+    ]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    class Response:
+        headers = {"Content-Type": "application/json"}
+        content = b"{}"
+
+    cache = ResponseCache(
+        str(tmp_path / "responses.sqlite"),
+        get_response_cache_properties({"cache": {"max_responses": 2}}),
+    )
+    for url in ("a", "b"):
+        cache.store(url, url, Response())
+        time.sleep(0.01)
+    cache.lookup("a")
+    cache.store("c", "c", Response())
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") is not None and cache.lookup("c") is not None
+
+
+def test_identity_is_part_of_the_key():
+    def bearer(claims):
+        payload = json.dumps(claims).encode("utf-8")
+        return "Bearer x." + base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    alice = {"Authorization": bearer({"sub": "alice"})}
+    assert get_auth_identity(alice) == "sub:alice"
+    assert get_auth_identity({}) == ""
+    assert ResponseCache.get_key("u", alice) != ResponseCache.get_key("u", {})
+
+
+def test_cache_flag_and_stats_operation(monkeypatch, tmp_path, capsys):
+    with StubServer() as server:
+        properties = cache_properties(tmp_path, responses=False)
+        monkeypatch.setenv(
+            "PYCLI_PROPERTIES", write_properties(tmp_path, server.url, properties)
+        )
+        for _ in range(2):
+            monkeypatch.setattr(
+                sys, "argv", ["client", "--cache", "getSchema", "-id", "123"]
+            )
+            metastore_client.main()
+        monkeypatch.setattr(sys, "argv", ["client", "-r", "RAW", "cacheStats"])
+        metastore_client.main()
+
+    assert len(server.requests) == 1
+    statistics = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert statistics["entries"] == 1 and statistics["hits"] == 1
@@ -0,0 +1,90 @@
+import pytest
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from kitdm_pycli.helpers.exceptions import ServiceConnectionError, ServiceError
+from kitdm_pycli.helpers.retry_utils import (
+    RetryPolicy,
+    get_retry_properties,
+    parse_retry_after,
+)
+from tests.stub_server import StubServer, echo_handler, write_properties
+
+
+class FlakyHandler:
+    """
+    Stub server behaviour answering the first 'failures' requests with 503.
+    """
+
+    def __init__(self, failures, retry_after=None):
+        self.failures = failures
+        self.retry_after = retry_after
+
+    def __call__(self, method, path, headers, body):
+        if self.failures > 0:
+            self.failures -= 1
+            headers = {"Retry-After": self.retry_after} if self.retry_after else {}
+            return 503, headers, b"busy"
+        return echo_handler(method, path, headers, body)
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    waited = []
+    monkeypatch.setattr(RetryPolicy, "wait", staticmethod(waited.append))
+    return waited
+
+
+def create_client(monkeypatch, tmp_path, server_url):
+    properties = write_properties(
+        tmp_path, server_url, {"retry": {"max_attempts": 4, "max_backoff": 10}}
+    )
+    monkeypatch.setenv("PYCLI_PROPERTIES", properties)
+    return BaseRepoClient(False)
+
+
+def test_get_is_retried(monkeypatch, tmp_path, delays):
+    with StubServer(FlakyHandler(3)) as server:
+        service_client = create_client(monkeypatch, tmp_path, server.url)
+        result = service_client.get("123", None, None)
+
+    assert result == [{"id": "/api/v1/dataresources/123"}]
+    assert len(server.requests) == 4
+    assert service_client.retry_count == 3
+    # exponential backoff with full jitter
+    assert [delay <= 0.5 * 2**i for i, delay in enumerate(delays)] == [True] * 3
+
+
+def test_retry_after_is_respected(monkeypatch, tmp_path, delays):
+    with StubServer(FlakyHandler(2, "60")) as server:
+        service_client = create_client(monkeypatch, tmp_path, server.url)
+        service_client.get("123", None, None)
+
+    # limited by max_backoff
+    assert delays == [10.0, 10.0]
+
+
+def test_post_is_not_retried_by_default(monkeypatch, tmp_path, delays):
+    metadata = tmp_path / "resource.json"
+    metadata.write_text('{"resourceType": {"value": "Dataset"}}')
+    with StubServer(FlakyHandler(1)) as server:
+        service_client = create_client(monkeypatch, tmp_path, server.url)
+        with pytest.raises(ServiceError) as e:
+            service_client.create(None, str(metadata), None, None)
+
+    assert e.value.status == 503
+    assert len(server.requests) == 1
+    assert delays == []
+
+
+def test_attempts_are_limited(monkeypatch, tmp_path, delays):
+    service_client = create_client(monkeypatch, tmp_path, "http://127.0.0.1:1/")
+    with pytest.raises(ServiceConnectionError):
+        service_client.get("123", None, None)
+    assert service_client.request_count == 4
+    assert len(delays) == 3
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert get_retry_properties({"retry": {"max_attempts": 1}})["max_attempts"] == 1
@@ -0,0 +1,55 @@
+from kitdm_pycli.helpers.metastore_helper import MetaStoreClient
+from tests.stub_server import StubServer, echo_handler, write_properties
+
+
+def conditional_handler(method, path, headers, body):
+    if method == "GET" and headers.get("If-None-Match") == '"1"':
+        return 304, {"ETag": '"1"'}, b""
+    return echo_handler(method, path, headers, body)
+
+
+def create_client(monkeypatch, tmp_path, server, **settings):
+    cache = {"directory": str(tmp_path / "cache")}
+    cache.update(settings)
+    monkeypatch.setenv(
+        "PYCLI_PROPERTIES", write_properties(tmp_path, server.url, {"cache": cache})
+    )
+    return MetaStoreClient(False)
+
+
+def test_schema_version_is_downloaded_once(monkeypatch, tmp_path):
+    with StubServer() as server:
+        first = create_client(monkeypatch, tmp_path, server)
+        expected = first.download("schema1", "schema", 2)
+        # a new client, e.g., the next invocation, reads the schema from disk
+        second = create_client(monkeypatch, tmp_path, server)
+        result = second.download("schema1", "schema", 2)
+        output = second.download(
+            "schema1", "schema", 2, output=str(tmp_path / "schema.json")
+        )
+
+    assert len(server.requests) == 1
+    assert result == expected
+    assert (tmp_path / "schema.json").read_bytes() == expected
+    assert output == str(tmp_path / "schema.json")
+
+
+def test_latest_schema_is_revalidated(monkeypatch, tmp_path):
+    with StubServer(conditional_handler) as server:
+        service_client = create_client(monkeypatch, tmp_path, server)
+        expected = service_client.download("schema1", "schema", None)
+        result = service_client.download("schema1", "schema", None)
+
+    assert len(server.requests) == 2
+    assert server.requests[1][2]["If-None-Match"] == '"1"'
+    assert result == expected
+
+
+def test_schema_store_can_be_disabled(monkeypatch, tmp_path):
+    with StubServer() as server:
+        service_client = create_client(monkeypatch, tmp_path, server, schemas=False)
+        service_client.download("schema1", "schema", 2)
+        service_client.download("schema1", "schema", 2)
+
+    assert len(server.requests) == 2
+    assert not (tmp_path / "cache" / "schemas").exists()
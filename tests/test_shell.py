@@ -0,0 +1,79 @@
+import io
+import sys
+from kitdm_pycli.clients import base_repo_client
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from tests.stub_server import StubServer, echo_handler, write_properties
+
+
+def missing_handler(method, path, headers, body):
+    if path.endswith("/missing"):
+        return 404, {}, b""
+    return echo_handler(method, path, headers, body)
+
+
+def run_shell(monkeypatch, tmp_path, server, lines):
+    monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+    monkeypatch.setattr(sys, "stdin", io.StringIO("\n".join(lines) + "\n"))
+    monkeypatch.setattr(sys, "argv", ["client", "-r", "RAW", "shell"])
+    base_repo_client.main()
+
+
+def test_shell_reuses_client_and_connection(monkeypatch, tmp_path, capsys):
+    lines = [
+        "# comment",
+        "getResource -id 1",
+        "getResource -id missing",
+        "getResource --unknown",
+        "getResource -id 2",
+        "exit",
+        "getResource -id 3",
+    ]
+    with StubServer(missing_handler) as server:
+        run_shell(monkeypatch, tmp_path, server, lines)
+
+    paths = [path for _, path, _ in server.requests]
+    assert paths == [
+        "/api/v1/dataresources/1",
+        "/api/v1/dataresources/missing",
+        "/api/v1/dataresources/2",
+    ]
+    # one pooled connection for all operations
+    assert server.connections == 1
+    captured = capsys.readouterr()
+    # global arguments of the shell are applied to all operations
+    assert "[{'id': '/api/v1/dataresources/2'}]" in captured.out
+    assert "status 404" in captured.err
+
+
+def test_global_arguments_can_be_overridden(monkeypatch, tmp_path, capsys):
+    with StubServer() as server:
+        run_shell(monkeypatch, tmp_path, server, ["-r LIST getResource -id 1"])
+
+    captured = capsys.readouterr()
+    assert "/api/v1/dataresources/1" in captured.out
+    assert "{'id'" not in captured.out
+
+
+def test_local_errors_and_interrupts_only_end_operation(monkeypatch, tmp_path, capsys):
+    errors = {
+        "1": OSError("Disk full."),
+        "2": ValueError("Invalid response."),
+        "3": KeyboardInterrupt(),
+    }
+    get = BaseRepoClient.get
+
+    def failing_get(self, resource_id, *args, **kwargs):
+        if resource_id in errors:
+            raise errors[resource_id]
+        return get(self, resource_id, *args, **kwargs)
+
+    monkeypatch.setattr(BaseRepoClient, "get", failing_get)
+    lines = ["getResource -id " + identifier for identifier in ("1", "2", "3", "4")]
+    with StubServer() as server:
+        run_shell(monkeypatch, tmp_path, server, lines)
+
+    assert [path for _, path, _ in server.requests] == ["/api/v1/dataresources/4"]
+    captured = capsys.readouterr()
+    assert "Disk full." in captured.err
+    assert "Invalid response." in captured.err
+    assert "Operation cancelled." in captured.err
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+from tests.stub_server import StubServer, write_properties
+
+CLIENT_MODULES = [
+    "kitdm_pycli.clients.base_repo_client",
+    "kitdm_pycli.clients.metastore_client",
+    "kitdm_pycli.clients.typed_pid_maker_client",
+]
+
+# dependencies which are only imported if an operation needs them
+DEFERRED_MODULES = ["dateparser", "keycloak", "prettytable", "flatdict", "requests"]
+
+
+def run_python(code, env=None):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return result.stdout, result.stderr
+
+
+def get_loaded(stdout):
+    return stdout.strip().splitlines()[-1].split(",") if stdout.strip() else []
+
+
+def imported_modules(importtime):
+    """
+    Parse the output of python -X importtime into a dictionary of module names and cumulative import times in us.
+    """
+    modules = {}
+    for line in importtime.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            modules[parts[2].strip()] = int(parts[1])
+    return modules
+
+
+def test_client_import_defers_dependencies(capsys):
+    code = "import " + ", ".join(CLIENT_MODULES)
+    _, importtime = run_python(code)
+    modules = imported_modules(importtime)
+
+    for module in DEFERRED_MODULES:
+        assert module not in modules
+    with capsys.disabled():
+        print(
+            "\nImporting all clients took {:.1f}ms".format(
+                sum(modules[module] for module in CLIENT_MODULES) / 1000
+            )
+        )
+
+
+def test_raw_get_with_simple_dates_skips_optional_dependencies(tmp_path):
+    code = (
+        "import sys\n"
+        "from kitdm_pycli.clients import metastore_client\n"
+        "sys.argv = ['client', '-r', 'RAW', 'getSchemas', '-f', '2023-11-02', "
+        "'-u', '3 days ago']\n"
+        "metastore_client.main()\n"
+        "print(','.join(m for m in " + repr(DEFERRED_MODULES) + " if m in sys.modules))"
+    )
+    with StubServer(
+        lambda *args: (200, {"Content-Type": "application/json"}, [])
+    ) as server:
+        env = dict(os.environ)
+        env["PYCLI_PROPERTIES"] = write_properties(tmp_path, server.url)
+        stdout, _ = run_python(code, env)
+
+    assert get_loaded(stdout) == ["requests"]
+
+
+def test_table_rendering_and_dates_import_dependencies(tmp_path):
+    code = (
+        "import sys\n"
+        "from kitdm_pycli.clients import metastore_client\n"
+        "sys.argv = ['client', 'getSchemas', '-f', 'last year']\n"
+        "metastore_client.main()\n"
+        "print(','.join(m for m in " + repr(DEFERRED_MODULES) + " if m in sys.modules))"
+    )
+    with StubServer(
+        lambda *args: (200, {"Content-Type": "application/json"}, [{"schemaId": "1"}])
+    ) as server:
+        env = dict(os.environ)
+        env["PYCLI_PROPERTIES"] = write_properties(tmp_path, server.url)
+        stdout, _ = run_python(code, env)
+
+    assert set(get_loaded(stdout)) == {
+        "dateparser",
+        "prettytable",
+        "flatdict",
+        "requests",
+    }
@@ -0,0 +1,31 @@
+import tracemalloc
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from tests.stub_server import StubServer, write_properties
+
+# binary content which is not valid UTF-8
+CONTENT = bytes(range(256)) * 32768
+
+
+def content_handler(method, path, headers, body):
+    return 200, {"Content-Type": "application/octet-stream"}, CONTENT
+
+
+def test_download_streams_to_file(monkeypatch, tmp_path):
+    with StubServer(content_handler) as server:
+        properties = write_properties(
+            tmp_path, server.url, {"http": {"chunk_size": 65536}}
+        )
+        monkeypatch.setenv("PYCLI_PROPERTIES", properties)
+        service_client = BaseRepoClient(False)
+        output = str(tmp_path / "download.bin")
+
+        tracemalloc.start()
+        result = service_client.download("123", "file.bin", None, False, output)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    assert result == output
+    with open(output, "rb") as f:
+        assert f.read() == CONTENT
+    # the 8 MiB download must never be held in memory entirely
+    assert peak < len(CONTENT) / 4
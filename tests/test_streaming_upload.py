@@ -0,0 +1,66 @@
+import tracemalloc
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from kitdm_pycli.helpers.multipart_utils import MultipartStream
+from tests.stub_server import StubServer, write_properties
+
+MIB = 1024 * 1024
+
+
+def test_multipart_stream_matches_length(tmp_path):
+    data_file = tmp_path / "data.bin"
+    data_file.write_bytes(bytes(range(256)) * 1000)
+    metadata_file = tmp_path / "content.json"
+    metadata_file.write_text('{"relativePath": "data.bin"}')
+    body = MultipartStream(
+        [
+            ("metadata", "content.json", str(metadata_file), None),
+            ("file", "data.bin", str(data_file), "application/octet-stream"),
+        ]
+    )
+
+    content = b""
+    while True:
+        chunk = body.read(1000)
+        if not chunk:
+            break
+        assert len(chunk) <= 1000
+        content += chunk
+
+    assert len(content) == len(body)
+    assert content.startswith(b"--" + body.boundary.encode())
+    assert bytes(range(256)) * 1000 in content
+    assert b'{"relativePath": "data.bin"}' in content
+    assert content.endswith(b"--" + body.boundary.encode() + b"--\r\n")
+
+
+def upload_peak_memory(service_client, tmp_path, size):
+    payload = tmp_path / ("upload-" + str(size) + ".bin")
+    with open(payload, "wb") as f:
+        f.truncate(size)
+    tracemalloc.start()
+    service_client.create("123", None, str(payload), "data/")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    payload.unlink()
+    return peak
+
+
+def test_benchmark_upload_memory(monkeypatch, tmp_path, capsys):
+    with StubServer(discard_body=True) as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        peaks = {}
+        for size in (8 * MIB, 64 * MIB):
+            peaks[size] = upload_peak_memory(service_client, tmp_path, size)
+        assert server.received_bytes > 72 * MIB
+
+    with capsys.disabled():
+        print()
+        for size, peak in peaks.items():
+            print(
+                "Upload of {} MiB: peak allocation {:.2f} MiB".format(
+                    size // MIB, peak / MIB
+                )
+            )
+    # memory consumption must not grow with the file size
+    assert peaks[64 * MIB] < 2 * MIB
@@ -0,0 +1,67 @@
+import hashlib
+import json
+from kitdm_pycli.helpers import hash_utils
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from tests.stub_server import StubServer, echo_handler, write_properties
+
+REMOTE = {
+    "unchanged.txt": b"unchanged",
+    "changed.txt": b"version 1",
+    "resized.txt": b"short",
+}
+
+
+def listing_handler(method, path, headers, body):
+    if method == "GET" and path.startswith("/api/v1/dataresources/123/data/?"):
+        elements = []
+        if "page=0" in path:
+            for relative_path, content in REMOTE.items():
+                elements.append(
+                    {
+                        "relativePath": relative_path,
+                        "size": len(content),
+                        "hash": "sha1:" + hashlib.sha1(content).hexdigest(),
+                    }
+                )
+        return 200, {"Content-Type": "application/json"}, json.dumps(elements)
+    return echo_handler(method, path, headers, body)
+
+
+def test_sync_content_uploads_new_and_changed_files(monkeypatch, tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "unchanged.txt").write_bytes(b"unchanged")
+    (source / "changed.txt").write_bytes(b"version 2")
+    (source / "resized.txt").write_bytes(b"much longer content")
+    (source / "new.txt").write_bytes(b"new")
+
+    hashed = []
+    compute_hash = hash_utils.compute_hash
+
+    def counting_compute_hash(path, algorithm="sha1", chunk_size=1048576):
+        hashed.append(path)
+        return compute_hash(path, algorithm, chunk_size)
+
+    monkeypatch.setattr(hash_utils, "compute_hash", counting_compute_hash)
+
+    with StubServer(listing_handler) as server:
+        properties = write_properties(
+            tmp_path, server.url, {"cache": {"directory": str(tmp_path / "cache")}}
+        )
+        monkeypatch.setenv("PYCLI_PROPERTIES", properties)
+        service_client = BaseRepoClient(False)
+        results, failures = service_client.sync_content("123", str(source), None)
+        posted = sorted(path for method, path, _ in server.requests if method == "POST")
+
+        # the second run uses cached checksums of the unchanged local files
+        hashed.clear()
+        service_client.sync_content("123", str(source), None)
+
+    assert failures == []
+    assert len(results) == 3
+    assert posted == [
+        "/api/v1/dataresources/123/data/changed.txt?force=true",
+        "/api/v1/dataresources/123/data/new.txt",
+        "/api/v1/dataresources/123/data/resized.txt?force=true",
+    ]
+    assert hashed == []
@@ -0,0 +1,79 @@
+import threading
+import time
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from kitdm_pycli.helpers.batch_utils import fetch_all
+from kitdm_pycli.helpers.throttle_utils import AdaptiveLimiter, TokenBucket
+from tests.stub_server import StubServer, echo_handler, write_properties
+
+
+class ConcurrencyHandler:
+    """
+    Stub server behaviour tracking the number of concurrent requests and answering with 429 while more than
+    'tolerated' requests are processed at the same time.
+    """
+
+    def __init__(self, tolerated):
+        self.tolerated = tolerated
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, method, path, headers, body):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            overloaded = self.in_flight > self.tolerated
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+        if overloaded:
+            return 429, {"Retry-After": "0"}, b""
+        return echo_handler(method, path, headers, body)
+
+
+def test_limiter_halves_once_per_generation_and_ramps_up():
+    limiter = AdaptiveLimiter(8, 1, 2)
+    generations = [limiter.acquire() for _ in range(4)]
+    assert limiter.on_throttled(generations[0]) is True
+    # requests started before the decrease do not halve the limit again
+    assert limiter.on_throttled(generations[1]) is False
+    assert limiter.limit == 4
+    for _ in range(4):
+        limiter.release()
+        limiter.on_success()
+    assert limiter.limit == 6
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(100, 5)
+    start = time.monotonic()
+    for _ in range(20):
+        bucket.acquire()
+    # 5 requests as burst, the remaining 15 at 100 per second
+    assert time.monotonic() - start >= 0.14
+
+
+def test_concurrency_adapts_to_server(monkeypatch, tmp_path):
+    handler = ConcurrencyHandler(4)
+    with StubServer(handler) as server:
+        properties = write_properties(
+            tmp_path,
+            server.url,
+            {
+                "base_repo": {"throttle": {"max_in_flight": 16}},
+                "retry": {"max_attempts": 10},
+                "http": {"pool_maxsize": 16},
+            },
+        )
+        monkeypatch.setenv("PYCLI_PROPERTIES", properties)
+        service_client = BaseRepoClient(False)
+        results, failures = fetch_all(
+            [str(i) for i in range(200)],
+            lambda identifier: service_client.get(identifier, None, None),
+            16,
+        )
+
+    assert failures == []
+    assert len(results) == 200
+    # the limit was reduced to what the server tolerates
+    assert service_client.throttle.limiter.limit < 16
@@ -0,0 +1,188 @@
+import datetime
+import os
+import stat
+import time
+import pytest
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from kitdm_pycli.helpers.batch_utils import fetch_all
+from kitdm_pycli.helpers.exceptions import AuthenticationError, ServiceError
+from tests.stub_server import StubServer, write_properties
+
+
+def token_response(name):
+    return {
+        "access_token": "access-" + name,
+        "expires_in": 300,
+        "refresh_token": "refresh-" + name,
+        "refresh_expires_in": 1800,
+    }
+
+
+def test_token_cache_reuses_and_refreshes_tokens(mocker, monkeypatch, tmp_path):
+    properties = write_properties(
+        tmp_path,
+        "http://localhost/",
+        {
+            "keycloak": {"username": "user", "password": "secret"},
+            "cache": {"directory": str(tmp_path / "cache")},
+        },
+    )
+    monkeypatch.setenv("PYCLI_PROPERTIES", properties)
+    keycloak = mocker.patch("keycloak.KeycloakOpenID")
+    keycloak.return_value.token.return_value = token_response("login")
+    keycloak.return_value.refresh_token.return_value = token_response("refresh")
+
+    # first invocation performs a login and caches the tokens
+    headers = {}
+    assert BaseRepoClient(False).login(True, headers)
+    assert headers["Authorization"] == "Bearer access-login"
+    assert keycloak.return_value.token.call_count == 1
+
+    service_client = BaseRepoClient(False)
+    token_file = service_client.get_token_cache().token_file
+    assert stat.S_IMODE(os.stat(token_file).st_mode) == 0o600
+
+    # second invocation reuses the cached access token without contacting KeyCloak
+    headers = {}
+    assert service_client.login(True, headers)
+    assert headers["Authorization"] == "Bearer access-login"
+    assert keycloak.return_value.token.call_count == 1
+    assert keycloak.return_value.refresh_token.call_count == 0
+
+    # third invocation refreshes the expired access token using the cached refresh token
+    cache = service_client.get_token_cache()
+    cached = cache.load()
+    cache.save(
+        cached["access_token"],
+        cached["token_expires"].fromtimestamp(time.time() - 10),
+        cached["refresh_token"],
+        cached["refresh_token_expires"],
+    )
+    headers = {}
+    assert BaseRepoClient(False).login(True, headers)
+    assert headers["Authorization"] == "Bearer access-refresh"
+    # the default grant type refresh_token is used
+    keycloak.return_value.refresh_token.assert_called_once_with("refresh-login")
+    assert keycloak.return_value.token.call_count == 1
+
+
+def test_rejected_tokens_are_removed_from_cache(mocker, monkeypatch, tmp_path):
+    def handler(method, path, headers, body):
+        if headers.get("Authorization") == "Bearer access-revoked":
+            return 401, {}, b""
+        return 200, {"Content-Type": "application/json"}, {"id": path}
+
+    keycloak = mocker.patch("keycloak.KeycloakOpenID")
+    keycloak.return_value.token.side_effect = [
+        token_response("revoked"),
+        token_response("login"),
+    ]
+    with StubServer(handler) as server:
+        properties = write_properties(
+            tmp_path,
+            server.url,
+            {
+                "keycloak": {"username": "user", "password": "secret"},
+                "cache": {"directory": str(tmp_path / "cache")},
+            },
+        )
+        monkeypatch.setenv("PYCLI_PROPERTIES", properties)
+        service_client = BaseRepoClient(False)
+        with pytest.raises(ServiceError):
+            service_client.get("123", None, None, True)
+        assert service_client.get_token_cache().load() is None
+
+        # the next invocation does not reuse the rejected token
+        assert BaseRepoClient(False).get("123", None, None, True)
+
+    assert keycloak.return_value.token.call_count == 2
+
+
+def test_rejected_refresh_token_is_removed_from_cache(mocker, monkeypatch, tmp_path):
+    from keycloak.exceptions import KeycloakAuthenticationError, KeycloakPostError
+
+    properties = write_properties(
+        tmp_path,
+        "http://localhost/",
+        {
+            "keycloak": {"username": "user", "password": "secret"},
+            "cache": {"directory": str(tmp_path / "cache")},
+        },
+    )
+    monkeypatch.setenv("PYCLI_PROPERTIES", properties)
+    keycloak = mocker.patch("keycloak.KeycloakOpenID")
+    keycloak.return_value.refresh_token.side_effect = KeycloakPostError("ended")
+    keycloak.return_value.token.side_effect = KeycloakAuthenticationError("denied")
+    cache = BaseRepoClient(False).get_token_cache()
+    cache.save(
+        "access-old",
+        datetime.datetime.now() - datetime.timedelta(seconds=10),
+        "refresh-old",
+        datetime.datetime.now() + datetime.timedelta(seconds=600),
+    )
+
+    with pytest.raises(AuthenticationError):
+        BaseRepoClient(False).login(True, {})
+
+    keycloak.return_value.refresh_token.assert_called_once()
+    assert cache.load() is None
+
+
+def count_keycloak_requests(keycloak):
+    return (
+        keycloak.return_value.token.call_count
+        + keycloak.return_value.refresh_token.call_count
+        + keycloak.return_value.userinfo.call_count
+    )
+
+
+def test_benchmark_keycloak_requests_for_batch(mocker, monkeypatch, tmp_path, capsys):
+    identifiers = ["id-" + str(i) for i in range(100)]
+    counts = {}
+    # baseline: a new client per request without token cache, as a KeycloakOpenID instance and the user information
+    # were obtained per login before; afterwards: one client for the whole batch
+    for mode, token_cache in (("before", False), ("after", True)):
+        keycloak = mocker.patch("keycloak.KeycloakOpenID")
+        keycloak.return_value.token.return_value = token_response("login")
+        keycloak.return_value.userinfo.return_value = {
+            "preferred_username": "user",
+            "email": "user@example.org",
+            "groups": [],
+        }
+        with StubServer() as server:
+            properties = write_properties(
+                tmp_path,
+                server.url,
+                {
+                    "keycloak": {
+                        "username": "user",
+                        "password": "secret",
+                        "token_cache": token_cache,
+                    },
+                    "cache": {"directory": str(tmp_path / ("cache-" + mode))},
+                },
+            )
+            monkeypatch.setenv("PYCLI_PROPERTIES", properties)
+            shared_client = BaseRepoClient(True) if mode == "after" else None
+
+            def get(identifier):
+                client = shared_client or BaseRepoClient(True)
+                return client.get(identifier, None, None, True)
+
+            results, failures = fetch_all(identifiers, get, 8)
+            authorized = [
+                headers.get("Authorization") for _, _, headers in server.requests
+            ]
+        assert len(results) == 100 and failures == []
+        assert authorized == ["Bearer access-login"] * 100
+        counts[mode] = (keycloak.call_count, count_keycloak_requests(keycloak))
+
+    with capsys.disabled():
+        for mode in ("before", "after"):
+            print(
+                "\n100 authenticated GETs {}: {} KeyCloak client(s), {} KeyCloak request(s)".format(
+                    mode, *counts[mode]
+                )
+            )
+    assert counts["before"] == (100, 200)
+    assert counts["after"] == (1, 2)
@@ -0,0 +1,27 @@
+from kitdm_pycli.helpers.base_repo_helper import BaseRepoClient
+from tests.stub_server import StubServer, write_properties
+
+
+def test_upload_directory(monkeypatch, tmp_path):
+    source = tmp_path / "source"
+    (source / "raw" / "day1").mkdir(parents=True)
+    (source / "raw" / "day1" / "image.tif").write_bytes(b"image")
+    (source / "raw" / "notes.txt").write_text("notes")
+    (source / "scratch.tmp").write_text("temporary")
+    (source / "README.md").write_text("readme")
+
+    with StubServer() as server:
+        monkeypatch.setenv("PYCLI_PROPERTIES", write_properties(tmp_path, server.url))
+        service_client = BaseRepoClient(False)
+        results, failures = service_client.upload_directory(
+            "123", str(source), "upload/", None, ["*.tmp"], 2
+        )
+        posted = sorted(path for method, path, _ in server.requests if method == "POST")
+
+    assert failures == []
+    assert len(results) == 3
+    assert posted == [
+        "/api/v1/dataresources/123/data/upload/README.md",
+        "/api/v1/dataresources/123/data/upload/raw/day1/image.tif",
+        "/api/v1/dataresources/123/data/upload/raw/notes.txt",
+    ]